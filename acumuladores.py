@@ -0,0 +1,152 @@
+import numpy as np
+
+# Acumulador de contagem, média e variância em uma única passagem (algoritmo de Welford/Chan):
+# pode ser alimentado bloco a bloco e dois acumuladores podem ser combinados sem rever os dados
+class Momentos:
+    def __init__(self):
+        self.contagem = 0
+        self.media = 0.0
+        self.m2 = 0.0  # soma dos quadrados dos desvios em relação à média
+
+    # Função para acrescentar um bloco de valores (valores ausentes são ignorados)
+    def adicionar(self, valores):
+        valores = np.asarray(valores, dtype='float64')
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+
+        bloco = Momentos()
+        bloco.contagem = len(valores)
+        bloco.media = float(valores.mean())
+        bloco.m2 = float(((valores - bloco.media) ** 2).sum())
+        return self.combinar(bloco)
+
+    # Função para combinar outro acumulador a este
+    def combinar(self, outro):
+        if outro.contagem == 0:
+            return self
+        total = self.contagem + outro.contagem
+        delta = outro.media - self.media
+        self.media += delta * outro.contagem / total
+        self.m2 += outro.m2 + delta ** 2 * self.contagem * outro.contagem / total
+        self.contagem = total
+        return self
+
+    # Variância amostral (mesma convenção do pandas, ddof=1)
+    @property
+    def variancia(self):
+        if self.contagem < 2:
+            return float('nan')
+        return self.m2 / (self.contagem - 1)
+
+    @property
+    def desvio(self):
+        return float(np.sqrt(self.variancia))
+
+# Acumulador de contagem, médias e co-momentos de várias colunas em uma única passagem (versão multivariada do
+# Momentos): dá a matriz de covariância e a de correlação, pode ser alimentado bloco a bloco e combinado com outros
+# acumuladores sem rever os dados. Como no corr() do pandas com colunas completas, só entram linhas sem valores ausentes
+class CoMomentos:
+    def __init__(self, colunas):
+        self.colunas = list(colunas)
+        self.contagem = 0
+        self.media = np.zeros(len(self.colunas))
+        self.comomentos = np.zeros((len(self.colunas), len(self.colunas)))  # soma dos produtos dos desvios
+
+    # Função para acrescentar um bloco de linhas (DataFrame com as colunas do acumulador ou matriz linhas x colunas)
+    def adicionar(self, valores):
+        if hasattr(valores, 'columns'):
+            valores = valores[self.colunas]
+        valores = np.asarray(valores, dtype='float64')
+        valores = valores[~np.isnan(valores).any(axis=1)]
+        if len(valores) == 0:
+            return self
+
+        bloco = CoMomentos(self.colunas)
+        bloco.contagem = len(valores)
+        bloco.media = valores.mean(axis=0)
+        desvios = valores - bloco.media
+        bloco.comomentos = desvios.T @ desvios
+        return self.combinar(bloco)
+
+    # Função para combinar outro acumulador (das mesmas colunas) a este
+    def combinar(self, outro):
+        if outro.contagem == 0:
+            return self
+        total = self.contagem + outro.contagem
+        delta = outro.media - self.media
+        self.comomentos = self.comomentos + outro.comomentos + np.outer(delta, delta) * self.contagem * outro.contagem / total
+        self.media = self.media + delta * outro.contagem / total
+        self.contagem = total
+        return self
+
+    # Matriz de covariância amostral (ddof=1, como o cov() do pandas)
+    @property
+    def covariancia(self):
+        if self.contagem < 2:
+            return np.full_like(self.comomentos, np.nan)
+        return self.comomentos / (self.contagem - 1)
+
+    # Matriz de correlação de Pearson (como o corr() do pandas)
+    @property
+    def correlacao(self):
+        desvios = np.sqrt(np.diag(self.covariancia))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlacao = self.covariancia / np.outer(desvios, desvios)
+        return np.clip(correlacao, -1.0, 1.0)
+
+# Histograma de resolução fixa para cálculo de quantis em uma única passagem: guarda quantas vezes cada
+# valor arredondado para a resolução aparece, pode ser combinado com outros histogramas e ocupa memória
+# proporcional à amplitude dos valores (não ao número de linhas). O erro de cada quantil é de no máximo
+# meia resolução; com valores inteiros (altura em cm, peso em kg) e a resolução padrão o resultado é exato
+class HistogramaQuantis:
+    def __init__(self, resolucao=0.01):
+        self.resolucao = resolucao
+        self.contagens = {}  # índice da classe -> número de valores
+
+    # Função para acrescentar um bloco de valores (valores ausentes são ignorados)
+    def adicionar(self, valores):
+        valores = np.asarray(valores, dtype='float64')
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+
+        # Contagem por classe com bincount (tempo linear, sem ordenar os valores)
+        classes = np.round(valores / self.resolucao).astype('int64')
+        menor = int(classes.min())
+        contagens = np.bincount(classes - menor)
+        for deslocamento in np.flatnonzero(contagens).tolist():
+            classe = menor + deslocamento
+            self.contagens[classe] = self.contagens.get(classe, 0) + int(contagens[deslocamento])
+        return self
+
+    # Função para combinar outro histograma (de mesma resolução) a este
+    def combinar(self, outro):
+        for classe, contagem in outro.contagens.items():
+            self.contagens[classe] = self.contagens.get(classe, 0) + contagem
+        return self
+
+    @property
+    def contagem(self):
+        return sum(self.contagens.values())
+
+    # Função para obter o quantil q (0 a 1) com interpolação linear, como o quantile() do pandas
+    def quantil(self, q):
+        classes = np.array(sorted(self.contagens), dtype='int64')
+        contagens = np.array([self.contagens[classe] for classe in classes.tolist()], dtype='int64')
+        return quantil_classes(classes, contagens, q) * self.resolucao
+
+# Função para obter o quantil q (0 a 1) de valores agrupados em classes ordenadas, com interpolação linear
+# entre as posições vizinhas, como o quantile() do pandas (devolve o índice da classe, não multiplicado pela resolução)
+def quantil_classes(classes, contagens, q):
+    acumulado = np.cumsum(contagens)
+    if len(acumulado) == 0 or acumulado[-1] == 0:
+        return float('nan')
+
+    posicao = (acumulado[-1] - 1) * q
+    inferior, superior = int(np.floor(posicao)), int(np.ceil(posicao))
+
+    # O valor de posição k (a partir de 0) está na primeira classe cujo acumulado passa de k
+    valor_inferior = classes[np.searchsorted(acumulado, inferior, side='right')]
+    valor_superior = classes[np.searchsorted(acumulado, superior, side='right')]
+    return float(valor_inferior + (valor_superior - valor_inferior) * (posicao - inferior))
@@ -0,0 +1,240 @@
+import matplotlib
+matplotlib.use('Agg')  # Sem janela: os gráficos são apenas salvos em arquivo
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import matplotlib.pyplot as plt
+import analises
+from carregador import preparar_arquivo
+from desempenho import Perfil, exportar_trace, formatar_perfil
+from exportacao import FORMATOS, destino_formato, exportar_dados
+from fontes import fonte_existe
+from tarefas import Tarefa, etapa
+from graficos import graficos_gerais, dashboard_periodo, dashboard_pais, dashboard_comparacao, dashboard_varios
+
+# Modo em lote: executa as mesmas análises das janelas (dados.py, dadosano.py, dadospais.py e
+# dadoscomparapais.py) sem interface gráfica, para vários países e intervalos de anos de uma vez,
+# distribuindo os trabalhos entre processos e salvando os gráficos em PNG e as estatísticas em CSV
+#
+# Exemplo:
+#   python analise_lote.py atletas.csv --anos 1960-1990 1992-2016 --periodo --paises Brasil China \
+#       --comparar Brasil:Argentina --comparar-varios Brasil,Argentina,Chile,Uruguai --saida relatorios
+
+# Função para converter um intervalo de anos no formato INICIO-FIM
+def intervalo_anos(texto):
+    partes = texto.split('-')
+    if len(partes) != 2 or not all(parte.strip().isdigit() for parte in partes):
+        raise argparse.ArgumentTypeError(f"Intervalo de anos inválido: '{texto}' (use INICIO-FIM, por exemplo 1960-1990)")
+    return int(partes[0]), int(partes[1])
+
+# Função para converter um par de países no formato PAIS1:PAIS2
+def par_paises(texto):
+    partes = texto.split(':')
+    if len(partes) != 2 or not all(partes):
+        raise argparse.ArgumentTypeError(f"Par de países inválido: '{texto}' (use PAIS1:PAIS2)")
+    return partes[0], partes[1]
+
+# Função para converter uma lista de países no formato PAIS1,PAIS2,...
+def lista_paises(texto):
+    paises = [pais.strip() for pais in texto.split(',')]
+    if len(paises) < 2 or not all(paises):
+        raise argparse.ArgumentTypeError(f"Lista de países inválida: '{texto}' (use PAIS1,PAIS2,...)")
+    return paises
+
+# Função para montar um nome de arquivo seguro a partir de suas partes
+def nome_arquivo(*partes):
+    return '_'.join(re.sub(r'[^\w.-]+', '-', str(parte)).strip('-') for parte in partes)
+
+# Função para salvar uma figura em PNG e liberar a memória dela
+def salvar_figura(figura, destino):
+    figura.savefig(destino, dpi=100)
+    plt.close(figura)
+    return destino
+
+# Linha da tabela de estatísticas para o resultado de uma análise
+def _linha_estatisticas(analise, pais, ano_inicio, ano_fim, resultado, graficos):
+    return {
+        'analise': analise,
+        'pais': pais,
+        'ano_inicio': ano_inicio,
+        'ano_fim': ano_fim,
+        'contagem': resultado['contagem'],
+        'media_altura': resultado['media_altura'],
+        'desvio_padrao_altura': resultado['desvio_padrao_altura'],
+        'media_peso': resultado['media_peso'],
+        'desvio_padrao_peso': resultado['desvio_padrao_peso'],
+        'graficos': ';'.join(graficos),
+    }
+
+# Função executada em um processo separado para cada trabalho: roda a análise, salva os gráficos
+# (e opcionalmente os dados limpos, no formato pedido) e devolve as linhas da tabela de estatísticas e o perfil de desempenho
+# (None sem --perfil)
+def executar_trabalho(trabalho):
+    tipo, caminho_arquivo, parametros, pasta, formato_dados, medir = trabalho
+    tarefa = Tarefa(perfil=Perfil(memoria=medir == 'memoria')) if medir else None
+    try:
+        linhas = _executar_analise(tipo, caminho_arquivo, parametros, pasta, formato_dados, tarefa)
+    finally:
+        if tarefa is not None:
+            tarefa.perfil.encerrar()
+    return linhas, tarefa.perfil if tarefa is not None else None
+
+def _executar_analise(tipo, caminho_arquivo, parametros, pasta, formato_dados, tarefa):
+    if tipo == 'geral':
+        resultado = analises.analisar_geral(caminho_arquivo, tarefa)
+        etapa(tarefa, "Desenhando os gráficos")
+        graficos = [salvar_figura(figura, os.path.join(pasta, nome_arquivo('geral', nome) + '.png'))
+                    for nome, figura in graficos_gerais(resultado)]
+        base = nome_arquivo('geral')
+        linhas = [_linha_estatisticas('geral', None, None, None, resultado, graficos)]
+
+    elif tipo == 'periodo':
+        ano_inicio, ano_fim = parametros
+        resultado = analises.analisar_periodo(caminho_arquivo, ano_inicio, ano_fim, tarefa)
+        base = nome_arquivo('periodo', f'{ano_inicio}-{ano_fim}')
+        etapa(tarefa, "Desenhando os gráficos")
+        graficos = [salvar_figura(dashboard_periodo(resultado), os.path.join(pasta, base + '.png'))]
+        linhas = [_linha_estatisticas('periodo', None, ano_inicio, ano_fim, resultado, graficos)]
+
+    elif tipo == 'pais':
+        pais, ano_inicio, ano_fim = parametros
+        resultado = analises.analisar_pais(caminho_arquivo, pais, ano_inicio, ano_fim, tarefa)
+        base = nome_arquivo('pais', pais, f'{ano_inicio}-{ano_fim}')
+        etapa(tarefa, "Desenhando os gráficos")
+        graficos = [salvar_figura(dashboard_pais(resultado), os.path.join(pasta, base + '.png'))]
+        linhas = [_linha_estatisticas('pais', pais, ano_inicio, ano_fim, resultado, graficos)]
+
+    else:
+        if tipo == 'comparacao':
+            pais_1, pais_2, ano_inicio, ano_fim = parametros
+            resultado = analises.comparar_paises(caminho_arquivo, pais_1, pais_2, ano_inicio, ano_fim, tarefa)
+            analise = f'comparacao {pais_1}:{pais_2}'
+            base = nome_arquivo('comparacao', pais_1, pais_2, f'{ano_inicio}-{ano_fim}')
+            etapa(tarefa, "Desenhando os gráficos")
+            figura = dashboard_comparacao(resultado)
+        else:
+            paises, ano_inicio, ano_fim = parametros
+            resultado = analises.comparar_varios_paises(caminho_arquivo, paises, ano_inicio, ano_fim, tarefa)
+            analise = f'comparacao {",".join(paises)}'
+            base = nome_arquivo('comparacao', '-'.join(paises), f'{ano_inicio}-{ano_fim}')
+            etapa(tarefa, "Desenhando os gráficos")
+            figura = dashboard_varios(resultado)
+        graficos = [] if figura is None else [salvar_figura(figura, os.path.join(pasta, base + '.png'))]
+
+        # Testes entre os pares de países
+        etapa(tarefa, "Salvando os resultados")
+        resultado['testes'].to_csv(os.path.join(pasta, f'testes_{base}.csv'), index=False)
+        linhas = []
+        for pais, estatisticas in resultado['resumo'].iterrows():
+            linhas.append({
+                'analise': analise,
+                'pais': pais,
+                'ano_inicio': ano_inicio,
+                'ano_fim': ano_fim,
+                'contagem': int(estatisticas['contagem']),
+                'media_altura': estatisticas['altura_media'],
+                'desvio_padrao_altura': estatisticas['altura_desvio'],
+                'media_peso': estatisticas['peso_media'],
+                'desvio_padrao_peso': estatisticas['peso_desvio'],
+                'graficos': ';'.join(graficos),
+            })
+        return linhas
+
+    if formato_dados is not None:
+        destino = os.path.join(pasta, destino_formato(f'dados_limpos_{base}', formato_dados))
+        exportar_dados(resultado['dados'], destino, formato_dados, tarefa)
+    return linhas
+
+# Função para montar a lista de trabalhos pedidos na linha de comando
+def montar_trabalhos(argumentos):
+    caminho = os.path.abspath(argumentos.arquivo)
+    medir = 'memoria' if argumentos.perfil_memoria else argumentos.perfil
+    formato_dados = argumentos.formato if argumentos.dados_limpos else None
+    comum = (argumentos.saida, formato_dados, medir)
+    trabalhos = []
+    if argumentos.geral:
+        trabalhos.append(('geral', caminho, None) + comum)
+    for ano_inicio, ano_fim in argumentos.anos:
+        if argumentos.periodo:
+            trabalhos.append(('periodo', caminho, (ano_inicio, ano_fim)) + comum)
+        for pais in argumentos.paises:
+            trabalhos.append(('pais', caminho, (pais, ano_inicio, ano_fim)) + comum)
+        for pais_1, pais_2 in argumentos.comparar:
+            trabalhos.append(('comparacao', caminho, (pais_1, pais_2, ano_inicio, ano_fim)) + comum)
+        for paises in argumentos.comparar_varios:
+            trabalhos.append(('varios', caminho, (paises, ano_inicio, ano_fim)) + comum)
+    return trabalhos
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Análise de dados olímpicos em lote, sem interface gráfica.")
+    parser.add_argument('arquivo', help="arquivo CSV com os dados dos atletas, ou uma pasta ou padrão (entre aspas, "
+                                        "por exemplo \"dados/*.csv\") com vários CSVs")
+    parser.add_argument('--saida', default='relatorios', help="pasta onde os gráficos e tabelas são salvos")
+    parser.add_argument('--anos', nargs='+', type=intervalo_anos, default=[], metavar='INICIO-FIM',
+                        help="intervalos de anos analisados (por exemplo 1960-1990)")
+    parser.add_argument('--geral', action='store_true', help="análise de todos os atletas (dados.py)")
+    parser.add_argument('--periodo', action='store_true', help="análise de cada intervalo de anos (dadosano.py)")
+    parser.add_argument('--paises', nargs='+', default=[], metavar='PAIS',
+                        help="países analisados em cada intervalo de anos (dadospais.py)")
+    parser.add_argument('--comparar', nargs='+', type=par_paises, default=[], metavar='PAIS1:PAIS2',
+                        help="pares de países comparados em cada intervalo de anos (dadoscomparapais.py)")
+    parser.add_argument('--comparar-varios', nargs='+', type=lista_paises, default=[], metavar='PAIS1,PAIS2,...',
+                        help="grupos de países comparados entre si em cada intervalo de anos, com testes entre os pares")
+    parser.add_argument('--processos', type=int, default=None, help="número de processos (padrão: um por CPU)")
+    parser.add_argument('--dados-limpos', action='store_true', help="salvar também os dados limpos de cada análise")
+    parser.add_argument('--formato', choices=list(FORMATOS), default='csv',
+                        help="formato dos dados limpos: " + ', '.join(f"{formato} ({descricao})"
+                                                                        for formato, descricao in FORMATOS.items()))
+    parser.add_argument('--perfil', action='store_true',
+                        help="medir o tempo e as linhas de cada etapa e salvar o trace (perfil.json, "
+                             "formato do Chrome: chrome://tracing ou https://ui.perfetto.dev)")
+    parser.add_argument('--perfil-memoria', action='store_true',
+                        help="como --perfil, medindo também o pico de memória de cada etapa (mais lento)")
+    return parser
+
+def main(argv=None):
+    parser = criar_parser()
+    argumentos = parser.parse_args(argv)
+
+    if not fonte_existe(argumentos.arquivo):
+        parser.error(f"O arquivo não foi encontrado: {argumentos.arquivo}")
+    if (argumentos.periodo or argumentos.paises or argumentos.comparar or argumentos.comparar_varios) and not argumentos.anos:
+        parser.error("--periodo, --paises, --comparar e --comparar-varios precisam de --anos")
+    trabalhos = montar_trabalhos(argumentos)
+    if not trabalhos:
+        parser.error("nenhuma análise pedida (use --geral, --periodo, --paises, --comparar ou --comparar-varios)")
+
+    os.makedirs(argumentos.saida, exist_ok=True)
+
+    # Converter o CSV (ou os CSVs da pasta, em paralelo) uma única vez antes de distribuir os trabalhos, para que
+    # cada processo leia os arquivos binários
+    preparar_arquivo(argumentos.arquivo)
+
+    linhas = []
+    perfis = []
+    with ProcessPoolExecutor(max_workers=argumentos.processos) as executor:
+        for trabalho, (linhas_trabalho, perfil) in zip(trabalhos, executor.map(executar_trabalho, trabalhos)):
+            linhas.extend(linhas_trabalho)
+            for linha in linhas_trabalho:
+                print(f"{linha['analise']} {linha['pais'] or ''} {linha['ano_inicio'] or ''}-{linha['ano_fim'] or ''}: "
+                      f"{linha['contagem']} atletas, {linha['graficos'] or 'sem gráficos'}")
+            if perfil is not None:
+                nome = ' '.join([trabalho[0]] + [str(parametro) for parametro in trabalho[2] or ()])
+                perfis.append((nome, perfil))
+                print(formatar_perfil(perfil))
+
+    if perfis:
+        destino = exportar_trace(perfis, os.path.join(argumentos.saida, 'perfil.json'))
+        print(f"Perfil de desempenho salvo em {destino}")
+
+    destino = os.path.join(argumentos.saida, 'estatisticas.csv')
+    pd.DataFrame(linhas).astype({'ano_inicio': 'Int64', 'ano_fim': 'Int64'}).to_csv(destino, index=False)
+    print(f"Estatísticas salvas em {destino}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+from carregador import carregar_dados
+from correlacao import obter_covariancias
+from cubo_medalhas import CuboMedalhas
+from indice import obter_indice
+from outliers import mascara_limpeza, COLUNAS_OUTLIERS
+from densidade import distribuicao_valores
+from incremental import obter_janela
+from comparacao import comparar_medidas, medalhas_por_sexo, REAMOSTRAGENS
+from tarefas import etapa, registrar_linhas
+
+# Etapas de carga, filtragem, limpeza e estatísticas de cada script de análise, sem dependência da interface
+# gráfica: podem rodar em segundo plano (com uma Tarefa para cancelamento e progresso) ou direto, sem janela
+
+# Função para remover valores ausentes e outliers de altura e peso de uma seleção dos dados carregados
+# (os limites vêm da janela de anos da mesma seleção, sem rever as linhas). A seleção pode ser indicada por uma
+# máscara sobre os dados, para que filtro, valores ausentes e outliers gerem uma única cópia das linhas que ficam
+def limpar_selecao(selecao, limites, tarefa=None, mascara=None):
+    etapa(tarefa, "Removendo valores ausentes e outliers")
+    registrar_linhas(tarefa, entrada=len(selecao) if mascara is None else int(mascara.sum()))
+    validas = mascara_limpeza(selecao, dict(zip(COLUNAS_OUTLIERS, limites)), mascara=mascara)
+    limpos = selecao[validas]
+    registrar_linhas(tarefa, saida=len(limpos))
+    return limpos
+
+# Função para montar o resultado de uma análise a partir da seleção limpa e da janela de anos: contagem, média,
+# desvio padrão, distribuição da altura e medalhas saem das contagens da janela (a matriz de correlação e as
+# medalhas por país, passadas em extras, saem das covariâncias por partição de correlacao.py e de medalhas_limpas);
+# 'anos' traz o primeiro e o último ano com dados (seleções com os mesmos anos efetivos têm os mesmos gráficos)
+def _resultado_janela(dados_limpos, janela, limites, **extras):
+    return {
+        'dados': dados_limpos,
+        'anos': janela.anos_efetivos,
+        'distribuicao_altura': janela.distribuicao_altura(limites),
+        'medalhas': janela.medalhas(limites),
+        **extras,
+        **janela.estatisticas(limites),
+    }
+
+# Função para contar as medalhas de cada país na seleção limpa, em ordem decrescente: o cubo de medalhas é montado
+# sobre as linhas que ficaram na limpeza, como as demais estatísticas do painel (o cubo de todo o arquivo, usado na
+# comparação, inclui atletas sem altura ou peso e os outliers)
+def medalhas_limpas(dados_limpos):
+    return CuboMedalhas.construir(dados_limpos).maiores('pais')
+
+# Função para montar o texto com a quantidade de medalhas de cada tipo
+def formatar_medalhas(medalhas):
+    return ', '.join(f'{tipo}: {quantidade}' for tipo, quantidade in medalhas.items())
+
+# Análise de todos os atletas (dados.py)
+def analisar_geral(caminho_arquivo, tarefa=None):
+    etapa(tarefa, "Carregando os dados")
+    dados = carregar_dados(caminho_arquivo)
+    registrar_linhas(tarefa, saida=len(dados))
+
+    # Compreensão Inicial dos Dados
+    dados.info()
+
+    janela = obter_janela(dados)
+    limites = janela.limites()
+    dados_limpos = limpar_selecao(dados, limites, tarefa)
+    etapa(tarefa, "Calculando as estatísticas")
+    registrar_linhas(tarefa, entrada=len(dados_limpos))
+    correlacao = obter_covariancias(dados).correlacao(limites=limites)
+    medalhas_pais = medalhas_limpas(dados_limpos)
+    return _resultado_janela(dados_limpos, janela, limites, correlacao=correlacao, medalhas_pais=medalhas_pais)
+
+# Análise dos atletas de um intervalo de anos (dadosano.py)
+def analisar_periodo(caminho_arquivo, ano_inicio, ano_fim, tarefa=None):
+    etapa(tarefa, "Carregando os dados")
+    dados = carregar_dados(caminho_arquivo)
+    registrar_linhas(tarefa, saida=len(dados))
+
+    # Atualizar a janela de anos (somente os anos que entraram ou saíram desde a última análise)
+    etapa(tarefa, "Filtrando os anos")
+    janela = obter_janela(dados, None, ano_inicio, ano_fim)
+    limites = janela.limites()
+    anos = dados['ano'].to_numpy()
+    no_periodo = (anos >= ano_inicio) & (anos <= ano_fim)
+    registrar_linhas(tarefa, len(dados), int(no_periodo.sum()))
+    dados_limpos = limpar_selecao(dados, limites, tarefa, no_periodo)
+    etapa(tarefa, "Calculando as estatísticas")
+    registrar_linhas(tarefa, entrada=len(dados_limpos))
+    correlacao = obter_covariancias(dados).correlacao(None, ano_inicio, ano_fim, limites)
+    medalhas_pais = medalhas_limpas(dados_limpos)
+    return _resultado_janela(dados_limpos, janela, limites, correlacao=correlacao, medalhas_pais=medalhas_pais)
+
+# Análise dos atletas de um país em um intervalo de anos (dadospais.py)
+def analisar_pais(caminho_arquivo, pais, ano_inicio, ano_fim, tarefa=None):
+    etapa(tarefa, "Carregando os dados")
+    dados = carregar_dados(caminho_arquivo)
+    registrar_linhas(tarefa, saida=len(dados))
+
+    # Atualizar a janela de anos do país (somente os anos que entraram ou saíram desde a última análise do país)
+    etapa(tarefa, "Filtrando o país e os anos")
+    janela = obter_janela(dados, pais, ano_inicio, ano_fim)
+    limites = janela.limites()
+    selecao = obter_indice(dados).selecionar(pais, ano_inicio, ano_fim)
+    registrar_linhas(tarefa, len(dados), len(selecao))
+    dados_limpos = limpar_selecao(selecao, limites, tarefa)
+    dados_limpos = dados_limpos.assign(pais=dados_limpos['pais'].cat.remove_unused_categories())
+    etapa(tarefa, "Calculando as estatísticas")
+    registrar_linhas(tarefa, entrada=len(dados_limpos))
+    correlacao = obter_covariancias(dados).correlacao([pais], ano_inicio, ano_fim, limites)
+    medalhas_pais = medalhas_limpas(dados_limpos)
+    return _resultado_janela(dados_limpos, janela, limites, pais=pais, correlacao=correlacao,
+                             medalhas_pais=medalhas_pais)
+
+# Função para comparar uma lista de países nos dados carregados: devolve a seleção com altura e peso preenchidos
+# (todos os países juntos) e o resultado da comparação
+def _comparar_selecao(dados, paises, ano_inicio, ano_fim, reamostragens, tarefa=None):
+    paises = list(dict.fromkeys(paises))
+
+    # Uma única seleção com as linhas de todos os países nos anos especificados
+    etapa(tarefa, "Filtrando os países e os anos")
+    selecao = obter_indice(dados).selecionar_varios(paises, ano_inicio, ano_fim)
+    medidas = selecao.dropna(subset=['altura', 'peso'])
+    registrar_linhas(tarefa, len(dados), len(medidas))
+
+    # Estatísticas, intervalos de confiança e testes entre todos os pares de países, de uma vez
+    resumo, testes = comparar_medidas(medidas, paises, reamostragens=reamostragens, tarefa=tarefa)
+    com_dados = resumo.index[resumo['contagem'] > 0]
+    testes = testes[testes['pais_a'].isin(com_dados) & testes['pais_b'].isin(com_dados)].reset_index(drop=True)
+
+    # Distribuições da altura de cada país, dos valores exatos da seleção
+    alturas = medidas.groupby('pais', observed=True)['altura']
+    distribuicoes = {pais: distribuicao_valores(alturas.get_group(pais)) for pais in com_dados}
+    return medidas, {
+        'paises': paises,
+        'anos': (ano_inicio, ano_fim),
+        'resumo': resumo.loc[com_dados],
+        'testes': testes,
+        'distribuicoes': distribuicoes,
+        'medalhas_sexo': medalhas_por_sexo(dados, paises, ano_inicio, ano_fim),
+    }
+
+# Comparação dos atletas de vários países em um intervalo de anos (modo de vários países do dadoscomparapais.py)
+def comparar_varios_paises(caminho_arquivo, paises, ano_inicio, ano_fim, tarefa=None, reamostragens=REAMOSTRAGENS):
+    etapa(tarefa, "Carregando os dados")
+    dados = carregar_dados(caminho_arquivo)
+    registrar_linhas(tarefa, saida=len(dados))
+    return _comparar_selecao(dados, paises, ano_inicio, ano_fim, reamostragens, tarefa)[1]
+
+# Comparação dos atletas de dois países em um intervalo de anos (dadoscomparapais.py)
+def comparar_paises(caminho_arquivo, pais_1, pais_2, ano_inicio, ano_fim, tarefa=None, reamostragens=REAMOSTRAGENS):
+    etapa(tarefa, "Carregando os dados")
+    dados = carregar_dados(caminho_arquivo)
+    registrar_linhas(tarefa, saida=len(dados))
+    medidas, comparacao = _comparar_selecao(dados, [pais_1, pais_2], ano_inicio, ano_fim, reamostragens, tarefa)
+
+    # Medalhas dos dois países por sexo em todos os anos (cubo de medalhas)
+    medalhas_sexo = medalhas_por_sexo(dados, [pais_1, pais_2])
+    distribuicoes = comparacao['distribuicoes']
+    return {
+        'pais_1': pais_1,
+        'pais_2': pais_2,
+        'dados_pais_1': medidas[medidas['pais'] == pais_1],
+        'dados_pais_2': medidas[medidas['pais'] == pais_2],
+        'distribuicao_pais_1': distribuicoes.get(pais_1),
+        'distribuicao_pais_2': distribuicoes.get(pais_2),
+        'medalhas_sexo': medalhas_sexo,
+        'resumo': comparacao['resumo'],
+        'testes': comparacao['testes'],
+    }
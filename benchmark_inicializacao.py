@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Medição do tempo de abertura de cada script: cada execução roda em um processo novo (como ao abrir o programa)
+# e mede o tempo desde o início do processo até a janela ser desenhada pela primeira vez, além das bibliotecas
+# pesadas que já estavam carregadas nesse momento. Sem tela disponível (sem DISPLAY) mede-se somente a importação
+# do script, sem criar a janela. O modo em lote (analise_lote.py) não tem janela e é medido sempre pela importação
+#
+# Exemplo:
+#   python benchmark_inicializacao.py --repeticoes 5
+
+# Scripts medidos
+SCRIPTS = ['dados.py', 'dadosano.py', 'dadospais.py', 'dadoscomparapais.py', 'listapaises.py', 'analise_lote.py']
+
+# Bibliotecas cuja importação pesa na abertura
+BIBLIOTECAS_PESADAS = ['pandas', 'pyarrow', 'matplotlib', 'seaborn', 'scipy']
+
+# Código executado em cada processo medido: com janela, o mainloop é trocado por uma função que desenha a janela,
+# registra o tempo e a fecha; sem janela, o script é apenas importado (o código das janelas fica sob __main__)
+MEDICAO = '''
+import json, runpy, sys, time
+inicio = time.perf_counter()
+script, com_janela, pesadas = sys.argv[1], sys.argv[2] == '1', sys.argv[3].split(',')
+
+def registrar():
+    print(json.dumps({'tempo': time.perf_counter() - inicio,
+                      'carregadas': [nome for nome in pesadas if nome in sys.modules]}))
+
+if com_janela:
+    import tkinter
+    def medir(janela, n=0):
+        janela.update()
+        registrar()
+        janela.destroy()
+    tkinter.Tk.mainloop = medir
+    runpy.run_path(script, run_name='__main__')
+else:
+    runpy.run_path(script, run_name='benchmark')
+    registrar()
+'''
+
+# Função para saber se há uma tela disponível para abrir as janelas
+def tela_disponivel():
+    if sys.platform.startswith('win') or sys.platform == 'darwin':
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+# Função para medir uma abertura de um script em um processo novo: (tempo até a janela ou fim da importação,
+# tempo total do processo, bibliotecas carregadas)
+def medir_script(script, com_janela):
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    comando = [sys.executable, '-c', MEDICAO, os.path.join(pasta, script), '1' if com_janela else '0',
+               ','.join(BIBLIOTECAS_PESADAS)]
+    inicio = time.perf_counter()
+    saida = subprocess.run(comando, cwd=pasta, capture_output=True, text=True)
+    total = time.perf_counter() - inicio
+    if saida.returncode != 0:
+        raise RuntimeError(f"Falha ao medir {script}:\n{saida.stderr}")
+    medida = json.loads(saida.stdout.strip().splitlines()[-1])
+    return medida['tempo'], total, medida['carregadas']
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Tempo de abertura de cada script do programa.")
+    parser.add_argument('scripts', nargs='*', default=SCRIPTS, help="scripts medidos (padrão: todos)")
+    parser.add_argument('--repeticoes', type=int, default=5, help="número de aberturas medidas de cada script")
+    parser.add_argument('--sem-janela', action='store_true', help="medir somente a importação, mesmo com tela")
+    return parser
+
+def main(argv=None):
+    argumentos = criar_parser().parse_args(argv)
+    com_tela = tela_disponivel() and not argumentos.sem_janela
+    if not com_tela:
+        print("Medindo somente a importação dos scripts (sem tela disponível ou --sem-janela)")
+
+    print(f"{'script':<22}{'medida':<12}{'mediana (s)':>12}{'mínimo (s)':>12}{'processo (s)':>14}  bibliotecas carregadas")
+    for script in argumentos.scripts:
+        com_janela = com_tela and script != 'analise_lote.py'
+        medidas = [medir_script(script, com_janela) for _ in range(argumentos.repeticoes)]
+        tempos = [tempo for tempo, _, _ in medidas]
+        totais = [total for _, total, _ in medidas]
+        carregadas = ', '.join(medidas[-1][2]) or '-'
+        print(f"{script:<22}{'janela' if com_janela else 'importação':<12}{statistics.median(tempos):>12.3f}"
+              f"{min(tempos):>12.3f}{statistics.median(totais):>14.3f}  {carregadas}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
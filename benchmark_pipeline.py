@@ -0,0 +1,291 @@
+import matplotlib
+matplotlib.use('Agg')  # Sem janela: os gráficos são desenhados apenas em memória
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+from desempenho import Perfil
+from tarefas import Tarefa, etapa
+
+# Benchmark das análises de cada script em várias escalas, sem interface gráfica: gera (ou reaproveita) arquivos
+# sintéticos com as colunas da base das Olimpíadas (dados_sinteticos.py) e mede cada etapa do caminho de cada
+# janela (carga, filtro, limpeza, estatísticas e gráficos). As etapas são as mesmas exibidas na barra de progresso
+# das janelas: o benchmark passa para as análises uma Tarefa com um perfil de desempenho (desempenho.py), sem
+# medir a memória, que deixaria as análises mais lentas.
+#
+# Cada pipeline roda primeiro "fria" (como na primeira análise de uma sessão: sem os dados carregados nem as
+# estruturas derivadas em memória) e depois "quente" (a mesma análise repetida na sessão). As imagens em cache são
+# descartadas antes de cada execução, para medir sempre o desenho dos gráficos. Os resultados são gravados em JSON;
+# com --comparar, as etapas que ficaram mais lentas que em um resultado anterior são listadas (código de saída 1)
+#
+# Exemplo:
+#   python benchmark_pipeline.py --linhas 10000 100000 1000000 --saida benchmark.json
+#   python benchmark_pipeline.py --linhas 10000 100000 1000000 --comparar benchmark.json
+
+# Escalas padrão (número de linhas dos arquivos sintéticos); aceita até dezenas de milhões de linhas
+LINHAS_PADRAO = [10_000, 100_000, 1_000_000]
+
+# Seleção usada pelas análises de período, país e comparação
+ANOS = (1960, 2000)
+PAIS = 'Brasil'
+COMPARACAO = ('Brasil', 'Argentina')
+NUMERO_PAISES_VARIOS = 20
+
+# Etapa que vai do início da análise até a primeira etapa informada por ela (importação dos módulos de análise)
+INICIO = "Iniciando"
+
+# Categoria de cada etapa, pelo começo da descrição exibida na janela
+CATEGORIAS = [
+    (INICIO, 'preparacao'),
+    ('Convertendo', 'carga'),
+    ('Carregando', 'carga'),
+    ('Filtrando', 'filtro'),
+    ('Removendo', 'limpeza'),
+    ('Calculando', 'estatisticas'),
+    ('Contando', 'estatisticas'),
+    ('Listando', 'estatisticas'),
+    ('Desenhando', 'graficos'),
+    ('Montando', 'graficos'),
+]
+
+# Função para obter a duração de cada etapa de um perfil (somada quando a etapa aparece mais de uma vez), na ordem
+def duracoes(perfil):
+    duracoes = {}
+    for registro in perfil.etapas():
+        duracoes[registro['etapa']] = duracoes.get(registro['etapa'], 0.0) + registro['segundos']
+    return duracoes
+
+# Função para obter a categoria de uma etapa
+def categoria(etapa):
+    for inicio, nome in CATEGORIAS:
+        if etapa.startswith(inicio):
+            return nome
+    return 'outros'
+
+# Função para desenhar os gráficos da análise geral em memória (como o dados.py, que os exibe um por vez)
+def _desenhar_gerais(resultado, tarefa):
+    import matplotlib.pyplot as plt
+    from graficos import graficos_gerais
+
+    etapa(tarefa, "Desenhando os gráficos")
+    for _, figura in graficos_gerais(resultado):
+        figura.savefig(io.BytesIO(), format='png')
+        plt.close(figura)
+
+# Pipelines medidos: nome -> função(caminho do arquivo, cronômetro), na ordem de execução
+def _pipeline_listapaises(caminho, tarefa):
+    from inicio_rapido import preparar_e_listar
+    preparar_e_listar(caminho, tarefa)
+
+def _pipeline_dados(caminho, tarefa):
+    from analises import analisar_geral
+    _desenhar_gerais(analisar_geral(caminho, tarefa), tarefa)
+
+def _pipeline_dadosano(caminho, tarefa):
+    from analises import analisar_periodo
+    from operacoes import filtros_dashboard
+    from paineis import renderizar_dashboard
+    resultado = analisar_periodo(caminho, *ANOS, tarefa)
+    renderizar_dashboard('periodo', caminho, filtros_dashboard(resultado), resultado, tarefa)
+
+def _pipeline_dadospais(caminho, tarefa):
+    from analises import analisar_pais
+    from operacoes import filtros_dashboard
+    from paineis import renderizar_dashboard
+    resultado = analisar_pais(caminho, PAIS, *ANOS, tarefa)
+    renderizar_dashboard('pais', caminho, filtros_dashboard(resultado, PAIS), resultado, tarefa)
+
+def _pipeline_dadoscomparapais(caminho, tarefa):
+    from analises import comparar_paises
+    from graficos import dashboard_disponivel
+    from paineis import renderizar_dashboard
+    resultado = comparar_paises(caminho, *COMPARACAO, *ANOS, tarefa)
+    if dashboard_disponivel('comparacao', resultado):
+        renderizar_dashboard('comparacao', caminho, COMPARACAO + ANOS, resultado, tarefa)
+
+def _pipeline_comparacao_varios(caminho, tarefa):
+    from analises import comparar_varios_paises
+    from dados_sinteticos import PAISES
+    from paineis import renderizar_dashboard
+    paises = PAISES[:NUMERO_PAISES_VARIOS]
+    resultado = comparar_varios_paises(caminho, paises, *ANOS, tarefa)
+    renderizar_dashboard('varios', caminho, tuple(paises) + ANOS, resultado, tarefa)
+
+def _pipeline_remove_outliers(caminho, tarefa):
+    from carregador import carregar_dados
+    from outliers import remove_outliers, MODO_EXATO
+    etapa(tarefa, "Carregando os dados")
+    dados = carregar_dados(caminho).dropna(subset=['altura', 'peso'])
+    etapa(tarefa, "Removendo outliers (aproximado)")
+    remove_outliers(remove_outliers(dados, 'altura'), 'peso')
+    etapa(tarefa, "Removendo outliers (exato)")
+    remove_outliers(remove_outliers(dados, 'altura', MODO_EXATO), 'peso', MODO_EXATO)
+
+PIPELINES = {
+    'listapaises': _pipeline_listapaises,
+    'dados': _pipeline_dados,
+    'dadosano': _pipeline_dadosano,
+    'dadospais': _pipeline_dadospais,
+    'dadoscomparapais': _pipeline_dadoscomparapais,
+    'comparacao_varios': _pipeline_comparacao_varios,
+    'remove_outliers': _pipeline_remove_outliers,
+}
+
+# Função para descartar o que uma sessão nova ainda não teria em memória (dados carregados, estruturas derivadas,
+# dicionários de países) e as imagens em cache; na primeira abertura do arquivo (listapaises) também os arquivos
+# binário e do dicionário de países gerados a partir do CSV
+def _esfriar(caminho, primeira_abertura):
+    import gc
+    import carregador
+    import cache_disco
+    import dicionario_paises
+    import paineis
+
+    carregador.limpar_cache()
+    dicionario_paises._cache_dicionarios.clear()
+    paineis.limpar_cache()
+    cache_disco.limpar_cache()
+    if primeira_abertura:
+        for arquivo in (carregador.caminho_binario(caminho), dicionario_paises.caminho_dicionario(caminho)):
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+    gc.collect()
+
+# Função para medir um pipeline em um arquivo: devolve uma medida por etapa de cada execução
+def medir_pipeline(nome, caminho, linhas, repeticao):
+    import paineis
+    import cache_disco
+
+    medidas = []
+    for execucao in ('fria', 'quente'):
+        if execucao == 'fria':
+            _esfriar(caminho, nome == 'listapaises')
+        else:
+            paineis.limpar_cache()
+            cache_disco.limpar_cache()
+
+        perfil = Perfil()
+        perfil.iniciar_etapa(INICIO)
+        tarefa = Tarefa(perfil=perfil)
+        inicio = time.perf_counter()
+        # As análises imprimem o resumo dos dados (dados.info()) e avisos das bibliotecas: não misturar com o relatório
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            PIPELINES[nome](caminho, tarefa)
+        total = time.perf_counter() - inicio
+        perfil.encerrar()
+
+        for descricao, segundos in duracoes(perfil).items():
+            medidas.append({'linhas': linhas, 'pipeline': nome, 'execucao': execucao, 'repeticao': repeticao,
+                            'etapa': descricao, 'categoria': categoria(descricao), 'segundos': segundos})
+        medidas.append({'linhas': linhas, 'pipeline': nome, 'execucao': execucao, 'repeticao': repeticao,
+                        'etapa': 'total', 'categoria': 'total', 'segundos': total})
+    return medidas
+
+# Função para descrever o ambiente da medição (gravado junto com os resultados)
+def metadados():
+    import numpy
+    import pandas
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'processadores': os.cpu_count(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+# Função para resumir as medidas: mediana dos segundos por (linhas, pipeline, execução, etapa)
+def resumir_medidas(medidas):
+    grupos = {}
+    for medida in medidas:
+        chave = (medida['linhas'], medida['pipeline'], medida['execucao'], medida['etapa'])
+        grupos.setdefault(chave, []).append(medida['segundos'])
+    return {chave: statistics.median(segundos) for chave, segundos in grupos.items()}
+
+# Função para listar as etapas mais lentas que no resultado anterior: (chave, antes, agora)
+# (etapas que levam menos de minimo segundos nas duas medições são ignoradas, por serem dominadas por ruído)
+def regressoes(anteriores, atuais, tolerancia, minimo=0.01):
+    lentas = []
+    for chave, agora in atuais.items():
+        antes = anteriores.get(chave)
+        if antes is None or max(antes, agora) < minimo:
+            continue
+        if agora > antes * (1 + tolerancia):
+            lentas.append((chave, antes, agora))
+    return lentas
+
+# Função para ler as medidas de um resultado gravado
+def ler_resultado(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)['medidas']
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Benchmark das análises com dados sintéticos em várias escalas.")
+    parser.add_argument('--linhas', nargs='+', type=int, default=LINHAS_PADRAO,
+                        help="números de linhas dos arquivos sintéticos (por exemplo 10000 1000000 50000000)")
+    parser.add_argument('--pipelines', nargs='+', choices=list(PIPELINES), default=list(PIPELINES),
+                        help="pipelines medidos (padrão: todos)")
+    parser.add_argument('--repeticoes', type=int, default=3, help="número de medições de cada pipeline")
+    parser.add_argument('--pasta-dados', default=os.path.join(tempfile.gettempdir(), 'olimpiadas_benchmark'),
+                        help="pasta onde os arquivos sintéticos são gerados e reaproveitados")
+    parser.add_argument('--semente', type=int, default=0, help="semente dos dados sintéticos")
+    parser.add_argument('--saida', default='benchmark.json', help="arquivo JSON com os resultados")
+    parser.add_argument('--comparar', metavar='ANTERIOR', help="resultado anterior para procurar regressões")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="aumento relativo de tempo considerado regressão (padrão: 0.2 = 20%%)")
+    return parser
+
+def main(argv=None):
+    argumentos = criar_parser().parse_args(argv)
+
+    # Arquivos binários, dicionários e resultados do benchmark ficam em um cache próprio, apagado no final
+    # (precisa ser definido antes de importar os módulos de análise e de iniciar os processos dos gráficos)
+    with tempfile.TemporaryDirectory(prefix='olimpiadas_cache_') as cache:
+        os.environ['OLIMPIADAS_CACHE'] = cache
+        from dados_sinteticos import obter_csv
+
+        medidas = []
+        for linhas in argumentos.linhas:
+            print(f"Preparando o arquivo com {linhas} linhas...", flush=True)
+            caminho = obter_csv(linhas, argumentos.pasta_dados, argumentos.semente)
+            for nome in argumentos.pipelines:
+                for repeticao in range(argumentos.repeticoes):
+                    medidas.extend(medir_pipeline(nome, caminho, linhas, repeticao))
+                totais = resumir_medidas([m for m in medidas if m['linhas'] == linhas and m['pipeline'] == nome])
+                print(f"  {nome:<20} fria {totais[(linhas, nome, 'fria', 'total')]:8.3f} s   "
+                      f"quente {totais[(linhas, nome, 'quente', 'total')]:8.3f} s", flush=True)
+
+    with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump({'metadados': metadados(), 'medidas': medidas}, arquivo, ensure_ascii=False, indent=1)
+    print(f"Resultados salvos em {argumentos.saida}")
+
+    if argumentos.comparar:
+        lentas = regressoes(resumir_medidas(ler_resultado(argumentos.comparar)), resumir_medidas(medidas),
+                            argumentos.tolerancia)
+        for (linhas, pipeline, execucao, descricao), antes, agora in lentas:
+            print(f"Regressão: {pipeline} ({linhas} linhas, {execucao}) - {descricao}: {antes:.3f} s -> {agora:.3f} s")
+        if lentas:
+            return 1
+        print(f"Nenhuma regressão em relação a {argumentos.comparar}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
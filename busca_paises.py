@@ -0,0 +1,44 @@
+import unicodedata
+
+# Busca de países por nome usada pela lista de países e pelo preenchimento automático das janelas; fica separada do
+# dicionário de países (dicionario_paises.py) para não carregar o pandas ao abrir as janelas
+
+# Função para normalizar um texto para busca (sem acentos e sem diferença entre maiúsculas e minúsculas)
+def normalizar(texto):
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+# Busca de países por trecho do nome: os países que começam com a consulta vêm antes dos que apenas a contêm.
+# A busca é incremental: quando a nova consulta estende a anterior (o usuário continuou digitando), só os
+# resultados anteriores são examinados
+class BuscaPaises:
+    def __init__(self, nomes=()):
+        self.definir(nomes)
+
+    # Função para trocar a lista de países pesquisada
+    def definir(self, nomes):
+        self.nomes = list(nomes)
+        self._normalizados = {nome: normalizar(nome) for nome in self.nomes}
+        self._consulta = ''
+        self._candidatos = self.nomes
+
+    # Função para obter os países que contêm a consulta
+    def filtrar(self, consulta):
+        consulta = normalizar(consulta.strip())
+        candidatos = self._candidatos if consulta.startswith(self._consulta) else self.nomes
+        encontrados = [nome for nome in candidatos if consulta in self._normalizados[nome]]
+        self._consulta, self._candidatos = consulta, encontrados
+
+        inicio = [nome for nome in encontrados if self._normalizados[nome].startswith(consulta)]
+        meio = [nome for nome in encontrados if not self._normalizados[nome].startswith(consulta)]
+        return inicio + meio
+
+    # Função para completar um nome digitado pela metade (None se nenhum país começar com ele)
+    def completar(self, prefixo):
+        prefixo = normalizar(prefixo)
+        if not prefixo:
+            return None
+        for nome in self.nomes:
+            if self._normalizados[nome].startswith(prefixo):
+                return nome
+        return None
@@ -0,0 +1,186 @@
+import os
+import json
+import pickle
+import hashlib
+import threading
+from carregador import chave_arquivo, DIRETORIO_CACHE
+from fontes import listar_arquivos, fonte_multipla
+from tarefas import etapa
+
+# Cache em disco dos resultados das análises (estatísticas, dados limpos, tabelas e imagens dos gráficos), mantido
+# entre as sessões: cada resultado é gravado em um arquivo cujo nome é o hash do conteúdo do CSV, da análise e dos
+# parâmetros, de modo que reabrir o programa e pedir um país ou intervalo de anos já visto não calcula nada de novo.
+# Arquivos com o mesmo conteúdo (mesmo em outro caminho) compartilham os resultados e qualquer alteração no CSV
+# muda o hash. Quando o cache passa de LIMITE_CACHE_DISCO bytes os resultados usados há mais tempo são apagados
+# (cada leitura atualiza a data de modificação do arquivo do resultado)
+
+# Diretório dos resultados e tamanho máximo do cache
+DIRETORIO_RESULTADOS = os.path.join(DIRETORIO_CACHE, 'resultados')
+LIMITE_CACHE_DISCO = 512 * 1024 * 1024
+
+# Versão do formato dos resultados: mudar quando as análises passarem a devolver outros resultados,
+# para que os resultados antigos não sejam mais usados
+VERSAO_RESULTADOS = 3
+
+# Arquivo com os hashes dos CSVs já calculados (caminho -> data de modificação, tamanho e hash)
+ARQUIVO_HASHES = os.path.join(DIRETORIO_CACHE, 'hashes.json')
+
+# Tamanho dos blocos lidos para calcular o hash de um arquivo
+BLOCO_HASH = 1024 * 1024
+
+# Cache em memória dos hashes: chave do arquivo -> hash
+_hashes = {}
+
+# Função para ler os hashes gravados (dicionário vazio se o arquivo não existir ou estiver corrompido)
+def _ler_hashes():
+    try:
+        with open(ARQUIVO_HASHES, encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+# Função para gravar um arquivo trocando-o de forma atômica (falhas de gravação são ignoradas)
+def _gravar_atomico(destino, conteudo):
+    temporario = f'{destino}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, destino)
+        return True
+    except OSError:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return False
+
+# Função para obter o hash de um arquivo (ou pasta ou padrão) somente se ele já tiver sido calculado para a versão
+# atual do arquivo, sem ler o conteúdo (None se for preciso calcular)
+def hash_conhecido(caminho_arquivo):
+    if fonte_multipla(caminho_arquivo):
+        if all(hash_conhecido(arquivo) is not None for arquivo in listar_arquivos(caminho_arquivo)):
+            return hash_arquivo(caminho_arquivo)
+        return None
+
+    chave = chave_arquivo(caminho_arquivo)
+    resumo = _hashes.get(chave)
+    if resumo is None:
+        gravado = _ler_hashes().get(chave[0])
+        if gravado is not None and gravado[:2] == [chave[1], chave[2]]:
+            resumo = _hashes[chave] = gravado[2]
+    return resumo
+
+# Função para obter o hash (SHA-256) do conteúdo de um arquivo; calculado uma única vez para cada versão do
+# arquivo (caminho, data de modificação e tamanho) e guardado em disco para as próximas sessões. O hash de uma
+# pasta ou padrão sai dos nomes e hashes dos seus arquivos (somente os arquivos novos ou alterados são lidos)
+def hash_arquivo(caminho_arquivo):
+    if fonte_multipla(caminho_arquivo):
+        calculo = hashlib.sha256()
+        for arquivo in listar_arquivos(caminho_arquivo):
+            calculo.update(f'{os.path.basename(arquivo)}\0{hash_arquivo(arquivo)}\n'.encode('utf-8'))
+        return calculo.hexdigest()
+
+    resumo = hash_conhecido(caminho_arquivo)
+    if resumo is not None:
+        return resumo
+
+    chave = chave_arquivo(caminho_arquivo)
+    calculo = hashlib.sha256()
+    with open(chave[0], 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(BLOCO_HASH), b''):
+            calculo.update(bloco)
+    resumo = calculo.hexdigest()
+    gravados = _ler_hashes()
+    gravados[chave[0]] = [chave[1], chave[2], resumo]
+    _gravar_atomico(ARQUIVO_HASHES, json.dumps(gravados, ensure_ascii=False).encode('utf-8'))
+
+    _hashes[chave] = resumo
+    return resumo
+
+# Função para gerar a chave de um resultado: hash do conteúdo do arquivo, da análise e dos parâmetros
+def chave_resultado(caminho_arquivo, analise, parametros):
+    identificacao = repr((VERSAO_RESULTADOS, hash_arquivo(caminho_arquivo), analise, tuple(parametros)))
+    return hashlib.sha256(identificacao.encode('utf-8')).hexdigest()
+
+def _caminho_resultado(chave):
+    return os.path.join(DIRETORIO_RESULTADOS, chave[:2], chave + '.pickle')
+
+# Função para ler um resultado do cache (None se não estiver no cache ou não puder ser lido)
+def ler_resultado(chave):
+    caminho = _caminho_resultado(chave)
+    try:
+        with open(caminho, 'rb') as arquivo:
+            resultado = pickle.load(arquivo)
+        os.utime(caminho)  # Marcar o resultado como usado agora (ordem de descarte)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Resultado corrompido ou de uma versão incompatível do programa: descartar
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+        return None
+    return resultado
+
+# Função para listar os resultados gravados: (data do último uso, tamanho, caminho)
+def _resultados_gravados():
+    resultados = []
+    for raiz, _, arquivos in os.walk(DIRETORIO_RESULTADOS):
+        for nome in arquivos:
+            if not nome.endswith('.pickle'):
+                continue
+            caminho = os.path.join(raiz, nome)
+            try:
+                estado = os.stat(caminho)
+            except OSError:
+                continue
+            resultados.append((estado.st_mtime_ns, estado.st_size, caminho))
+    return resultados
+
+# Função para apagar os resultados usados há mais tempo até o cache caber no limite
+def podar_cache(limite=LIMITE_CACHE_DISCO):
+    resultados = sorted(_resultados_gravados())
+    total = sum(tamanho for _, tamanho, _ in resultados)
+    for _, tamanho, caminho in resultados:
+        if total <= limite:
+            break
+        try:
+            os.remove(caminho)
+        except OSError:
+            continue
+        total -= tamanho
+    return total
+
+# Função para saber se o resultado de uma análise já está no cache em disco, sem lê-lo
+def resultado_em_cache(caminho_arquivo, analise, parametros):
+    return os.path.exists(_caminho_resultado(chave_resultado(caminho_arquivo, analise, parametros)))
+
+# Função para gravar um resultado no cache (resultados maiores que o próprio limite não são gravados)
+def gravar_resultado(chave, resultado):
+    conteudo = pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(conteudo) > LIMITE_CACHE_DISCO:
+        return False
+    if not _gravar_atomico(_caminho_resultado(chave), conteudo):
+        return False
+    podar_cache()
+    return True
+
+# Função para obter o resultado de uma análise do cache em disco ou, se ainda não estiver lá, calculá-lo com
+# calcular(tarefa) e gravá-lo; parametros identifica a seleção (país, anos, ...)
+def obter_resultado(caminho_arquivo, analise, parametros, calcular, tarefa=None):
+    etapa(tarefa, "Consultando os resultados já calculados")
+    chave = chave_resultado(caminho_arquivo, analise, parametros)
+    resultado = ler_resultado(chave)
+    if resultado is None:
+        resultado = calcular(tarefa)
+        etapa(tarefa, "Guardando o resultado")
+        gravar_resultado(chave, resultado)
+    return resultado
+
+# Função para apagar todos os resultados do cache em disco
+def limpar_cache():
+    for _, _, caminho in _resultados_gravados():
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
@@ -0,0 +1,311 @@
+import io
+import os
+import re
+import hashlib
+import weakref
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from fontes import listar_arquivos, fonte_multipla
+
+# O formato binário (Feather/Arrow IPC) é opcional: sem o pyarrow os dados são lidos direto do CSV
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+# Colunas usadas pelas análises (as demais colunas do CSV não são carregadas)
+COLUNAS_ANALISE = ['ano', 'pais', 'altura', 'peso', 'sexo', 'medalha']
+
+# Tipos explícitos das colunas usadas nas análises (colunas ausentes no arquivo são ignoradas)
+TIPOS_COLUNAS = {
+    'pais': 'category',
+    'sexo': 'category',
+    'medalha': 'category',
+    'ano': 'int16',
+    'altura': 'float32',
+    'peso': 'float32',
+}
+
+# Diretório onde ficam os arquivos binários gerados a partir dos CSVs
+DIRETORIO_CACHE = os.environ.get('OLIMPIADAS_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'olimpiadas'))
+
+# Número de processos usados para ler os arquivos de uma pasta ou padrão (fontes.py)
+PROCESSOS_LEITURA = min(8, os.cpu_count() or 1)
+
+# Tamanho total (em bytes) dos arquivos a ler a partir do qual a leitura usa processos: abaixo disso iniciar os
+# processos (com 'spawn', importando o pandas em cada um) custa mais que ler os arquivos em sequência
+LIMITE_LEITURA_PARALELA = 64 * 1024 * 1024
+
+# Cache em memória dos arquivos já carregados: (caminho, colunas) -> (chave, dados)
+_cache_dados = {}
+
+# Função para gerar a chave de um arquivo a partir do caminho, data de modificação e tamanho. Para uma pasta ou
+# padrão, a data de modificação é substituída por um resumo dos nomes, datas e tamanhos de todos os arquivos (muda
+# quando um arquivo entra, sai ou é alterado) e o tamanho é a soma dos tamanhos
+def chave_arquivo(caminho_arquivo):
+    if fonte_multipla(caminho_arquivo):
+        chaves = [chave_arquivo(arquivo) for arquivo in listar_arquivos(caminho_arquivo)]
+        if not chaves:
+            raise FileNotFoundError(f"Nenhum arquivo CSV encontrado em {caminho_arquivo}")
+        resumo = hashlib.sha1(repr(chaves).encode('utf-8')).hexdigest()
+        return (os.path.abspath(caminho_arquivo), int(resumo[:15], 16), sum(chave[2] for chave in chaves))
+
+    caminho = os.path.abspath(caminho_arquivo)
+    estado = os.stat(caminho)
+    return (caminho, estado.st_mtime_ns, estado.st_size)
+
+# Função para ler o CSV somente com as colunas pedidas (None = todas as colunas)
+def _ler_csv(caminho, colunas):
+    if colunas is None:
+        return pd.read_csv(caminho, dtype=TIPOS_COLUNAS)
+    return pd.read_csv(caminho, dtype=TIPOS_COLUNAS, usecols=lambda coluna: coluna in colunas)
+
+# Função para obter o caminho do arquivo binário correspondente a um CSV
+def caminho_binario(caminho_arquivo):
+    caminho = os.path.abspath(caminho_arquivo)
+    resumo = hashlib.sha1(caminho.encode('utf-8')).hexdigest()[:16]
+    nome = re.sub(r'[*?\[\]]', '_', os.path.splitext(os.path.basename(caminho))[0])
+    return os.path.join(DIRETORIO_CACHE, f'{nome}-{resumo}.feather')
+
+# Metadados gravados no arquivo binário para saber de qual versão do CSV ele foi gerado
+def _metadados_origem(chave):
+    return {b'origem_mtime_ns': str(chave[1]).encode(), b'origem_tamanho': str(chave[2]).encode()}
+
+# Função para ler o esquema do arquivo binário (None se não existir ou estiver corrompido)
+def _esquema_binario(caminho_binario_arquivo, chave):
+    if not os.path.exists(caminho_binario_arquivo):
+        return None
+    try:
+        with pa.memory_map(caminho_binario_arquivo) as origem:
+            esquema = pa.ipc.open_file(origem).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    metadados = esquema.metadata or {}
+    for nome, valor in _metadados_origem(chave).items():
+        if metadados.get(nome) != valor:
+            return None
+    return esquema
+
+# Função para converter o CSV para o formato binário uma única vez (chamada ao selecionar o arquivo); para uma
+# pasta ou padrão, converte cada arquivo (preparar_arquivos)
+def preparar_arquivo(caminho_arquivo):
+    if fonte_multipla(caminho_arquivo):
+        return preparar_arquivos(listar_arquivos(caminho_arquivo))
+    if feather is None:
+        return None
+
+    chave = chave_arquivo(caminho_arquivo)
+    destino = caminho_binario(caminho_arquivo)
+    if _esquema_binario(destino, chave) is not None:
+        return destino
+
+    dados = _ler_csv(chave[0], COLUNAS_ANALISE)
+    tabela = pa.Table.from_pandas(dados, preserve_index=False)
+    tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), **_metadados_origem(chave)})
+
+    # Gravar sem compressão para que o arquivo possa ser mapeado em memória, trocando-o de forma atômica
+    temporario = f'{destino}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+        feather.write_feather(tabela, temporario, compression='uncompressed')
+        os.replace(temporario, destino)
+    except OSError:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return None
+    return destino
+
+# Função para aplicar uma função a cada arquivo de uma lista, em processos separados quando há arquivos suficientes
+# para compensar o custo de iniciá-los; devolve os resultados na ordem dos arquivos
+def _ler_em_paralelo(funcao, arquivos, *argumentos):
+    tamanho = sum(os.path.getsize(arquivo) for arquivo in arquivos)
+    if len(arquivos) < 2 or PROCESSOS_LEITURA < 2 or tamanho < LIMITE_LEITURA_PARALELA:
+        return [funcao(arquivo, *argumentos) for arquivo in arquivos]
+
+    # Processos iniciados com 'spawn' pelo mesmo motivo dos painéis (a interface já tem threads em andamento)
+    processos = min(PROCESSOS_LEITURA, len(arquivos))
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(funcao, arquivos, *[[argumento] * len(arquivos) for argumento in argumentos]))
+
+# Função para converter para o formato binário os arquivos de uma pasta ou padrão, em paralelo; somente os arquivos
+# novos ou alterados desde a última conversão são lidos. Devolve o arquivo binário de cada arquivo, na ordem
+# (None se não foi possível convertê-lo)
+def preparar_arquivos(arquivos):
+    if feather is None:
+        return [None] * len(arquivos)
+
+    destinos = {arquivo: caminho_binario(arquivo) for arquivo in arquivos}
+    pendentes = [arquivo for arquivo in arquivos
+                 if _esquema_binario(destinos[arquivo], chave_arquivo(arquivo)) is None]
+    destinos.update(zip(pendentes, _ler_em_paralelo(preparar_arquivo, pendentes)))
+    return [destinos[arquivo] for arquivo in arquivos]
+
+# Função para ler as colunas pedidas de um arquivo binário mapeado em memória como tabela do Arrow
+# (None se o arquivo binário não corresponder à versão atual do CSV)
+def _tabela_binaria(destino, chave, colunas):
+    esquema = _esquema_binario(destino, chave)
+    if esquema is None:
+        return None
+    return feather.read_table(destino, columns=[c for c in esquema.names if c in colunas], memory_map=True)
+
+# Função para ler as colunas pedidas do arquivo binário mapeado em memória (None se não for possível)
+def _ler_binario(chave, colunas):
+    if feather is None or colunas is None:
+        return None
+
+    destino = preparar_arquivo(chave[0])
+    if destino is None:
+        return None
+
+    tabela = _tabela_binaria(destino, chave, colunas)
+    return None if tabela is None else tabela.to_pandas()
+
+# Função para abrir o arquivo binário já gerado de um CSV, mapeado em memória, sem ler o CSV nem as colunas inteiras
+# (None sem o pyarrow, para uma pasta ou padrão ou se o arquivo binário ainda não corresponder à versão do CSV)
+def abrir_binario(caminho_arquivo, colunas=COLUNAS_ANALISE):
+    if feather is None or fonte_multipla(caminho_arquivo):
+        return None
+    return _tabela_binaria(caminho_binario(caminho_arquivo), chave_arquivo(caminho_arquivo), colunas)
+
+# Função para juntar os DataFrames dos arquivos de uma fonte (leitura sem o pyarrow): cada coluna categórica passa
+# a ter as mesmas categorias em todas as partes (a união das categorias) antes da junção, que copia as linhas uma
+# única vez e mantém as colunas categóricas
+def juntar_partes(partes):
+    tipos = {}
+    for parte in partes:
+        for coluna in parte.columns:
+            if isinstance(parte[coluna].dtype, pd.CategoricalDtype):
+                categorias = parte[coluna].cat.categories
+                tipos[coluna] = categorias if coluna not in tipos else tipos[coluna].union(categorias)
+    tipos = {coluna: pd.CategoricalDtype(categorias) for coluna, categorias in tipos.items()}
+
+    partes = [parte.astype({coluna: tipo for coluna, tipo in tipos.items() if coluna in parte.columns})
+              for parte in partes]
+    dados = pd.concat(partes, ignore_index=True)
+
+    # Colunas que faltavam em algum arquivo voltam a ser categóricas
+    return dados.astype({coluna: tipo for coluna, tipo in tipos.items() if dados[coluna].dtype != tipo})
+
+# Função para dividir as linhas de dados dos CSVs de uma fonte em blocos de tamanho_bloco bytes, (arquivo, início,
+# fim) de cada bloco: cada linha pertence ao bloco em que ela começa (CSVs sem quebras de linha dentro dos campos).
+# None se algum arquivo for compactado, pois não é possível ler a partir de uma posição dele
+def blocos_csv(caminho_arquivo, tamanho_bloco):
+    blocos = []
+    for arquivo in listar_arquivos(caminho_arquivo):
+        if not arquivo.lower().endswith('.csv'):
+            return None
+        with open(arquivo, 'rb') as origem:
+            inicio = len(origem.readline())
+        tamanho = os.path.getsize(arquivo)
+        blocos.extend((arquivo, posicao, min(posicao + tamanho_bloco, tamanho))
+                      for posicao in range(inicio, tamanho, tamanho_bloco))
+    return blocos
+
+# Função para ler as linhas que começam nos blocos pedidos (de blocos_csv) como um único DataFrame, somente com as
+# colunas pedidas; os blocos de cada arquivo são lidos em ordem e juntados ao cabeçalho para uma única leitura
+def ler_blocos_csv(blocos, colunas=COLUNAS_ANALISE):
+    trechos = {}
+    for arquivo, inicio, fim in blocos:
+        trechos.setdefault(arquivo, []).append((inicio, fim))
+
+    partes = []
+    for arquivo, posicoes in trechos.items():
+        with open(arquivo, 'rb') as origem:
+            conteudo = [origem.readline()]
+            for inicio, fim in sorted(posicoes):
+                # O byte anterior ao bloco entra na leitura: as linhas do bloco começam depois da primeira quebra
+                # (a linha em andamento é do bloco anterior) e a última é completada além do fim do bloco
+                origem.seek(inicio - 1)
+                trecho = origem.read(fim - inicio + 1)
+                quebra = trecho.find(b'\n')
+                if quebra < 0 or quebra == len(trecho) - 1:
+                    continue
+                trecho = trecho[quebra + 1:]
+                if not trecho.endswith(b'\n'):
+                    trecho += origem.readline()
+                conteudo.append(trecho if trecho.endswith(b'\n') else trecho + b'\n')
+        partes.append(_ler_csv(io.BytesIO(b''.join(conteudo)), colunas))
+    return juntar_partes(partes)
+
+# Função para ler os arquivos de uma pasta ou padrão como um único DataFrame. Com o pyarrow, os arquivos novos ou
+# alterados são convertidos para o formato binário em paralelo e as tabelas mapeadas em memória são juntadas sem
+# cópia, com os esquemas unificados (colunas ausentes em um arquivo ficam vazias nele) e um único dicionário por
+# coluna categórica, e convertidas para o pandas de uma vez; sem ele, os CSVs são lidos em paralelo e juntados
+def _ler_varios(arquivos, colunas):
+    if feather is None or colunas is None:
+        return juntar_partes(_ler_em_paralelo(_ler_csv, arquivos, colunas))
+
+    tabelas = []
+    for arquivo, destino in zip(arquivos, preparar_arquivos(arquivos)):
+        tabela = None if destino is None else _tabela_binaria(destino, chave_arquivo(arquivo), colunas)
+        if tabela is None:
+            tabela = pa.Table.from_pandas(_ler_csv(arquivo, colunas), preserve_index=False)
+        # Os metadados do pandas de cada arquivo (índice, tamanho) não valem para a tabela juntada
+        tabelas.append(tabela.replace_schema_metadata(None))
+    tabela = pa.concat_tables(tabelas, promote_options='default').unify_dictionaries()
+    dados = tabela.to_pandas()
+
+    # O dicionário unificado segue a ordem em que os valores aparecem nos arquivos: as categorias voltam para a
+    # ordem alfabética, a mesma da leitura de um único CSV
+    for coluna in dados.select_dtypes(include='category').columns:
+        categorias = dados[coluna].cat.categories
+        if not categorias.is_monotonic_increasing:
+            dados[coluna] = dados[coluna].cat.reorder_categories(categorias.sort_values())
+    return dados
+
+# Função para carregar os dados do arquivo CSV (ou dos CSVs de uma pasta ou padrão), reaproveitando o cache se os
+# arquivos não mudaram (o DataFrame retornado é compartilhado entre as chamadas e não deve ser alterado no lugar)
+def carregar_dados(caminho_arquivo, colunas=COLUNAS_ANALISE):
+    chave = chave_arquivo(caminho_arquivo)
+    chave_cache = (chave[0], None if colunas is None else tuple(colunas))
+
+    em_cache = _cache_dados.get(chave_cache)
+    if em_cache is not None and em_cache[0] == chave:
+        return em_cache[1]
+
+    if fonte_multipla(caminho_arquivo):
+        dados = _ler_varios(listar_arquivos(caminho_arquivo), colunas)
+    else:
+        dados = _ler_binario(chave, colunas)
+        if dados is None:
+            dados = _ler_csv(chave[0], colunas)
+    _cache_dados[chave_cache] = (chave, dados)
+    return dados
+
+# Função para saber se os dados de um arquivo já estão em memória e atualizados (carregar_dados não lê nada)
+def dados_em_memoria(caminho_arquivo, colunas=COLUNAS_ANALISE):
+    chave = chave_arquivo(caminho_arquivo)
+    em_cache = _cache_dados.get((chave[0], None if colunas is None else tuple(colunas)))
+    return em_cache is not None and em_cache[0] == chave
+
+# Função para listar os dados em memória: (caminho, número de linhas) de cada arquivo carregado
+def dados_carregados():
+    return [(chave_cache[0], len(dados)) for chave_cache, (_, dados) in list(_cache_dados.items())]
+
+# Função para descartar os dados em cache (de um arquivo ou de todos)
+def limpar_cache(caminho_arquivo=None):
+    if caminho_arquivo is None:
+        _cache_dados.clear()
+        return
+    caminho = os.path.abspath(caminho_arquivo)
+    for chave_cache in [c for c in _cache_dados if c[0] == caminho]:
+        del _cache_dados[chave_cache]
+
+# Estruturas derivadas já construídas para cada DataFrame carregado: (id(dados), nome) -> estrutura
+_estruturas_derivadas = {}
+
+# Função para obter uma estrutura derivada de um DataFrame (índice, tabela de estatísticas, ...),
+# construindo-a apenas na primeira chamada e descartando-a quando o DataFrame deixar de existir
+def obter_derivado(dados, nome, construir):
+    chave = (id(dados), nome)
+    estrutura = _estruturas_derivadas.get(chave)
+    if estrutura is None:
+        estrutura = construir(dados)
+        _estruturas_derivadas[chave] = estrutura
+        weakref.finalize(dados, _estruturas_derivadas.pop, chave, None)
+    return estrutura
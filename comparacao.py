@@ -0,0 +1,220 @@
+import os
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pandas as pd
+from scipy import stats
+from tarefas import etapa
+from cubo_medalhas import obter_cubo_medalhas
+
+# Comparação entre uma lista qualquer de países: as medidas de todos os países selecionados são resumidas de uma
+# vez em uma matriz de contagens (país x valor distinto da medida). Médias, desvios padrão e os testes entre todos
+# os pares de países (t de Welch, Mann-Whitney e Kolmogorov-Smirnov) saem dessa matriz em operações vetorizadas,
+# sem separar os dados por país nem repetir o cálculo para cada par, e os intervalos de confiança por bootstrap
+# reamostram as contagens em processos separados. Comparar 20 países custa praticamente o mesmo que comparar 2.
+#
+# Os valores p são os das aproximações do scipy: Welch como em stats.ttest_ind(equal_var=False), Mann-Whitney como
+# em stats.mannwhitneyu(method='asymptotic') (correção de continuidade e de empates) e Kolmogorov-Smirnov como em
+# stats.ks_2samp(method='asymp')
+
+# Medidas comparadas
+MEDIDAS = ['altura', 'peso']
+
+# Número de reamostragens do bootstrap e nível de confiança dos intervalos
+REAMOSTRAGENS = 2000
+CONFIANCA = 0.95
+
+# Semente das reamostragens (os intervalos de uma mesma seleção são sempre os mesmos)
+SEMENTE = 20240
+
+# Número de processos das reamostragens
+PROCESSOS = min(4, os.cpu_count() or 1)
+
+# Processos usados para as reamostragens (criados no primeiro uso)
+_executor = None
+_trava_executor = threading.Lock()
+
+# Função para obter o executor das reamostragens; os processos são iniciados com 'spawn' pelo mesmo motivo dos
+# painéis (a interface já tem threads em andamento)
+def _obter_executor():
+    global _executor
+    with _trava_executor:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=PROCESSOS, mp_context=multiprocessing.get_context('spawn'))
+    return _executor
+
+# Contagens de cada valor distinto de uma medida para cada país (linhas na ordem de paises)
+class ContagensPaises:
+    def __init__(self, dados, paises, coluna):
+        self.paises = list(paises)
+        self.coluna = coluna
+        codigos = pd.Categorical(dados['pais'], categories=self.paises).codes.astype('int64')
+        dos_paises = codigos >= 0
+        codigos = codigos[dos_paises]
+        medidas = dados[coluna].to_numpy(dtype='float64')[dos_paises]
+        self.valores, posicoes = np.unique(medidas, return_inverse=True)
+
+        forma = (len(self.paises), len(self.valores))
+        self.contagens = np.bincount(codigos * forma[1] + posicoes.ravel(), minlength=forma[0] * forma[1]).reshape(forma)
+
+    @property
+    def n(self):
+        return self.contagens.sum(axis=1).astype('float64')
+
+    @property
+    def medias(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.contagens @ self.valores) / self.n
+
+    # Variância amostral (ddof=1) de cada país
+    @property
+    def variancias(self):
+        desvios = (self.valores[None, :] - self.medias[:, None]) ** 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.contagens * desvios).sum(axis=1) / (self.n - 1)
+
+# Função para calcular o teste t de Welch entre todos os pares (matrizes país x país)
+def _welch(contagens):
+    n, medias, variancias = contagens.n, contagens.medias, contagens.variancias
+    erros = variancias / n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        soma = erros[:, None] + erros[None, :]
+        t = (medias[:, None] - medias[None, :]) / np.sqrt(soma)
+        graus = soma ** 2 / (erros[:, None] ** 2 / (n[:, None] - 1) + erros[None, :] ** 2 / (n[None, :] - 1))
+    return t, graus, 2 * stats.t.sf(np.abs(t), graus)
+
+# Função para calcular o teste de Mann-Whitney entre todos os pares: U do país da linha e valor p bilateral
+def _mann_whitney(contagens):
+    c = contagens.contagens.astype('float64')
+    n = contagens.n
+    abaixo = np.cumsum(c, axis=1) - c
+    u = c @ (abaixo + 0.5 * c).T
+
+    # Correção de empates: soma de t^3 - t sobre os valores da amostra combinada de cada par, com t = c_i + c_j
+    cubos = (c ** 3).sum(axis=1)
+    empates = (cubos[:, None] + cubos[None, :] + 3 * (c ** 2 @ c.T) + 3 * (c @ (c ** 2).T)
+               - (n[:, None] + n[None, :]))
+
+    n1, n2 = n[:, None], n[None, :]
+    total = n1 + n2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        desvio = np.sqrt(n1 * n2 / 12 * ((total + 1) - empates / (total * (total - 1))))
+        z = (np.maximum(u, n1 * n2 - u) - n1 * n2 / 2 - 0.5) / desvio
+    return u, np.clip(2 * stats.norm.sf(z), 0, 1)
+
+# Função para calcular o teste de Kolmogorov-Smirnov entre todos os pares: maior distância entre as funções de
+# distribuição acumulada e valor p bilateral
+def _kolmogorov_smirnov(contagens):
+    n = contagens.n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        acumuladas = np.cumsum(contagens.contagens, axis=1) / n[:, None]
+    d = np.abs(acumuladas[:, None, :] - acumuladas[None, :, :]).max(axis=2, initial=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        efetivo = np.round(n[:, None] * n[None, :] / (n[:, None] + n[None, :]))
+        p = np.clip(stats.kstwo.sf(d, np.where(efetivo > 0, efetivo, np.nan)), 0, 1)
+    return d, p
+
+# Função executada nos processos: médias de reamostragens das contagens de cada país, para cada medida
+# (devolve, por medida, uma matriz país x reamostragem)
+def reamostrar_medias(tabelas, reamostragens, semente):
+    gerador = np.random.default_rng(semente)
+    medias = []
+    for valores, contagens in tabelas:
+        resultado = np.full((len(contagens), reamostragens), np.nan)
+        for linha, contagem in enumerate(contagens):
+            n = int(contagem.sum())
+            if n > 0:
+                amostras = gerador.multinomial(n, contagem / n, size=reamostragens)
+                resultado[linha] = amostras @ valores / n
+        medias.append(resultado)
+    return medias
+
+# Função para calcular as médias das reamostragens, dividindo-as em blocos entre os processos; quando a comparação
+# já roda em um processo de trabalho (modo em lote, que distribui as análises entre processos) as reamostragens
+# ficam no próprio processo
+def _bootstrap(tabelas, reamostragens, semente, tarefa=None):
+    if multiprocessing.parent_process() is not None:
+        etapa(tarefa, "Calculando os intervalos de confiança")
+        return reamostrar_medias(tabelas, reamostragens, np.random.SeedSequence(semente))
+
+    executor = _obter_executor()
+    blocos = min(reamostragens, PROCESSOS)
+    tamanhos = [len(parte) for parte in np.array_split(np.arange(reamostragens), blocos)]
+    sementes = np.random.SeedSequence(semente).spawn(blocos)
+    pendentes = {executor.submit(reamostrar_medias, tabelas, tamanho, semente_bloco): posicao
+                 for posicao, (tamanho, semente_bloco) in enumerate(zip(tamanhos, sementes))}
+
+    partes = [None] * blocos
+    try:
+        while pendentes:
+            concluidos, _ = wait(pendentes, timeout=0.1, return_when=FIRST_COMPLETED)
+            etapa(tarefa, f"Calculando os intervalos de confiança ({blocos - len(pendentes) + len(concluidos)}/{blocos})")
+            for futuro in concluidos:
+                partes[pendentes.pop(futuro)] = futuro.result()
+    finally:
+        # Cancelamento: descartar os blocos que ainda não começaram
+        for futuro in pendentes:
+            futuro.cancel()
+    return [np.concatenate([parte[medida] for parte in partes], axis=1) for medida in range(len(tabelas))]
+
+# Função para calcular os percentis de um intervalo de confiança ao longo do último eixo
+def _intervalo(amostras, confianca):
+    alfa = (1 - confianca) / 2
+    return np.quantile(amostras, alfa, axis=-1), np.quantile(amostras, 1 - alfa, axis=-1)
+
+# Função para comparar as medidas de uma lista de países nos dados (já filtrados pelos anos e sem valores ausentes
+# nas medidas): devolve o resumo por país (com os intervalos de confiança das médias) e a tabela dos testes entre
+# todos os pares de países, para cada medida (com o intervalo de confiança da diferença entre as médias)
+def comparar_medidas(dados, paises, medidas=MEDIDAS, reamostragens=REAMOSTRAGENS, confianca=CONFIANCA,
+                     semente=SEMENTE, tarefa=None):
+    paises = list(dict.fromkeys(paises))
+    etapa(tarefa, "Contando os valores de cada país")
+    tabelas = {coluna: ContagensPaises(dados, paises, coluna) for coluna in medidas}
+
+    medias_bootstrap = {}
+    if reamostragens:
+        amostras = _bootstrap([(t.valores, t.contagens) for t in tabelas.values()], reamostragens, semente, tarefa)
+        medias_bootstrap = dict(zip(medidas, amostras))
+
+    etapa(tarefa, "Calculando os testes entre os países")
+    resumo = pd.DataFrame(index=pd.Index(paises, name='pais'))
+    resumo['contagem'] = tabelas[medidas[0]].n.astype('int64')
+    pares = np.triu_indices(len(paises), k=1)
+    testes = []
+    for coluna, tabela in tabelas.items():
+        resumo[f'{coluna}_media'] = tabela.medias
+        resumo[f'{coluna}_desvio'] = np.sqrt(tabela.variancias)
+
+        t, graus, p_welch = _welch(tabela)
+        u, p_mann_whitney = _mann_whitney(tabela)
+        d, p_ks = _kolmogorov_smirnov(tabela)
+        linhas = pd.DataFrame({
+            'pais_a': np.array(paises, dtype=object)[pares[0]],
+            'pais_b': np.array(paises, dtype=object)[pares[1]],
+            'medida': coluna,
+            'diferenca_medias': (tabela.medias[:, None] - tabela.medias[None, :])[pares],
+            'welch_t': t[pares],
+            'welch_gl': graus[pares],
+            'welch_p': p_welch[pares],
+            'mann_whitney_u': u[pares],
+            'mann_whitney_p': p_mann_whitney[pares],
+            'ks_d': d[pares],
+            'ks_p': p_ks[pares],
+        })
+
+        if coluna in medias_bootstrap:
+            amostras = medias_bootstrap[coluna]
+            resumo[f'{coluna}_ic_inferior'], resumo[f'{coluna}_ic_superior'] = _intervalo(amostras, confianca)
+            diferencas = amostras[pares[0]] - amostras[pares[1]]
+            linhas['diferenca_ic_inferior'], linhas['diferenca_ic_superior'] = _intervalo(diferencas, confianca)
+        testes.append(linhas)
+
+    return resumo, pd.concat(testes, ignore_index=True)
+
+# Função para contar as medalhas de cada país por sexo em um intervalo de anos (None: todos os anos), a partir do
+# cubo de medalhas dos dados carregados (cubo_medalhas.py), sem percorrer as linhas
+def medalhas_por_sexo(dados, paises, ano_inicio=None, ano_fim=None):
+    paises = list(dict.fromkeys(paises))
+    corte = obter_cubo_medalhas(dados).fatiar(paises, ano_inicio, ano_fim)
+    return corte.agregar('pais', 'sexo').reindex(paises, fill_value=0)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from acumuladores import CoMomentos
+from carregador import obter_derivado
+from outliers import COLUNAS_OUTLIERS
+
+# Matriz de correlação das colunas numéricas (altura, peso e ano) montada a partir de acumuladores por partição:
+# as linhas completas são resumidas uma única vez em células (pais, ano, altura, peso), com os valores exatos de altura
+# e peso, cada uma com contagem, médias e co-momentos (acumuladores.CoMomentos). A matriz de qualquer seleção de
+# países e anos, já sem os outliers (limites de altura e peso), sai da combinação das células selecionadas, sem rever
+# as linhas.
+#
+# Cada célula tem um único valor de altura e de peso, então fica inteira dentro ou fora dos limites, como as linhas
+# na limpeza, e o resultado é o mesmo do corr() do pandas sobre a seleção limpa (com medidas inteiras ou
+# fracionárias), a menos de arredondamentos de ponto flutuante. Só as células que aparecem nos dados são guardadas
+
+# Função para combinar de uma vez várias células (contagens, médias e co-momentos) em um acumulador
+# (mesma fórmula do CoMomentos.combinar, somando os desvios das médias das células em relação à média total)
+def combinar_celulas(colunas, contagens, medias, comomentos):
+    acumulador = CoMomentos(colunas)
+    total = int(contagens.sum())
+    if total == 0:
+        return acumulador
+    pesos = contagens.astype('float64')
+    media = pesos @ medias / total
+    desvios = medias - media
+    acumulador.contagem = total
+    acumulador.media = media
+    acumulador.comomentos = comomentos.sum(axis=0) + np.einsum('c,ci,cj->ij', pesos, desvios, desvios)
+    return acumulador
+
+class CovarianciasParticionadas:
+    def __init__(self, dados):
+        self.colunas = list(dados.select_dtypes(include='number').columns)
+        completos = dados.dropna()
+
+        # Células pelos valores exatos de altura e peso (no tipo das colunas, comparados com os limites como na limpeza)
+        grupos = completos.groupby(['pais', 'ano'] + COLUNAS_OUTLIERS, observed=True, sort=True)
+        codigos = grupos.ngroup().to_numpy()
+
+        # Chaves de cada célula (uma linha por célula, na ordem dos códigos)
+        self.celulas = grupos.size().index.to_frame(index=False)
+        self.contagens = grupos.size().to_numpy()
+
+        # Médias e co-momentos de cada célula, em duas passagens (médias e depois produtos dos desvios)
+        valores = completos[self.colunas].to_numpy(dtype='float64')
+        numero = len(self.celulas)
+        somas = np.stack([np.bincount(codigos, valores[:, i], minlength=numero) for i in range(len(self.colunas))],
+                         axis=1)
+        self.medias = somas / np.maximum(self.contagens, 1)[:, None]
+        desvios = valores - self.medias[codigos]
+        self.comomentos = np.empty((numero, len(self.colunas), len(self.colunas)))
+        for i in range(len(self.colunas)):
+            for j in range(i, len(self.colunas)):
+                produto = np.bincount(codigos, desvios[:, i] * desvios[:, j], minlength=numero)
+                self.comomentos[:, i, j] = produto
+                self.comomentos[:, j, i] = produto
+
+    # Função para combinar as células de uma seleção de países e anos, dentro dos limites de altura e peso
+    def selecionar(self, paises=None, ano_inicio=None, ano_fim=None, limites=None):
+        mascara = np.ones(len(self.celulas), dtype=bool)
+        if paises is not None:
+            mascara &= self.celulas['pais'].isin(list(paises)).to_numpy()
+        if ano_inicio is not None:
+            mascara &= (self.celulas['ano'] >= ano_inicio).to_numpy()
+        if ano_fim is not None:
+            mascara &= (self.celulas['ano'] <= ano_fim).to_numpy()
+        if limites is not None:
+            for coluna, (minimo, maximo) in zip(COLUNAS_OUTLIERS, limites):
+                valores = self.celulas[coluna].to_numpy()
+                mascara &= (valores >= minimo) & (valores <= maximo)
+        return combinar_celulas(self.colunas, self.contagens[mascara], self.medias[mascara], self.comomentos[mascara])
+
+    # Função para obter a matriz de correlação de uma seleção (DataFrame com as colunas numéricas, como o corr())
+    def correlacao(self, paises=None, ano_inicio=None, ano_fim=None, limites=None):
+        acumulador = self.selecionar(paises, ano_inicio, ano_fim, limites)
+        return pd.DataFrame(acumulador.correlacao, index=self.colunas, columns=self.colunas)
+
+# Função para obter as covariâncias por partição de um DataFrame, calculando-as apenas na primeira chamada
+# (construídas sobre dados.dropna(), a mesma base usada na limpeza dos scripts de análise)
+def obter_covariancias(dados):
+    return obter_derivado(dados, 'covariancias_particionadas', CovarianciasParticionadas)
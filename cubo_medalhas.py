@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from carregador import obter_derivado
+
+# Cubo de medalhas: as medalhas do arquivo contadas uma única vez em um vetor denso de dimensões
+# pais x ano x sexo x medalha (alguns milhares de células, independente do número de atletas). Os gráficos e tabelas
+# de medalhas de qualquer intervalo de anos ou conjunto de países saem de cortes (fatiar) e somas (agregar, maiores)
+# do cubo, sem percorrer as linhas
+
+EIXOS = ['pais', 'ano', 'sexo', 'medalha']
+
+class CuboMedalhas:
+    def __init__(self, rotulos, contagens):
+        self.rotulos = rotulos  # eixo -> rótulos de cada posição, na ordem de EIXOS
+        self.contagens = contagens
+
+    # Função para construir o cubo a partir das linhas com medalha
+    @classmethod
+    def construir(cls, dados):
+        com_medalha = dados.dropna(subset=EIXOS)
+        rotulos = {}
+        posicoes = []
+        for eixo in EIXOS:
+            coluna = com_medalha[eixo]
+            if isinstance(coluna.dtype, pd.CategoricalDtype):
+                rotulos[eixo] = np.asarray(coluna.cat.categories)
+                posicoes.append(coluna.cat.codes.to_numpy().astype('int64'))
+            else:
+                rotulos[eixo], posicao = np.unique(coluna.to_numpy(), return_inverse=True)
+                posicoes.append(posicao.astype('int64'))
+        forma = tuple(len(rotulos[eixo]) for eixo in EIXOS)
+        contagens = np.bincount(np.ravel_multi_index(posicoes, forma), minlength=int(np.prod(forma)))
+        return cls(rotulos, contagens.reshape(forma).astype('int32'))
+
+    # Função para cortar o cubo: somente os países, anos (inclusive), sexos e tipos de medalha indicados
+    # (None mantém o eixo inteiro; rótulos que não estão no cubo são ignorados)
+    def fatiar(self, paises=None, ano_inicio=None, ano_fim=None, sexos=None, medalhas=None):
+        rotulos = dict(self.rotulos)
+        contagens = self.contagens
+
+        # Anos: intervalo contínuo dos rótulos ordenados (um corte sem cópia)
+        anos = rotulos['ano']
+        inicio = 0 if ano_inicio is None else int(np.searchsorted(anos, ano_inicio, side='left'))
+        fim = len(anos) if ano_fim is None else int(np.searchsorted(anos, ano_fim, side='right'))
+        contagens = contagens[:, inicio:max(inicio, fim)]
+        rotulos['ano'] = anos[inicio:max(inicio, fim)]
+
+        for eixo, escolhidos in (('pais', paises), ('sexo', sexos), ('medalha', medalhas)):
+            if escolhidos is None:
+                continue
+            posicao_rotulo = {rotulo: posicao for posicao, rotulo in enumerate(rotulos[eixo].tolist())}
+            posicoes = [posicao_rotulo[rotulo] for rotulo in dict.fromkeys(escolhidos) if rotulo in posicao_rotulo]
+            contagens = np.take(contagens, posicoes, axis=EIXOS.index(eixo))
+            rotulos[eixo] = rotulos[eixo][posicoes]
+        return CuboMedalhas(rotulos, contagens)
+
+    # Função para somar o cubo nos eixos que não foram pedidos (roll-up): devolve uma Series (um eixo) ou um
+    # DataFrame (dois eixos: o primeiro nas linhas, o segundo nas colunas)
+    def agregar(self, linhas, colunas=None):
+        mantidos = [linhas] if colunas is None else [linhas, colunas]
+        somados = tuple(posicao for posicao, eixo in enumerate(EIXOS) if eixo not in mantidos)
+        total = self.contagens.sum(axis=somados, dtype='int64')
+        if colunas is None:
+            return pd.Series(total, index=pd.Index(self.rotulos[linhas], name=linhas), name='medalhas')
+        if EIXOS.index(linhas) > EIXOS.index(colunas):
+            total = total.T
+        return pd.DataFrame(total, index=pd.Index(self.rotulos[linhas], name=linhas),
+                            columns=pd.Index(self.rotulos[colunas], name=colunas))
+
+    # Função para obter os k rótulos de um eixo com mais medalhas, em ordem decrescente (k=None: todos com alguma
+    # medalha); empates ficam na ordem dos rótulos
+    def maiores(self, eixo, k=None):
+        total = self.agregar(eixo)
+        total = total[total > 0]
+        ordem = np.argsort(-total.to_numpy(), kind='stable')
+        return total.iloc[ordem[:k] if k is not None else ordem]
+
+    @property
+    def total(self):
+        return int(self.contagens.sum(dtype='int64'))
+
+# Função para obter o cubo de medalhas de um DataFrame, construindo-o apenas na primeira chamada
+def obter_cubo_medalhas(dados):
+    return obter_derivado(dados, 'cubo_medalhas', CuboMedalhas.construir)
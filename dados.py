@@ -1,46 +1,82 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
+from fontes import fonte_existe
+from inicio_rapido import preaquecer, executar_operacao
+from interface import ExecutorTarefas, ListaPaises, exibir_imagem, fechar_janela
+from exportacao import FORMATOS, EXTENSOES, destino_formato
 
-# Função para remover outliers
-def remove_outliers(df, column):
-    Q1 = df[column].quantile(0.25)
-    Q3 = df[column].quantile(0.75)
-    IQR = Q3 - Q1
-    return df[(df[column] >= (Q1 - 1.5 * IQR)) & (df[column] <= (Q3 + 1.5 * IQR))]
+# Módulos de análise importados em segundo plano depois que a janela aparece (inicio_rapido.py)
+MODULOS_PREAQUECIDOS = ['analises', 'cache_disco', 'graficos', 'processamento_blocos', 'progressivo']
+
+# Janela do dashboard estimado em uma amostra (modo progressivo), fechada quando chega o resultado exato
+janela_estimativa = None
 
 # Função para processar os dados e gerar gráficos
 def processar_dados():
     caminho_arquivo = caminho_entrada.get()
     
     # Verificar se o arquivo existe
-    if not os.path.exists(caminho_arquivo):
+    if not fonte_existe(caminho_arquivo):
         messagebox.showerror("Erro", "O arquivo não foi encontrado. Verifique o caminho.")
         return
 
+    # Destino e formato dos dados limpos
+    formato = formato_selecionado()
+    destino = destino_entrada.get().strip()
+    if not destino:
+        messagebox.showerror("Erro", "Informe onde salvar os dados limpos.")
+        return
+
+    # Arquivos maiores que a memória são processados em blocos
+    if modo_blocos.get():
+        def calcular_blocos(tarefa):
+            from processamento_blocos import processar_em_blocos
+            return processar_em_blocos(caminho_arquivo, destino, tarefa=tarefa, formato=formato)
+
+        tarefas.executar(calcular_blocos, lambda momentos: exibir_resultados_blocos(momentos, destino),
+                         "Processando em blocos")
+        return
+
+    # Carregar, limpar e salvar os dados em segundo plano (o resultado fica no cache em disco e é reaproveitado
+    # nas próximas sessões enquanto o arquivo não mudar). A análise roda na própria janela ou no serviço local de
+    # análises (veja operacoes.py); a exportação é sempre feita nesta máquina. No modo progressivo, a estimativa em
+    # uma amostra aparece antes, enquanto o resultado exato é calculado
+    progressivo = modo_progressivo.get()
+
+    def calcular(tarefa):
+        from exportacao import exportar_dados
+
+        resultado = executar_operacao(tarefa, 'geral', caminho_arquivo, progressivo)
+        resultado['destino'] = exportar_dados(resultado['dados'], destino, formato, tarefa)
+        return resultado
+
+    tarefas.executar(calcular, exibir_resultados, ao_parcial=exibir_estimativa)
+
+# Função para exibir as estatísticas e o dashboard estimados em uma amostra (chamada na thread da interface)
+def exibir_estimativa(resultado):
+    global janela_estimativa
     try:
-        # Carregar os dados do arquivo CSV
-        dados = pd.read_csv(caminho_arquivo)
+        from progressivo import formatar_resumo_estimado
+        resultado_stats.set(formatar_resumo_estimado(resultado))
 
-        # Compreensão Inicial dos Dados
-        info_texto = dados.info()
-        print(info_texto)
-        
-        # Tratamento de Valores Ausentes
-        dados = dados.dropna()
+        if resultado['dashboard'] is not None:
+            fechar_janela(janela_estimativa)
+            janela_estimativa = exibir_imagem(janela, "Análise de Dados Olímpicos (estimativa)",
+                                              resultado['dashboard'])
 
-        # Remover outliers nas colunas 'altura' e 'peso'
-        dados = remove_outliers(dados, 'altura')
-        dados = remove_outliers(dados, 'peso')
+    except Exception as e:
+        messagebox.showerror("Erro", str(e))
+
+# Função para exibir as estatísticas e os gráficos (chamada na thread da interface)
+def exibir_resultados(resultado):
+    try:
+        fechar_janela(janela_estimativa)
 
         # Estatísticas Descritivas
-        media_altura = dados['altura'].mean()
-        desvio_padrao_altura = dados['altura'].std()
-        media_peso = dados['peso'].mean()
-        desvio_padrao_peso = dados['peso'].std()
+        media_altura = resultado['media_altura']
+        desvio_padrao_altura = resultado['desvio_padrao_altura']
+        media_peso = resultado['media_peso']
+        desvio_padrao_peso = resultado['desvio_padrao_peso']
         
         # Atualizar a caixa de texto com as estatísticas
         resultado_stats.set(f'Média Altura: {media_altura:.2f} cm\n'
@@ -48,112 +84,152 @@ def processar_dados():
                             f'Média Peso: {media_peso:.2f} kg\n'
                             f'Desvio Padrão Peso: {desvio_padrao_peso:.2f} kg')
 
-        # Estilo do Seaborn
-        sns.set(style='whitegrid')
-
-        # Gráfico de Distribuição da Altura
-        plt.figure(figsize=(10, 6))
-        sns.histplot(dados['altura'], bins=30, kde=True, color='skyblue', stat='density')
-        plt.title('Distribuição da Altura dos Atletas', fontsize=16)
-        plt.xlabel('Altura (cm)', fontsize=14)
-        plt.ylabel('Densidade', fontsize=14)
-        plt.axvline(media_altura, color='red', linestyle='--', label='Média: {:.2f} cm'.format(media_altura))
-        plt.axvline(media_altura + desvio_padrao_altura, color='orange', linestyle='--', label='Desvio Padrão: {:.2f} cm'.format(desvio_padrao_altura))
-        plt.axvline(media_altura - desvio_padrao_altura, color='orange', linestyle='--')
-        plt.legend()
-        plt.show()
-
-        # Gráfico de Dispersão entre Peso e Altura
-        plt.figure(figsize=(10, 6))
-        sns.scatterplot(x='peso', y='altura', data=dados, hue='sexo', style='medalha', palette='deep', s=100)
-        plt.title('Relação entre Peso e Altura dos Atletas', fontsize=16)
-        plt.xlabel('Peso (kg)', fontsize=14)
-        plt.ylabel('Altura (cm)', fontsize=14)
-        plt.grid(True)
-        plt.legend(title='Sexo / Medalha')
-        plt.show()
-
-        # Gráfico de Contagem do Número de Medalhas por País
-        plt.figure(figsize=(12, 6))
-        sns.countplot(data=dados, x='pais', order=dados['pais'].value_counts().index, palette='viridis')
-        plt.xticks(rotation=90)
-        plt.title('Número de Medalhas por País', fontsize=16)
-        plt.xlabel('País', fontsize=14)
-        plt.ylabel('Número de Medalhas', fontsize=14)
-        plt.grid(axis='y')
-        plt.show()
-
-        # Matriz de Correlação
-        plt.figure(figsize=(12, 8))
-        correlation_matrix = dados.corr()
-        sns.heatmap(correlation_matrix, annot=True, fmt=".2f", cmap='coolwarm', square=True, linewidths=0.5)
-        plt.title('Matriz de Correlação', fontsize=16)
-        plt.show()
-
-        # Salvar dados processados
-        dados.to_csv('dados_limpos.csv', index=False)
-        messagebox.showinfo("Sucesso", "Dados processados e salvos como 'dados_limpos.csv'.")
+        # Gráficos, exibidos um de cada vez
+        import matplotlib.pyplot as plt
+        from graficos import graficos_gerais
+
+        for _ in graficos_gerais(resultado):
+            plt.show()
+
+        messagebox.showinfo("Sucesso", f"Dados processados e salvos em '{resultado['destino']}'.")
 
     except Exception as e:
         messagebox.showerror("Erro", str(e))
 
+# Função para montar o texto com a correlação entre cada par de colunas numéricas (processamento em blocos)
+def formatar_correlacao(comomentos):
+    if comomentos is None:
+        return 'Correlação: sem dados'
+    colunas = [coluna.capitalize() for coluna in comomentos.colunas]
+    correlacao = comomentos.correlacao
+    pares = [f'{colunas[i]} x {colunas[j]}: {correlacao[i, j]:.2f}'
+             for i in range(len(colunas)) for j in range(i + 1, len(colunas))]
+    return 'Correlação: ' + ', '.join(pares)
+
+# Função para exibir as estatísticas do processamento em blocos (não gera os gráficos)
+def exibir_resultados_blocos(momentos, destino):
+    # Estatísticas Descritivas
+    resultado_stats.set(f'Média Altura: {momentos["altura"].media:.2f} cm\n'
+                        f'Desvio Padrão Altura: {momentos["altura"].desvio:.2f} cm\n'
+                        f'Média Peso: {momentos["peso"].media:.2f} kg\n'
+                        f'Desvio Padrão Peso: {momentos["peso"].desvio:.2f} kg\n'
+                        f'{formatar_correlacao(momentos["comomentos"])}')
+    messagebox.showinfo("Sucesso", f"Dados processados em blocos e salvos em '{destino}'.")
+
+# Função para obter o formato escolhido (a lista exibe as descrições dos formatos)
+def formato_selecionado():
+    return next(formato for formato, descricao in FORMATOS.items() if descricao == descricao_formato.get())
+
+# Função para ajustar a extensão do destino ao trocar o formato
+def trocar_formato(*_):
+    destino = destino_entrada.get().strip()
+    if destino:
+        destino_entrada.delete(0, tk.END)
+        destino_entrada.insert(0, destino_formato(destino, formato_selecionado()))
+
+# Função para escolher onde salvar os dados limpos (uma pasta no Parquet particionado)
+def escolher_destino():
+    formato = formato_selecionado()
+    if formato == 'parquet':
+        destino = filedialog.askdirectory(title="Pasta dos dados limpos (uma subpasta por ano e país)")
+    else:
+        destino = filedialog.asksaveasfilename(title="Salvar dados limpos", defaultextension=EXTENSOES[formato],
+                                               filetypes=[(FORMATOS[formato], '*' + EXTENSOES[formato])],
+                                               initialfile=destino_formato('dados_limpos', formato))
+    if destino:
+        destino_entrada.delete(0, tk.END)
+        destino_entrada.insert(0, destino)
+
 # Função para listar países
 def listar_paises():
     caminho_arquivo = caminho_entrada.get()
     
     # Verificar se o arquivo existe
-    if not os.path.exists(caminho_arquivo):
+    if not fonte_existe(caminho_arquivo):
         messagebox.showerror("Erro", "O arquivo não foi encontrado. Verifique o caminho.")
         return
 
-    try:
-        # Carregar os dados do arquivo CSV
-        dados = pd.read_csv(caminho_arquivo)
-
-        # Verificar se a coluna 'pais' existe
-        if 'pais' in dados.columns:
-            paises_unicos = dados['pais'].unique()
-            lista_paises.delete(1.0, tk.END)  # Limpar a caixa de texto
-            for pais in paises_unicos:
-                lista_paises.insert(tk.END, pais + '\n')  # Adicionar cada país na caixa de texto
-        else:
-            messagebox.showerror("Erro", "A coluna 'pais' não foi encontrada no arquivo.")
+    tarefas.executar(lambda tarefa: executar_operacao(tarefa, 'paises', caminho_arquivo), exibir_paises)
 
-    except Exception as e:
-        messagebox.showerror("Erro", str(e))
+# Função para exibir a lista de países (dicionário de países: nome -> linhas, anos e medalhas)
+def exibir_paises(paises):
+    lista_paises.definir(paises)
 
 # Função para selecionar o arquivo CSV
 def selecionar_arquivo():
     arquivo = filedialog.askopenfilename(title="Selecione um arquivo CSV", filetypes=[("CSV files", "*.csv")])
     if arquivo:
-        caminho_entrada.delete(0, tk.END)  # Limpar a entrada
-        caminho_entrada.insert(0, arquivo)  # Inserir o caminho do arquivo selecionado
-
-# Configuração da interface gráfica com Tkinter
-janela = tk.Tk()
-janela.title("Análise de Dados Olímpicos")
-
-# Labels e Entradas
-tk.Label(janela, text="Caminho do arquivo CSV:").grid(row=0, column=0, padx=10, pady=5)
-caminho_entrada = tk.Entry(janela, width=50)
-caminho_entrada.grid(row=0, column=1, padx=10, pady=5)
-
-# Botão para selecionar o arquivo
-tk.Button(janela, text="Selecionar Arquivo", command=selecionar_arquivo).grid(row=0, column=2, padx=10, pady=5)
-
-# Botão para processar os dados
-tk.Button(janela, text="Analisar Dados", command=processar_dados).grid(row=1, column=0, columnspan=3, pady=20)
-
-# Botão para listar países
-tk.Button(janela, text="Listar Países", command=listar_paises).grid(row=2, column=0, columnspan=3, pady=5)
-
-# Caixa de texto para exibir a lista de países
-lista_paises = tk.Text(janela, height=10, width=60)
-lista_paises.grid(row=3, column=0, columnspan=3, padx=10, pady=10)
-
-# Label para exibir as estatísticas
-resultado_stats = tk.StringVar()
-tk.Label(janela, textvariable=resultado_stats, justify='left').grid(row=4, column=0, columnspan=3, padx=10, pady=10)
-
-# Executar a interface gráfica
-janela.mainloop()
+        abrir_fonte(arquivo)
+
+# Função para selecionar uma pasta com vários arquivos CSV (por exemplo um arquivo por edição dos Jogos)
+def selecionar_pasta():
+    pasta = filedialog.askdirectory(title="Selecione uma pasta com arquivos CSV")
+    if pasta:
+        abrir_fonte(pasta)
+
+# Função para usar o arquivo ou a pasta selecionada
+def abrir_fonte(arquivo):
+    caminho_entrada.delete(0, tk.END)  # Limpar a entrada
+    caminho_entrada.insert(0, arquivo)  # Inserir o caminho do arquivo selecionado
+    # Gerar a versão binária do CSV e o dicionário de países uma única vez (em segundo plano)
+    # para acelerar as próximas leituras, e já exibir os países do arquivo
+    tarefas.executar(lambda tarefa: executar_operacao(tarefa, 'preparar', arquivo), exibir_paises, "Convertendo o arquivo")
+
+if __name__ == '__main__':
+    # Configuração da interface gráfica com Tkinter
+    janela = tk.Tk()
+    janela.title("Análise de Dados Olímpicos")
+
+    # Labels e Entradas
+    tk.Label(janela, text="Caminho do arquivo CSV ou pasta:").grid(row=0, column=0, padx=10, pady=5)
+    caminho_entrada = tk.Entry(janela, width=50)
+    caminho_entrada.grid(row=0, column=1, padx=10, pady=5)
+
+    # Botões para selecionar um arquivo CSV ou uma pasta de CSVs (o campo também aceita um padrão: dados/*.csv)
+    botoes_fonte = tk.Frame(janela)
+    botoes_fonte.grid(row=0, column=2, padx=10, pady=5)
+    tk.Button(botoes_fonte, text="Selecionar Arquivo", command=selecionar_arquivo).pack(side=tk.LEFT)
+    tk.Button(botoes_fonte, text="Selecionar Pasta", command=selecionar_pasta).pack(side=tk.LEFT, padx=(5, 0))
+
+    # Botão para processar os dados
+    tk.Button(janela, text="Analisar Dados", command=processar_dados).grid(row=1, column=0, columnspan=2, pady=20)
+
+    # Opção para processar arquivos maiores que a memória em blocos
+    modo_blocos = tk.BooleanVar()
+    tk.Checkbutton(janela, text="Processar em blocos", variable=modo_blocos).grid(row=1, column=2, padx=10, pady=20)
+
+    # Opção para exibir primeiro uma estimativa em uma amostra (resultado progressivo; não vale para os blocos)
+    modo_progressivo = tk.BooleanVar(value=True)
+    tk.Checkbutton(janela, text="Estimativa rápida primeiro", variable=modo_progressivo).grid(row=1, column=3, padx=10,
+                                                                                           pady=20)
+
+    # Destino e formato dos dados limpos
+    tk.Label(janela, text="Salvar dados limpos em:").grid(row=2, column=0, padx=10, pady=5)
+    destino_entrada = tk.Entry(janela, width=50)
+    destino_entrada.insert(0, 'dados_limpos.csv')
+    destino_entrada.grid(row=2, column=1, padx=10, pady=5)
+    tk.Button(janela, text="Escolher Destino", command=escolher_destino).grid(row=2, column=2, padx=10, pady=5)
+
+    tk.Label(janela, text="Formato:").grid(row=3, column=0, padx=10, pady=5)
+    descricao_formato = tk.StringVar(value=FORMATOS['csv'])
+    descricao_formato.trace_add('write', trocar_formato)
+    tk.OptionMenu(janela, descricao_formato, *FORMATOS.values()).grid(row=3, column=1, sticky='w', padx=10, pady=5)
+
+    # Botão para listar países
+    tk.Button(janela, text="Listar Países", command=listar_paises).grid(row=4, column=0, columnspan=3, pady=5)
+
+    # Lista de países com busca
+    lista_paises = ListaPaises(janela, linhas=10, largura=60)
+    lista_paises.quadro.grid(row=5, column=0, columnspan=3, padx=10, pady=10)
+
+    # Label para exibir as estatísticas
+    resultado_stats = tk.StringVar()
+    tk.Label(janela, textvariable=resultado_stats, justify='left').grid(row=6, column=0, columnspan=3, padx=10, pady=10)
+
+    # Progresso e cancelamento das análises executadas em segundo plano
+    tarefas = ExecutorTarefas(janela)
+    tarefas.quadro.grid(row=7, column=0, columnspan=3, padx=10, pady=5)
+
+    # Importar as análises em segundo plano e executar a interface gráfica
+    preaquecer(janela, MODULOS_PREAQUECIDOS)
+    janela.mainloop()
@@ -0,0 +1,94 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Geração de arquivos CSV sintéticos com as mesmas colunas da base das Olimpíadas (nome, sexo, idade, altura, peso,
+# pais, ano, esporte, medalha), para medir o desempenho das análises em qualquer escala (benchmark_pipeline.py).
+# As linhas são geradas e gravadas em blocos, de modo que arquivos com dezenas de milhões de linhas não precisam
+# caber na memória. Com a mesma semente e o mesmo número de linhas o arquivo gerado é sempre o mesmo
+#
+# Exemplo:
+#   python dados_sinteticos.py 1000000 atletas_1m.csv
+
+# Países, com pesos que imitam a diferença de tamanho das delegações
+PAISES = ['Estados Unidos', 'Alemanha', 'França', 'Reino Unido', 'Itália', 'Canadá', 'Japão', 'Austrália',
+          'Suécia', 'Hungria', 'Países Baixos', 'China', 'Rússia', 'Polônia', 'Espanha', 'Brasil', 'Suíça',
+          'Finlândia', 'Coreia do Sul', 'Noruega', 'Argentina', 'México', 'Bélgica', 'Romênia', 'Cuba', 'Grécia',
+          'Dinamarca', 'Áustria', 'Nova Zelândia', 'Turquia', 'Índia', 'Quênia', 'Egito', 'África do Sul',
+          'Portugal', 'Chile', 'Colômbia', 'Nigéria', 'Etiópia', 'Uruguai']
+PESOS_PAISES = 1 / np.arange(1, len(PAISES) + 1) ** 0.8
+
+# Anos das edições de verão (sem 1916, 1940 e 1944)
+ANOS = [ano for ano in range(1896, 2017, 4) if ano not in (1916, 1940, 1944)]
+
+ESPORTES = ['Atletismo', 'Natação', 'Ginástica', 'Remo', 'Ciclismo', 'Esgrima', 'Futebol', 'Basquete', 'Vôlei',
+            'Judô', 'Boxe', 'Levantamento de Peso', 'Luta', 'Tiro', 'Vela', 'Hipismo']
+MEDALHAS = ['Ouro', 'Prata', 'Bronze']
+
+# Proporção de linhas sem altura, sem peso e com medalha
+AUSENTES_ALTURA = 0.2
+AUSENTES_PESO = 0.2
+COM_MEDALHA = 0.15
+
+# Número de linhas gravadas de cada vez
+LINHAS_BLOCO = 1_000_000
+
+# Função para gerar um bloco de linhas a partir de um gerador de números aleatórios
+def gerar_bloco(gerador, inicio, linhas):
+    sexo = np.where(gerador.random(linhas) < 0.6, 'M', 'F')
+    masculino = sexo == 'M'
+    altura = np.round(np.where(masculino, gerador.normal(178, 9, linhas), gerador.normal(166, 8, linhas)))
+    peso = np.round(0.9 * (altura - 100) + gerador.normal(0, 8, linhas))
+    altura[gerador.random(linhas) < AUSENTES_ALTURA] = np.nan
+    peso[gerador.random(linhas) < AUSENTES_PESO] = np.nan
+
+    medalha = np.array(MEDALHAS, dtype=object)[gerador.integers(0, len(MEDALHAS), linhas)]
+    medalha[gerador.random(linhas) >= COM_MEDALHA] = None
+    return pd.DataFrame({
+        'nome': [f'Atleta {numero}' for numero in range(inicio, inicio + linhas)],
+        'sexo': sexo,
+        'idade': gerador.integers(16, 41, linhas),
+        'altura': altura,
+        'peso': peso,
+        'pais': np.array(PAISES, dtype=object)[gerador.choice(len(PAISES), linhas, p=PESOS_PAISES / PESOS_PAISES.sum())],
+        'ano': np.array(ANOS)[gerador.integers(0, len(ANOS), linhas)],
+        'esporte': np.array(ESPORTES, dtype=object)[gerador.integers(0, len(ESPORTES), linhas)],
+        'medalha': medalha,
+    })
+
+# Função para gerar um arquivo CSV sintético com o número de linhas pedido
+def gerar_csv(linhas, destino, semente=0, linhas_bloco=LINHAS_BLOCO):
+    gerador = np.random.default_rng(semente)
+    temporario = f'{destino}.{os.getpid()}.tmp'
+    try:
+        for inicio in range(0, linhas, linhas_bloco):
+            bloco = gerar_bloco(gerador, inicio, min(linhas_bloco, linhas - inicio))
+            bloco.to_csv(temporario, mode='w' if inicio == 0 else 'a', header=inicio == 0, index=False)
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return destino
+
+# Função para obter um arquivo sintético guardado em uma pasta, gerando-o apenas se ainda não existir
+def obter_csv(linhas, pasta, semente=0):
+    os.makedirs(pasta, exist_ok=True)
+    destino = os.path.join(pasta, f'atletas_sinteticos_{linhas}_{semente}.csv')
+    if not os.path.exists(destino):
+        gerar_csv(linhas, destino, semente)
+    return destino
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um CSV sintético com as colunas da base das Olimpíadas.")
+    parser.add_argument('linhas', type=int, help="número de linhas")
+    parser.add_argument('destino', help="arquivo CSV gerado")
+    parser.add_argument('--semente', type=int, default=0, help="semente dos números aleatórios")
+    argumentos = parser.parse_args(argv)
+    gerar_csv(argumentos.linhas, argumentos.destino, argumentos.semente)
+    print(f"{argumentos.linhas} linhas gravadas em {argumentos.destino}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,145 +1,152 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
 import tkinter as tk
 from tkinter import messagebox, filedialog
+from fontes import fonte_existe
+from inicio_rapido import preaquecer, executar_operacao
+from interface import ExecutorTarefas, ListaPaises, exibir_imagem, fechar_janela
 
-# Função para carregar e listar os países
-def listar_paises(dados):
-    paises_unicos = dados['pais'].unique()  # Obter países únicos
-    # Limpar o campo de texto antes de adicionar novos países
-    lista_paises_text.delete(1.0, tk.END)
-    for pais in paises_unicos:
-        lista_paises_text.insert(tk.END, f"{pais}\n")  # Inserir cada país em uma nova linha
+# Módulos de análise importados em segundo plano depois que a janela aparece (inicio_rapido.py); os gráficos são
+# desenhados em outros processos (paineis.py) e esta janela não importa o matplotlib nem o seaborn
+MODULOS_PREAQUECIDOS = ['analises', 'cache_disco', 'paineis', 'progressivo']
+
+# Janela do dashboard estimado em uma amostra (modo progressivo), fechada quando chega o resultado exato
+janela_estimativa = None
+
+# Função para listar os países (dicionário de países: nome -> linhas, anos e medalhas)
+def listar_paises(paises):
+    lista_paises.definir(paises)
 
 # Função para carregar e processar os dados
 def processar_dados():
     caminho_arquivo = caminho_entrada.get()  # Caminho do arquivo CSV
 
-    if not os.path.exists(caminho_arquivo):
+    if not fonte_existe(caminho_arquivo):
         messagebox.showerror("Erro", "O arquivo não foi encontrado. Verifique o caminho.")
         return
 
     try:
-        # Carregar os dados
-        dados = pd.read_csv(caminho_arquivo)
-
-        # Listar os países
-        listar_paises(dados)
-
-        # Filtrar os dados pelos anos especificados
+        # Anos especificados para o filtro
         ano_inicio = int(ano_inicio_entrada.get())
         ano_fim = int(ano_fim_entrada.get())
-        dados = dados[(dados['ano'] >= ano_inicio) & (dados['ano'] <= ano_fim)]
+    except ValueError as e:
+        messagebox.showerror("Erro", str(e))
+        return
 
-        # Tratamento de valores ausentes e outliers
-        dados = dados.dropna()
+    # Carregar, filtrar e limpar os dados e desenhar os gráficos em segundo plano
+    # (na própria janela ou no serviço local de análises, veja operacoes.py); no modo progressivo, a estimativa
+    # em uma amostra aparece antes, enquanto o resultado exato é calculado
+    progressivo = modo_progressivo.get()
 
-        def remove_outliers(df, column):
-            Q1 = df[column].quantile(0.25)
-            Q3 = df[column].quantile(0.75)
-            IQR = Q3 - Q1
-            return df[(df[column] >= (Q1 - 1.5 * IQR)) & (df[column] <= (Q3 + 1.5 * IQR))]
+    def calcular(tarefa):
+        return executar_operacao(tarefa, 'periodo', caminho_arquivo, ano_inicio, ano_fim, progressivo)
 
-        dados = remove_outliers(dados, 'altura')
-        dados = remove_outliers(dados, 'peso')
+    tarefas.executar(calcular, exibir_resultados, ao_parcial=exibir_estimativa)
 
-        # Estatísticas descritivas
-        media_altura = dados['altura'].mean()
-        desvio_padrao_altura = dados['altura'].std()
-        media_peso = dados['peso'].mean()
-        desvio_padrao_peso = dados['peso'].std()
+# Função para exibir as estatísticas e o dashboard estimados em uma amostra (chamada na thread da interface)
+def exibir_estimativa(resultado):
+    global janela_estimativa
+    try:
+        from progressivo import formatar_resumo_estimado
+        resultados.set(formatar_resumo_estimado(resultado))
 
-        # Exibir resultados
-        resultados.set(f'Média Altura: {media_altura:.2f} cm, Desvio Padrão Altura: {desvio_padrao_altura:.2f} cm\n'
-                       f'Média Peso: {media_peso:.2f} kg, Desvio Padrão Peso: {desvio_padrao_peso:.2f} kg')
-
-        # Plotar os gráficos
-        sns.set(style='whitegrid')
-        fig, axes = plt.subplots(2, 2, figsize=(20, 15))
-
-        # Gráfico 1: Distribuição da Altura dos Atletas
-        sns.histplot(dados['altura'], bins=30, kde=True, color='skyblue', stat='density', ax=axes[0, 0])
-        axes[0, 0].set_title('Distribuição da Altura dos Atletas', fontsize=16)
-        axes[0, 0].set_xlabel('Altura (cm)', fontsize=14)
-        axes[0, 0].set_ylabel('Densidade', fontsize=14)
-        axes[0, 0].axvline(media_altura, color='red', linestyle='--', label='Média: {:.2f} cm'.format(media_altura))
-        axes[0, 0].axvline(media_altura + desvio_padrao_altura, color='orange', linestyle='--', label='Desvio Padrão: {:.2f} cm'.format(desvio_padrao_altura))
-        axes[0, 0].axvline(media_altura - desvio_padrao_altura, color='orange', linestyle='--')
-        axes[0, 0].legend()
-
-        # Gráfico 2: Relação entre Peso e Altura dos Atletas
-        sns.scatterplot(x='peso', y='altura', data=dados, hue='sexo', style='medalha', palette='deep', s=100, ax=axes[0, 1])
-        axes[0, 1].set_title('Relação entre Peso e Altura dos Atletas', fontsize=16)
-        axes[0, 1].set_xlabel('Peso (kg)', fontsize=14)
-        axes[0, 1].set_ylabel('Altura (cm)', fontsize=14)
-
-        # Gráfico 3: Número de Medalhas por País
-        sns.countplot(data=dados, x='pais', order=dados['pais'].value_counts().index, palette='viridis', ax=axes[1, 0])
-        axes[1, 0].set_title('Número de Medalhas por País', fontsize=16)
-        axes[1, 0].set_xlabel('País', fontsize=14)
-        axes[1, 0].set_ylabel('Número de Medalhas', fontsize=14)
-        axes[1, 0].tick_params(axis='x', rotation=90)
-
-        # Gráfico 4: Matriz de Correlação
-        colunas_numericas = dados.select_dtypes(include='number')
-        correlation_matrix = colunas_numericas.corr()
-        sns.heatmap(correlation_matrix, annot=True, fmt=".2f", cmap='coolwarm', square=True, linewidths=0.5, ax=axes[1, 1])
-        axes[1, 1].set_title('Matriz de Correlação', fontsize=16)
-
-        plt.tight_layout()
-        plt.show()
+        if resultado['dashboard'] is not None:
+            fechar_janela(janela_estimativa)
+            janela_estimativa = exibir_imagem(janela, "Análise de Dados das Olimpíadas (estimativa)",
+                                              resultado['dashboard'])
 
     except Exception as e:
         messagebox.showerror("Erro", str(e))
 
-# Função para selecionar o arquivo CSV
-def selecionar_arquivo():
-    caminho = filedialog.askopenfilename(filetypes=[("Arquivo CSV", "*.csv")])
-    caminho_entrada.delete(0, tk.END)  # Limpa o campo de entrada
-    caminho_entrada.insert(0, caminho)  # Insere o caminho selecionado
-
-# Configuração da Interface Gráfica com Tkinter
-janela = tk.Tk()
-janela.title("Análise de Dados das Olimpíadas")
-
-# Labels e Entradas
-tk.Label(janela, text="Caminho do arquivo CSV:").grid(row=0, column=0, padx=10, pady=5)
-caminho_entrada = tk.Entry(janela, width=50)
-caminho_entrada.grid(row=0, column=1, padx=10, pady=5)
-
-# Botão para selecionar o arquivo
-tk.Button(janela, text="Selecionar Arquivo", command=selecionar_arquivo).grid(row=0, column=2, padx=10, pady=5)
-
-tk.Label(janela, text="Ano de início:").grid(row=1, column=0, padx=10, pady=5)
-ano_inicio_entrada = tk.Entry(janela)
-ano_inicio_entrada.grid(row=1, column=1, padx=10, pady=5)
+# Função para exibir as estatísticas e os gráficos (chamada na thread da interface)
+def exibir_resultados(resultado):
+    try:
+        fechar_janela(janela_estimativa)
 
-tk.Label(janela, text="Ano de fim:").grid(row=2, column=0, padx=10, pady=5)
-ano_fim_entrada = tk.Entry(janela)
-ano_fim_entrada.grid(row=2, column=1, padx=10, pady=5)
+        # Listar os países
+        listar_paises(resultado['paises'])
 
-# Botão para processar os dados
-tk.Button(janela, text="Processar Dados", command=processar_dados).grid(row=3, column=0, columnspan=2, pady=20)
+        # Estatísticas descritivas
+        media_altura = resultado['media_altura']
+        desvio_padrao_altura = resultado['desvio_padrao_altura']
+        media_peso = resultado['media_peso']
+        desvio_padrao_peso = resultado['desvio_padrao_peso']
 
-# Label para exibir os resultados
-resultados = tk.StringVar()
-tk.Label(janela, textvariable=resultados).grid(row=4, column=0, columnspan=2, padx=10, pady=10)
+        # Exibir resultados
+        from analises import formatar_medalhas
+        resultados.set(f'Média Altura: {media_altura:.2f} cm, Desvio Padrão Altura: {desvio_padrao_altura:.2f} cm\n'
+                       f'Média Peso: {media_peso:.2f} kg, Desvio Padrão Peso: {desvio_padrao_peso:.2f} kg\n'
+                       f'Medalhas: {formatar_medalhas(resultado["medalhas"])}')
 
-# Criação do widget Text para exibir a lista de países
-tk.Label(janela, text="Lista de Países:").grid(row=5, column=0, padx=10, pady=5)
-lista_paises_frame = tk.Frame(janela)
-lista_paises_frame.grid(row=6, column=0, columnspan=2, padx=10, pady=5)
+        # Exibir os gráficos (já desenhados em segundo plano)
+        exibir_imagem(janela, "Análise de Dados das Olimpíadas", resultado['dashboard'])
 
-# Criar o widget Text com scrollbar
-lista_paises_text = tk.Text(lista_paises_frame, height=10, width=50)
-lista_paises_text.pack(side=tk.LEFT, fill=tk.BOTH)
+    except Exception as e:
+        messagebox.showerror("Erro", str(e))
 
-scrollbar = tk.Scrollbar(lista_paises_frame, command=lista_paises_text.yview)
-scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+# Função para selecionar o arquivo CSV
+def selecionar_arquivo():
+    caminho = filedialog.askopenfilename(filetypes=[("Arquivo CSV", "*.csv")])
+    if caminho:
+        abrir_fonte(caminho)
 
-lista_paises_text.config(yscrollcommand=scrollbar.set)
+# Função para selecionar uma pasta com vários arquivos CSV (por exemplo um arquivo por edição dos Jogos)
+def selecionar_pasta():
+    pasta = filedialog.askdirectory(title="Selecione uma pasta com arquivos CSV")
+    if pasta:
+        abrir_fonte(pasta)
 
-# Executar a interface gráfica
-janela.mainloop()
+# Função para usar o arquivo ou a pasta selecionada
+def abrir_fonte(caminho):
+    caminho_entrada.delete(0, tk.END)  # Limpa o campo de entrada
+    caminho_entrada.insert(0, caminho)  # Insere o caminho selecionado
+    # Gerar a versão binária do CSV e o dicionário de países uma única vez (em segundo plano)
+    # para acelerar as próximas leituras, e já exibir os países do arquivo
+    tarefas.executar(lambda tarefa: executar_operacao(tarefa, 'preparar', caminho), listar_paises, "Convertendo o arquivo")
+
+if __name__ == '__main__':
+    # Configuração da Interface Gráfica com Tkinter
+    janela = tk.Tk()
+    janela.title("Análise de Dados das Olimpíadas")
+
+    # Labels e Entradas
+    tk.Label(janela, text="Caminho do arquivo CSV ou pasta:").grid(row=0, column=0, padx=10, pady=5)
+    caminho_entrada = tk.Entry(janela, width=50)
+    caminho_entrada.grid(row=0, column=1, padx=10, pady=5)
+
+    # Botões para selecionar um arquivo CSV ou uma pasta de CSVs (o campo também aceita um padrão: dados/*.csv)
+    botoes_fonte = tk.Frame(janela)
+    botoes_fonte.grid(row=0, column=2, padx=10, pady=5)
+    tk.Button(botoes_fonte, text="Selecionar Arquivo", command=selecionar_arquivo).pack(side=tk.LEFT)
+    tk.Button(botoes_fonte, text="Selecionar Pasta", command=selecionar_pasta).pack(side=tk.LEFT, padx=(5, 0))
+
+    tk.Label(janela, text="Ano de início:").grid(row=1, column=0, padx=10, pady=5)
+    ano_inicio_entrada = tk.Entry(janela)
+    ano_inicio_entrada.grid(row=1, column=1, padx=10, pady=5)
+
+    tk.Label(janela, text="Ano de fim:").grid(row=2, column=0, padx=10, pady=5)
+    ano_fim_entrada = tk.Entry(janela)
+    ano_fim_entrada.grid(row=2, column=1, padx=10, pady=5)
+
+    # Botão para processar os dados
+    tk.Button(janela, text="Processar Dados", command=processar_dados).grid(row=3, column=0, columnspan=2, pady=20)
+
+    # Opção para exibir primeiro uma estimativa em uma amostra (resultado progressivo)
+    modo_progressivo = tk.BooleanVar(value=True)
+    tk.Checkbutton(janela, text="Estimativa rápida primeiro", variable=modo_progressivo).grid(row=3, column=2, padx=10,
+                                                                                           pady=20)
+
+    # Label para exibir os resultados
+    resultados = tk.StringVar()
+    tk.Label(janela, textvariable=resultados).grid(row=4, column=0, columnspan=2, padx=10, pady=10)
+
+    # Lista de países com busca (com barra de rolagem)
+    tk.Label(janela, text="Lista de Países:").grid(row=5, column=0, padx=10, pady=5)
+    lista_paises = ListaPaises(janela, linhas=10, largura=50)
+    lista_paises.quadro.grid(row=6, column=0, columnspan=2, padx=10, pady=5)
+
+    # Progresso e cancelamento das análises executadas em segundo plano
+    tarefas = ExecutorTarefas(janela)
+    tarefas.quadro.grid(row=7, column=0, columnspan=2, padx=10, pady=5)
+
+    # Importar as análises em segundo plano e executar a interface gráfica
+    preaquecer(janela, MODULOS_PREAQUECIDOS)
+    janela.mainloop()
@@ -1,170 +1,249 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import filedialog  # Importar filedialog
+from fontes import fonte_existe
+from inicio_rapido import preaquecer, executar_operacao
+from interface import ExecutorTarefas, ListaPaises, autocompletar, exibir_imagem, exibir_texto
+
+# Módulos de análise importados em segundo plano depois que a janela aparece (inicio_rapido.py)
+MODULOS_PREAQUECIDOS = ['analises', 'cache_disco', 'paineis', 'graficos']
 
 # Função para listar os países do arquivo CSV
 def listar_paises():
     caminho_arquivo = caminho_entrada.get()
 
-    if not os.path.exists(caminho_arquivo):
+    if not fonte_existe(caminho_arquivo):
         messagebox.showerror("Erro", "O arquivo não foi encontrado. Verifique o caminho.")
         return
 
-    try:
-        # Carregar os dados
-        dados = pd.read_csv(caminho_arquivo)
-        paises_unicos = dados['pais'].unique()  # Obter países únicos
+    tarefas.executar(lambda tarefa: executar_operacao(tarefa, 'paises', caminho_arquivo), exibir_paises)
 
-        # Limpar o campo de texto antes de adicionar novos países
-        lista_paises_text.delete(1.0, tk.END)
-        for pais in paises_unicos:
-            lista_paises_text.insert(tk.END, f"{pais}\n")  # Inserir cada país em uma nova linha
+# Função para exibir a lista de países (dicionário de países: nome -> linhas, anos e medalhas)
+def exibir_paises(paises):
+    lista_paises.definir(paises)
 
-    except Exception as e:
-        messagebox.showerror("Erro", str(e))
+# Função para preencher o campo de país que esteve em foco por último com o país clicado na lista
+# (no campo de vários países o país clicado é acrescentado à lista)
+def escolher_pais(pais):
+    if entrada_pais_ativa is paises_entrada:
+        paises = ler_paises()
+        if pais not in paises:
+            paises_entrada.delete(0, tk.END)
+            paises_entrada.insert(0, ', '.join(paises + [pais]))
+        return
+    entrada_pais_ativa.delete(0, tk.END)
+    entrada_pais_ativa.insert(0, pais)
+
+# Função para ler a lista de países do campo de vários países (separados por vírgula)
+def ler_paises():
+    return [pais.strip() for pais in paises_entrada.get().split(',') if pais.strip()]
+
+# Função para registrar qual dos campos de país esteve em foco por último
+def ativar_entrada(entrada):
+    global entrada_pais_ativa
+    entrada_pais_ativa = entrada
+
+# Função para montar o texto com as estatísticas descritivas de um país
+def formatar_estatisticas(pais, resumo):
+    if pais not in resumo.index:
+        return f'{pais} - Não há dados disponíveis para o período selecionado.'
+
+    estatisticas = resumo.loc[pais]
+    return (f'{pais} - Média Altura: {estatisticas["altura_media"]:.2f} cm, Desvio Padrão Altura: {estatisticas["altura_desvio"]:.2f} cm\n'
+            f'{pais} - Média Peso: {estatisticas["peso_media"]:.2f} kg, Desvio Padrão Peso: {estatisticas["peso_desvio"]:.2f} kg')
+
+# Função para montar o texto com os valores p dos testes de uma medida entre dois países
+def formatar_testes(testes, medida):
+    linhas = testes[testes['medida'] == medida]
+    if linhas.empty:
+        return f'{medida.capitalize()} - Testes indisponíveis (dados insuficientes).'
+    teste = linhas.iloc[0]
+    return (f'{medida.capitalize()} - Valor p: Welch {teste["welch_p"]:.4f}, Mann-Whitney {teste["mann_whitney_p"]:.4f}, '
+            f'Kolmogorov-Smirnov {teste["ks_p"]:.4f}')
+
+# Função para montar o texto com o resumo e os testes da comparação de vários países
+def formatar_comparacao(resultado):
+    ausentes = [pais for pais in resultado['paises'] if pais not in resultado['resumo'].index]
+    texto = f"Anos: {resultado['anos'][0]}-{resultado['anos'][1]}\n\n"
+    texto += 'Estatísticas por país (IC = intervalo de confiança de 95% da média, por bootstrap):\n'
+    texto += resultado['resumo'].to_string(float_format='{:.2f}'.format) + '\n\n'
+    if ausentes:
+        texto += f"Sem dados no período: {', '.join(ausentes)}\n\n"
+    texto += 'Medalhas por sexo:\n' + resultado['medalhas_sexo'].to_string() + '\n\n'
+    texto += 'Testes entre os pares de países (valores p):\n'
+    colunas = ['pais_a', 'pais_b', 'medida', 'diferenca_medias', 'welch_p', 'mann_whitney_p', 'ks_p']
+    texto += resultado['testes'][colunas].to_string(index=False, float_format='{:.4f}'.format)
+    return texto
 
 # Função para processar e comparar dados dos dois países
 def processar_dados():
     caminho_arquivo = caminho_entrada.get()
 
-    if not os.path.exists(caminho_arquivo):
+    if not fonte_existe(caminho_arquivo):
         messagebox.showerror("Erro", "O arquivo não foi encontrado. Verifique o caminho.")
         return
 
     try:
-        # Carregar os dados
-        dados = pd.read_csv(caminho_arquivo)
-
         # Solicitar ano de início e fim e os países
         ano_inicio = int(ano_inicio_entrada.get())
         ano_fim = int(ano_fim_entrada.get())
         pais_1 = pais_1_entrada.get()
         pais_2 = pais_2_entrada.get()
+    except ValueError as e:
+        messagebox.showerror("Erro", str(e))
+        return
 
-        # Filtrar os dados pelos anos e pelos países especificados
-        dados_pais_1 = dados[(dados['ano'] >= ano_inicio) & (dados['ano'] <= ano_fim) & (dados['pais'] == pais_1)]
-        dados_pais_2 = dados[(dados['ano'] >= ano_inicio) & (dados['ano'] <= ano_fim) & (dados['pais'] == pais_2)]
-
-        # Tratamento de valores ausentes
-        dados_pais_1 = dados_pais_1.dropna(subset=['altura', 'peso'])
-        dados_pais_2 = dados_pais_2.dropna(subset=['altura', 'peso'])
+    # Filtrar os dados, calcular as estatísticas e desenhar os gráficos em segundo plano
+    # (gráficos somente se houver dados para ambos os países), na própria janela ou no serviço local de análises
+    def calcular(tarefa):
+        return executar_operacao(tarefa, 'comparacao', caminho_arquivo, pais_1, pais_2, ano_inicio, ano_fim)
 
-        # Estatísticas descritivas para os dois países
-        if not dados_pais_1.empty:
-            media_altura_1 = dados_pais_1['altura'].mean()
-            desvio_padrao_altura_1 = dados_pais_1['altura'].std()
-            media_peso_1 = dados_pais_1['peso'].mean()
-            desvio_padrao_peso_1 = dados_pais_1['peso'].std()
+    tarefas.executar(calcular, exibir_resultados)
 
-            resultados_pais_1.set(f'{pais_1} - Média Altura: {media_altura_1:.2f} cm, Desvio Padrão Altura: {desvio_padrao_altura_1:.2f} cm\n'
-                                  f'{pais_1} - Média Peso: {media_peso_1:.2f} kg, Desvio Padrão Peso: {desvio_padrao_peso_1:.2f} kg')
-        else:
-            resultados_pais_1.set(f'{pais_1} - Não há dados disponíveis para o período selecionado.')
+# Função para exibir as estatísticas e os gráficos da comparação (chamada na thread da interface)
+def exibir_resultados(resultado):
+    try:
+        pais_1, pais_2 = resultado['pais_1'], resultado['pais_2']
 
-        if not dados_pais_2.empty:
-            media_altura_2 = dados_pais_2['altura'].mean()
-            desvio_padrao_altura_2 = dados_pais_2['altura'].std()
-            media_peso_2 = dados_pais_2['peso'].mean()
-            desvio_padrao_peso_2 = dados_pais_2['peso'].std()
+        # Estatísticas descritivas para os dois países e testes de diferença entre eles
+        resultados_pais_1.set(formatar_estatisticas(pais_1, resultado['resumo']))
+        resultados_pais_2.set(formatar_estatisticas(pais_2, resultado['resumo']))
+        resultados_testes.set('\n'.join(formatar_testes(resultado['testes'], medida) for medida in ('altura', 'peso')))
 
-            resultados_pais_2.set(f'{pais_2} - Média Altura: {media_altura_2:.2f} cm, Desvio Padrão Altura: {desvio_padrao_altura_2:.2f} cm\n'
-                                  f'{pais_2} - Média Peso: {media_peso_2:.2f} kg, Desvio Padrão Peso: {desvio_padrao_peso_2:.2f} kg')
-        else:
-            resultados_pais_2.set(f'{pais_2} - Não há dados disponíveis para o período selecionado.')
-
-        # Criar gráficos somente se houver dados para ambos os países
-        if not dados_pais_1.empty and not dados_pais_2.empty:
-            sns.set(style='whitegrid')
-
-            # Criar dashboard comparativo com subplots
-            fig, axes = plt.subplots(2, 2, figsize=(20, 15))
-
-            # Gráfico 1: Comparação da distribuição de altura
-            sns.histplot(dados_pais_1['altura'], bins=30, kde=True, color='skyblue', stat='density', label=pais_1, ax=axes[0, 0])
-            sns.histplot(dados_pais_2['altura'], bins=30, kde=True, color='green', stat='density', label=pais_2, ax=axes[0, 0])
-            axes[0, 0].set_title(f'Distribuição da Altura ({pais_1} vs {pais_2})', fontsize=16)
-            axes[0, 0].set_xlabel('Altura (cm)', fontsize=14)
-            axes[0, 0].set_ylabel('Densidade', fontsize=14)
-            axes[0, 0].legend()
-
-            # Gráfico 2: Comparação da relação entre peso e altura
-            sns.scatterplot(x='peso', y='altura', data=dados_pais_1, hue='sexo', style='medalha', palette='deep', s=100, ax=axes[0, 1])
-            sns.scatterplot(x='peso', y='altura', data=dados_pais_2, hue='sexo', style='medalha', palette='dark', s=100, ax=axes[0, 1])
-            axes[0, 1].set_title(f'Relação entre Peso e Altura ({pais_1} vs {pais_2})', fontsize=16)
-            axes[0, 1].set_xlabel('Peso (kg)', fontsize=14)
-            axes[0, 1].set_ylabel('Altura (cm)', fontsize=14)
-
-            # Gráfico 3: Contagem de medalhas por sexo
-            sns.countplot(x='sexo', hue='pais', data=dados[(dados['pais'] == pais_1) | (dados['pais'] == pais_2)], palette='viridis', ax=axes[1, 0])
-            axes[1, 0].set_title(f'Número de Medalhas por Sexo ({pais_1} vs {pais_2})', fontsize=16)
-            axes[1, 0].set_xlabel('Sexo', fontsize=14)
-            axes[1, 0].set_ylabel('Número de Medalhas', fontsize=14)
-
-            # Ajustar layout
-            plt.tight_layout()
-            plt.show()
+        # Exibir os gráficos somente se houver dados para ambos os países
+        if resultado['dashboard'] is not None:
+            exibir_imagem(janela, f"Comparação - {pais_1} vs {pais_2}", resultado['dashboard'])
         else:
             messagebox.showinfo("Informação", "Não há dados suficientes para gerar os gráficos.")
 
     except Exception as e:
         messagebox.showerror("Erro", str(e))
 
-# Função para selecionar o arquivo CSV
-def selecionar_arquivo():
-    arquivo = filedialog.askopenfilename(title="Selecione um arquivo CSV", filetypes=[("CSV files", "*.csv")])
-    if arquivo:
-        caminho_entrada.delete(0, tk.END)  # Limpar a entrada
-        caminho_entrada.insert(0, arquivo)  # Inserir o caminho do arquivo selecionado
-
-# Configuração da interface gráfica com Tkinter
-janela = tk.Tk()
-janela.title("Comparação de Atletas Olímpicos entre Países")
-
-# Labels e Entradas
-tk.Label(janela, text="Caminho do arquivo CSV:").grid(row=0, column=0, padx=10, pady=5)
-caminho_entrada = tk.Entry(janela, width=50)
-caminho_entrada.grid(row=0, column=1, padx=10, pady=5)
-
-# Botão para selecionar o arquivo
-tk.Button(janela, text="Selecionar Arquivo", command=selecionar_arquivo).grid(row=0, column=2, padx=10, pady=5)
-
-# Botão para listar os países
-tk.Button(janela, text="Listar Países", command=listar_paises).grid(row=0, column=3, padx=10, pady=5)
-
-tk.Label(janela, text="Ano de início:").grid(row=1, column=0, padx=10, pady=5)
-ano_inicio_entrada = tk.Entry(janela)
-ano_inicio_entrada.grid(row=1, column=1, padx=10, pady=5)
-
-tk.Label(janela, text="Ano de fim:").grid(row=2, column=0, padx=10, pady=5)
-ano_fim_entrada = tk.Entry(janela)
-ano_fim_entrada.grid(row=2, column=1, padx=10, pady=5)
+# Função para comparar vários países de uma vez: estatísticas, intervalos de confiança e testes entre todos os pares
+def processar_varios():
+    caminho_arquivo = caminho_entrada.get()
 
-tk.Label(janela, text="País 1:").grid(row=3, column=0, padx=10, pady=5)
-pais_1_entrada = tk.Entry(janela)
-pais_1_entrada.grid(row=3, column=1, padx=10, pady=5)
+    if not fonte_existe(caminho_arquivo):
+        messagebox.showerror("Erro", "O arquivo não foi encontrado. Verifique o caminho.")
+        return
 
-tk.Label(janela, text="País 2:").grid(row=4, column=0, padx=10, pady=5)
-pais_2_entrada = tk.Entry(janela)
-pais_2_entrada.grid(row=4, column=1, padx=10, pady=5)
+    try:
+        ano_inicio = int(ano_inicio_entrada.get())
+        ano_fim = int(ano_fim_entrada.get())
+        paises = ler_paises()
+        if len(paises) < 2:
+            raise ValueError("Informe pelo menos dois países, separados por vírgula.")
+    except ValueError as e:
+        messagebox.showerror("Erro", str(e))
+        return
 
-# Botão para processar os dados
-tk.Button(janela, text="Comparar Países", command=processar_dados).grid(row=5, column=0, columnspan=3, pady=20)
+    def calcular(tarefa):
+        return executar_operacao(tarefa, 'varios', caminho_arquivo, paises, ano_inicio, ano_fim)
 
-# Label para exibir a lista de países
-tk.Label(janela, text="Lista de Países:").grid(row=6, column=0, padx=10, pady=5, columnspan=2)
-lista_paises_text = tk.Text(janela, height=10, width=40)
-lista_paises_text.grid(row=7, column=0, columnspan=4, padx=10, pady=5)
+    tarefas.executar(calcular, exibir_varios)
 
-# Labels para exibir os resultados
-resultados_pais_1 = tk.StringVar()
-tk.Label(janela, textvariable=resultados_pais_1).grid(row=8, column=0, columnspan=3, padx=10, pady=5)
+# Função para exibir as tabelas e os gráficos da comparação de vários países (chamada na thread da interface)
+def exibir_varios(resultado):
+    try:
+        titulo = f"Comparação - {', '.join(resultado['paises'])}"
+        exibir_texto(janela, titulo, formatar_comparacao(resultado))
+        if resultado['dashboard'] is not None:
+            exibir_imagem(janela, titulo, resultado['dashboard'])
+        else:
+            messagebox.showinfo("Informação", "Não há dados suficientes para gerar os gráficos.")
 
-resultados_pais_2 = tk.StringVar()
-tk.Label(janela, textvariable=resultados_pais_2).grid(row=9, column=0, columnspan=3, padx=10, pady=5)
+    except Exception as e:
+        messagebox.showerror("Erro", str(e))
 
-# Iniciar a interface gráfica
-janela.mainloop()
+# Função para selecionar o arquivo CSV
+def selecionar_arquivo():
+    arquivo = filedialog.askopenfilename(title="Selecione um arquivo CSV", filetypes=[("CSV files", "*.csv")])
+    if arquivo:
+        abrir_fonte(arquivo)
+
+# Função para selecionar uma pasta com vários arquivos CSV (por exemplo um arquivo por edição dos Jogos)
+def selecionar_pasta():
+    pasta = filedialog.askdirectory(title="Selecione uma pasta com arquivos CSV")
+    if pasta:
+        abrir_fonte(pasta)
+
+# Função para usar o arquivo ou a pasta selecionada
+def abrir_fonte(arquivo):
+    caminho_entrada.delete(0, tk.END)  # Limpar a entrada
+    caminho_entrada.insert(0, arquivo)  # Inserir o caminho do arquivo selecionado
+    # Gerar a versão binária do CSV e o dicionário de países uma única vez (em segundo plano)
+    # para acelerar as próximas leituras, e já exibir os países do arquivo
+    tarefas.executar(lambda tarefa: executar_operacao(tarefa, 'preparar', arquivo), exibir_paises, "Convertendo o arquivo")
+
+if __name__ == '__main__':
+    # Configuração da interface gráfica com Tkinter
+    janela = tk.Tk()
+    janela.title("Comparação de Atletas Olímpicos entre Países")
+
+    # Labels e Entradas
+    tk.Label(janela, text="Caminho do arquivo CSV ou pasta:").grid(row=0, column=0, padx=10, pady=5)
+    caminho_entrada = tk.Entry(janela, width=50)
+    caminho_entrada.grid(row=0, column=1, padx=10, pady=5)
+
+    # Botões para selecionar um arquivo CSV ou uma pasta de CSVs (o campo também aceita um padrão: dados/*.csv)
+    botoes_fonte = tk.Frame(janela)
+    botoes_fonte.grid(row=0, column=2, padx=10, pady=5)
+    tk.Button(botoes_fonte, text="Selecionar Arquivo", command=selecionar_arquivo).pack(side=tk.LEFT)
+    tk.Button(botoes_fonte, text="Selecionar Pasta", command=selecionar_pasta).pack(side=tk.LEFT, padx=(5, 0))
+
+    # Botão para listar os países
+    tk.Button(janela, text="Listar Países", command=listar_paises).grid(row=0, column=3, padx=10, pady=5)
+
+    tk.Label(janela, text="Ano de início:").grid(row=1, column=0, padx=10, pady=5)
+    ano_inicio_entrada = tk.Entry(janela)
+    ano_inicio_entrada.grid(row=1, column=1, padx=10, pady=5)
+
+    tk.Label(janela, text="Ano de fim:").grid(row=2, column=0, padx=10, pady=5)
+    ano_fim_entrada = tk.Entry(janela)
+    ano_fim_entrada.grid(row=2, column=1, padx=10, pady=5)
+
+    tk.Label(janela, text="País 1:").grid(row=3, column=0, padx=10, pady=5)
+    pais_1_entrada = tk.Entry(janela)
+    pais_1_entrada.grid(row=3, column=1, padx=10, pady=5)
+
+    tk.Label(janela, text="País 2:").grid(row=4, column=0, padx=10, pady=5)
+    pais_2_entrada = tk.Entry(janela)
+    pais_2_entrada.grid(row=4, column=1, padx=10, pady=5)
+
+    tk.Label(janela, text="Vários países (separados por vírgula):").grid(row=5, column=0, padx=10, pady=5)
+    paises_entrada = tk.Entry(janela, width=50)
+    paises_entrada.grid(row=5, column=1, padx=10, pady=5)
+
+    # Botões para processar os dados (dois países ou a lista de vários países)
+    tk.Button(janela, text="Comparar Países", command=processar_dados).grid(row=6, column=0, columnspan=2, pady=20)
+    tk.Button(janela, text="Comparar Vários Países", command=processar_varios).grid(row=6, column=2, columnspan=2, pady=20)
+
+    # Lista de países com busca; clicar em um país preenche o último campo de país usado (ou o acrescenta à
+    # lista de vários países) e os dois campos de país são completados ao digitar
+    tk.Label(janela, text="Lista de Países:").grid(row=7, column=0, padx=10, pady=5, columnspan=2)
+    lista_paises = ListaPaises(janela, linhas=10, largura=40, ao_selecionar=escolher_pais)
+    lista_paises.quadro.grid(row=8, column=0, columnspan=4, padx=10, pady=5)
+
+    entrada_pais_ativa = pais_1_entrada
+    for entrada in (pais_1_entrada, pais_2_entrada):
+        entrada.bind('<FocusIn>', lambda evento, entrada=entrada: ativar_entrada(entrada))
+        autocompletar(entrada, lista_paises.busca)
+    paises_entrada.bind('<FocusIn>', lambda evento: ativar_entrada(paises_entrada))
+
+    # Labels para exibir os resultados
+    resultados_pais_1 = tk.StringVar()
+    tk.Label(janela, textvariable=resultados_pais_1).grid(row=9, column=0, columnspan=3, padx=10, pady=5)
+
+    resultados_pais_2 = tk.StringVar()
+    tk.Label(janela, textvariable=resultados_pais_2).grid(row=10, column=0, columnspan=3, padx=10, pady=5)
+
+    resultados_testes = tk.StringVar()
+    tk.Label(janela, textvariable=resultados_testes).grid(row=11, column=0, columnspan=3, padx=10, pady=5)
+
+    # Progresso e cancelamento das análises executadas em segundo plano
+    tarefas = ExecutorTarefas(janela)
+    tarefas.quadro.grid(row=12, column=0, columnspan=4, padx=10, pady=5)
+
+    # Importar as análises em segundo plano e iniciar a interface gráfica
+    preaquecer(janela, MODULOS_PREAQUECIDOS)
+    janela.mainloop()
@@ -0,0 +1,88 @@
+import numpy as np
+
+# Histograma e curva de densidade (KDE) de altura e peso calculados sobre os valores distintos e quantas vezes cada
+# um aparece, em vez de sobre os atletas: a curva é avaliada sobre os valores distintos, em tempo que não depende do
+# número de atletas (PONTOS_CURVA x número de valores operações), no lugar do KDE sobre todos os valores do seaborn.
+#
+# Erro em relação ao sns.histplot(..., bins=30, kde=True, stat='density'): as barras saem dos valores exatos e são as
+# mesmas do seaborn (diferença relativa abaixo de 1e-12), com medidas inteiras ou fracionárias. A curva também,
+# exceto quando há mais de LIMITE_VALORES_CURVA valores distintos: eles são agrupados em LIMITE_VALORES_CURVA faixas
+# iguais entre o menor e o maior valor, cada faixa representada pela média dos seus valores, e a curva difere em
+# menos de 0,1% do pico (cada valor se desloca menos de 1/LIMITE_VALORES_CURVA do intervalo, muito menos que a
+# largura de banda)
+
+# Número de barras e de pontos da curva, os mesmos do sns.histplot(..., bins=30, kde=True)
+NUMERO_BARRAS = 30
+PONTOS_CURVA = 200
+
+# Número máximo de valores distintos sobre os quais a curva é avaliada
+LIMITE_VALORES_CURVA = 4096
+
+# Distribuição de uma coluna dada por valores e quantas vezes cada um aparece
+class Distribuicao:
+    def __init__(self, valores, contagens, limites=None):
+        valores = np.asarray(valores, dtype='float64')
+        contagens = np.asarray(contagens, dtype='float64')
+        mantidos = contagens > 0
+        if limites is not None:
+            mantidos &= (valores >= limites[0]) & (valores <= limites[1])
+        self.valores = valores[mantidos]
+        self.contagens = contagens[mantidos]
+
+    @property
+    def contagem(self):
+        return int(self.contagens.sum())
+
+    @property
+    def media(self):
+        return float(np.average(self.valores, weights=self.contagens))
+
+    # Desvio padrão amostral (ddof=1, como no pandas e na largura de banda do seaborn)
+    @property
+    def desvio(self):
+        n = self.contagens.sum()
+        if n < 2:
+            return float('nan')
+        return float(np.sqrt((self.contagens * (self.valores - self.media) ** 2).sum() / (n - 1)))
+
+    # Função para calcular as bordas e as alturas (densidade) das barras do histograma
+    def histograma(self, barras=NUMERO_BARRAS):
+        if self.contagem == 0:
+            return np.array([]), np.array([])
+        intervalo = (self.valores.min(), self.valores.max())
+        alturas, bordas = np.histogram(self.valores, bins=barras, range=intervalo, weights=self.contagens, density=True)
+        return bordas, alturas
+
+    # Função para calcular a curva de densidade (KDE gaussiano, largura de banda pela regra de Scott) entre o menor
+    # e o maior valor; None quando não há variação suficiente para a curva (o seaborn também não a desenha)
+    def curva(self, pontos=PONTOS_CURVA):
+        n = self.contagens.sum()
+        desvio = self.desvio
+        if n < 2 or not desvio > 0:
+            return None
+        banda = desvio * n ** (-1 / 5)
+
+        valores, contagens = self._agrupar_curva()
+        x = np.linspace(self.valores.min(), self.valores.max(), pontos)
+        nucleo = np.exp(-0.5 * ((x[:, None] - valores[None, :]) / banda) ** 2)
+        densidade = nucleo @ contagens / (n * banda * np.sqrt(2 * np.pi))
+        return x, densidade
+
+    # Função para agrupar os valores em LIMITE_VALORES_CURVA faixas iguais quando há mais valores distintos do que
+    # isso (cada faixa fica com a média ponderada dos seus valores, o que preserva a média e quase todo o desvio)
+    def _agrupar_curva(self):
+        if len(self.valores) <= LIMITE_VALORES_CURVA:
+            return self.valores, self.contagens
+        menor, maior = self.valores.min(), self.valores.max()
+        faixas = np.minimum(((self.valores - menor) / (maior - menor) * LIMITE_VALORES_CURVA).astype('int64'),
+                            LIMITE_VALORES_CURVA - 1)
+        contagens = np.bincount(faixas, weights=self.contagens, minlength=LIMITE_VALORES_CURVA)
+        somas = np.bincount(faixas, weights=self.contagens * self.valores, minlength=LIMITE_VALORES_CURVA)
+        ocupadas = contagens > 0
+        return somas[ocupadas] / contagens[ocupadas], contagens[ocupadas]
+
+# Função para montar a distribuição de uma coluna a partir dos seus valores (os ausentes são ignorados)
+def distribuicao_valores(valores, limites=None):
+    valores = np.asarray(valores, dtype='float64')
+    valores, contagens = np.unique(valores[~np.isnan(valores)], return_counts=True)
+    return Distribuicao(valores, contagens, limites)
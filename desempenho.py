@@ -0,0 +1,176 @@
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+
+# Perfil de desempenho de uma análise, etapa por etapa: as etapas são as mesmas exibidas na barra de progresso
+# (cada chamada a etapa() com uma Tarefa que tem um perfil encerra a etapa anterior e começa a próxima) e, para cada
+# uma, ficam registrados o tempo, as linhas que entraram e saíram (informadas pelas análises com registrar_linhas)
+# e, opcionalmente, o pico de memória. A memória é medida com o tracemalloc, que também acompanha as alocações do
+# numpy e do pandas, mas só na thread da análise e neste processo (os gráficos desenhados nos processos de
+# paineis.py entram apenas no tempo). Os perfis podem ser exportados no formato de trace do Chrome, aberto em
+# chrome://tracing ou no Perfetto (https://ui.perfetto.dev)
+
+# Perfis que estão medindo a memória agora (o tracemalloc é um só para o processo inteiro)
+_medindo_memoria = 0
+_trava_memoria = threading.Lock()
+
+def _iniciar_memoria():
+    global _medindo_memoria
+    with _trava_memoria:
+        if _medindo_memoria == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _medindo_memoria += 1
+
+def _encerrar_memoria():
+    global _medindo_memoria
+    with _trava_memoria:
+        _medindo_memoria -= 1
+        if _medindo_memoria == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+class Perfil:
+    def __init__(self, memoria=False):
+        self.memoria = memoria
+        self.registros = []  # etapas encerradas, na ordem
+        self._atual = None  # etapa em andamento
+        self._trava = threading.Lock()
+        self.inicio = time.perf_counter()
+        self._encerrado = False
+        if memoria:
+            _iniciar_memoria()
+
+    # Função para encerrar a etapa atual e começar a próxima
+    def iniciar_etapa(self, descricao):
+        with self._trava:
+            if self._encerrado:
+                return
+            # Etapas com progresso ("Desenhando os gráficos (2/4)") continuam a mesma etapa
+            descricao = re.sub(r'\s*\(\d+/\d+\)$', '', descricao)
+            if self._atual is not None and descricao == self._atual['etapa']:
+                return
+            self._encerrar_etapa()
+            memoria_inicial = None
+            if self.memoria:
+                memoria_inicial = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            self._atual = {
+                'etapa': descricao,
+                'inicio': time.perf_counter() - self.inicio,
+                'linhas_entrada': None,
+                'linhas_saida': None,
+                'memoria_inicial': memoria_inicial,
+            }
+
+    # Função para registrar as linhas que entraram e saíram da etapa atual
+    def registrar_linhas(self, entrada=None, saida=None):
+        with self._trava:
+            if self._atual is None:
+                return
+            if entrada is not None and self._atual['linhas_entrada'] is None:
+                self._atual['linhas_entrada'] = entrada
+            if saida is not None:
+                self._atual['linhas_saida'] = saida
+
+    def _encerrar_etapa(self):
+        if self._atual is None:
+            return
+        registro = self._atual
+        registro['fim'] = time.perf_counter() - self.inicio
+        registro['segundos'] = registro['fim'] - registro['inicio']
+        memoria_inicial = registro.pop('memoria_inicial')
+        registro['memoria_pico'] = None
+        if memoria_inicial is not None and tracemalloc.is_tracing():
+            # Quanto a etapa chegou a alocar além do que já estava alocado no começo dela
+            registro['memoria_pico'] = max(tracemalloc.get_traced_memory()[1] - memoria_inicial, 0)
+        self.registros.append(registro)
+        self._atual = None
+
+    # Função para encerrar o perfil (fim da análise, com sucesso, erro ou cancelamento)
+    def encerrar(self):
+        with self._trava:
+            if self._encerrado:
+                return
+            self._encerrar_etapa()
+            self._encerrado = True
+        if self.memoria:
+            _encerrar_memoria()
+
+    # O perfil volta dos processos do modo em lote (analise_lote.py): a trava não é copiada
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['_trava']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._trava = threading.Lock()
+
+    @property
+    def encerrado(self):
+        return self._encerrado
+
+    # Função para obter as etapas registradas até agora (a etapa em andamento aparece com o tempo parcial)
+    def etapas(self):
+        with self._trava:
+            etapas = [dict(registro) for registro in self.registros]
+            if self._atual is not None:
+                atual = dict(self._atual)
+                atual.pop('memoria_inicial')
+                atual['fim'] = time.perf_counter() - self.inicio
+                atual['segundos'] = atual['fim'] - atual['inicio']
+                atual['memoria_pico'] = None
+                etapas.append(atual)
+        return etapas
+
+    # Função para obter o tempo total, do início do perfil ao fim da última etapa
+    def total(self):
+        etapas = self.etapas()
+        return etapas[-1]['fim'] if etapas else 0.0
+
+# Função para montar o trace no formato do Chrome (eventos completos "X", tempos em microssegundos) a partir de
+# uma lista de (nome, perfil); cada perfil aparece em uma linha própria do visualizador
+def trace_chrome(perfis):
+    eventos = []
+    pid = os.getpid()
+    for linha, (nome, perfil) in enumerate(perfis):
+        eventos.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': linha, 'args': {'name': nome}})
+        for registro in perfil.etapas():
+            argumentos = {chave: registro[chave] for chave in ('linhas_entrada', 'linhas_saida', 'memoria_pico')
+                          if registro[chave] is not None}
+            eventos.append({
+                'name': registro['etapa'],
+                'cat': 'etapa',
+                'ph': 'X',
+                'ts': round((perfil.inicio + registro['inicio']) * 1e6),
+                'dur': round(registro['segundos'] * 1e6),
+                'pid': pid,
+                'tid': linha,
+                'args': argumentos,
+            })
+    return {'traceEvents': eventos, 'displayTimeUnit': 'ms'}
+
+# Função para gravar o trace de uma lista de (nome, perfil) em um arquivo JSON
+def exportar_trace(perfis, destino):
+    with open(destino, 'w', encoding='utf-8') as arquivo:
+        json.dump(trace_chrome(perfis), arquivo, ensure_ascii=False, indent=1)
+    return destino
+
+# Função para montar a tabela de um perfil em texto (usada no modo em lote)
+def formatar_perfil(perfil):
+    linhas = [f"{'etapa':<45}{'tempo (s)':>10}{'entrada':>12}{'saída':>12}{'memória (MB)':>14}"]
+    for registro in perfil.etapas():
+        linhas.append(f"{registro['etapa'][:44]:<45}{registro['segundos']:>10.3f}"
+                      f"{formatar_linhas(registro['linhas_entrada']):>12}{formatar_linhas(registro['linhas_saida']):>12}"
+                      f"{formatar_memoria(registro['memoria_pico']):>14}")
+    linhas.append(f"{'total':<45}{perfil.total():>10.3f}")
+    return '\n'.join(linhas)
+
+# Funções para exibir um número de linhas e uma quantidade de memória (em MB) de um registro ('-' se não medidos)
+def formatar_linhas(valor):
+    return '-' if valor is None else f'{valor:,}'.replace(',', '.')
+
+def formatar_memoria(valor):
+    return '-' if valor is None else f'{valor / (1024 * 1024):.1f}'
@@ -0,0 +1,88 @@
+import os
+import json
+import threading
+import pandas as pd
+from carregador import carregar_dados, chave_arquivo, caminho_binario, DIRETORIO_CACHE
+from tarefas import etapa
+
+# Dicionário de países de um arquivo: para cada país (na ordem em que aparece no arquivo) o número de linhas,
+# o primeiro e o último ano e o total de medalhas de cada tipo. É calculado uma única vez e gravado em JSON junto
+# do arquivo binário, com o tamanho e a data de modificação do CSV de origem, de modo que as listas de países e o
+# preenchimento automático dos campos de país não precisam ler os dados de novo
+
+# Cache em memória dos dicionários já lidos: caminho -> (chave do arquivo, dicionário)
+_cache_dicionarios = {}
+
+# Função para obter o caminho do arquivo JSON com o dicionário de países de um CSV
+def caminho_dicionario(caminho_arquivo):
+    return os.path.splitext(caminho_binario(caminho_arquivo))[0] + '-paises.json'
+
+# Função para calcular o dicionário de países de um DataFrame
+def calcular_dicionario(dados):
+    if 'pais' not in dados.columns:
+        raise ValueError("A coluna 'pais' não foi encontrada no arquivo.")
+
+    com_pais = dados.dropna(subset=['pais'])
+    grupos = com_pais.groupby('pais', observed=True, sort=False)
+    resumo = pd.DataFrame({'atletas': grupos.size()})
+    if 'ano' in dados.columns:
+        resumo['ano_inicio'] = grupos['ano'].min()
+        resumo['ano_fim'] = grupos['ano'].max()
+    if 'medalha' in dados.columns:
+        medalhas = com_pais.groupby(['pais', 'medalha'], observed=True).size().unstack(fill_value=0)
+    else:
+        medalhas = pd.DataFrame(index=resumo.index)
+
+    # Países na ordem em que aparecem no arquivo
+    ordem = pd.unique(com_pais['pais'].astype(str))
+    dicionario = {}
+    for pais, linha in resumo.iterrows():
+        dicionario[str(pais)] = {
+            'atletas': int(linha['atletas']),
+            'ano_inicio': int(linha['ano_inicio']) if 'ano_inicio' in linha and pd.notna(linha['ano_inicio']) else None,
+            'ano_fim': int(linha['ano_fim']) if 'ano_fim' in linha and pd.notna(linha['ano_fim']) else None,
+            'medalhas': {str(tipo): int(quantidade) for tipo, quantidade in medalhas.loc[pais].items()} if pais in medalhas.index else {},
+        }
+    return {pais: dicionario[pais] for pais in ordem}
+
+# Função para ler o dicionário gravado (None se não existir, estiver corrompido ou for de outra versão do CSV)
+def _ler_dicionario(destino, chave):
+    try:
+        with open(destino, encoding='utf-8') as arquivo:
+            conteudo = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    if conteudo.get('origem_mtime_ns') != chave[1] or conteudo.get('origem_tamanho') != chave[2]:
+        return None
+    return conteudo.get('paises')
+
+# Função para gravar o dicionário, trocando o arquivo de forma atômica (falhas de gravação são ignoradas)
+def _gravar_dicionario(destino, chave, dicionario):
+    temporario = f'{destino}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump({'origem_mtime_ns': chave[1], 'origem_tamanho': chave[2], 'paises': dicionario},
+                      arquivo, ensure_ascii=False)
+        os.replace(temporario, destino)
+    except OSError:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+# Função para obter o dicionário de países de um arquivo: da memória, do JSON gravado ou, na primeira vez,
+# calculado a partir dos dados
+def obter_dicionario_paises(caminho_arquivo, tarefa=None):
+    chave = chave_arquivo(caminho_arquivo)
+    em_cache = _cache_dicionarios.get(chave[0])
+    if em_cache is not None and em_cache[0] == chave:
+        return em_cache[1]
+
+    destino = caminho_dicionario(caminho_arquivo)
+    dicionario = _ler_dicionario(destino, chave)
+    if dicionario is None:
+        etapa(tarefa, "Carregando os dados")
+        dicionario = calcular_dicionario(carregar_dados(caminho_arquivo))
+        _gravar_dicionario(destino, chave, dicionario)
+
+    _cache_dicionarios[chave[0]] = (chave, dicionario)
+    return dicionario
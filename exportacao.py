@@ -0,0 +1,227 @@
+import os
+import gzip
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from tarefas import etapa
+
+# Exportação dos dados limpos: as linhas são gravadas em blocos, à medida que chegam (de um DataFrame já limpo ou do
+# processamento em blocos), sem montar o arquivo inteiro na memória. Formatos:
+#   'csv'      texto, como o dados_limpos.csv original
+#   'csv.gz'   texto comprimido; os blocos são convertidos e comprimidos em paralelo (cada bloco é um membro gzip
+#              independente, e o arquivo continua sendo lido normalmente pelo gzip, pelo pandas e por outros programas)
+#   'parquet'  pasta com um arquivo Parquet por partição (ano=.../pais=...), para que as próximas análises leiam
+#              somente os anos e países de que precisam (ler_exportacao)
+#   'arrow'    arquivo Arrow IPC (o mesmo formato Feather do cache dos CSVs) com compressão zstd
+# Os formatos Parquet e Arrow IPC dependem do pyarrow, que é opcional. Ele e o pandas só são importados ao gravar
+# ou ler, para que as janelas possam montar a lista de formatos sem esperar essas bibliotecas (inicio_rapido.py)
+FORMATOS = {
+    'csv': "CSV",
+    'csv.gz': "CSV comprimido (gzip)",
+    'parquet': "Parquet particionado por ano e país",
+    'arrow': "Arrow IPC",
+}
+
+# Extensão de cada formato (o Parquet particionado é gravado em uma pasta)
+EXTENSOES = {'csv': '.csv', 'csv.gz': '.csv.gz', 'parquet': '', 'arrow': '.arrow'}
+
+# Colunas usadas para particionar o Parquet
+PARTICOES = ['ano', 'pais']
+
+# Número de linhas gravadas (e comprimidas) de cada vez; no Parquet particionado cada bloco gera um arquivo por
+# partição, então os blocos são maiores para não espalhar cada partição em muitos arquivos pequenos
+LINHAS_BLOCO = 250_000
+LINHAS_BLOCO_PARQUET = 2_000_000
+
+# Número máximo de partições gravadas (a base real tem alguns milhares de combinações de ano e país)
+MAXIMO_PARTICOES = 100_000
+
+# Nível de compressão do gzip (1 = mais rápido, 9 = menor)
+NIVEL_COMPRESSAO = 6
+
+# Função para importar o pyarrow (erro se não estiver instalado)
+def _importar_pyarrow(formato):
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError:
+        raise ValueError(f"O formato {formato} precisa do pyarrow (pip install pyarrow)") from None
+    return pyarrow, pyarrow.dataset
+
+# Função para trocar a extensão de um destino pela extensão de um formato
+def destino_formato(destino, formato):
+    for extensao in sorted(filter(None, EXTENSOES.values()), key=len, reverse=True):
+        if destino.endswith(extensao):
+            destino = destino[:-len(extensao)]
+            break
+    return destino + EXTENSOES[formato]
+
+# Gravação em CSV, um bloco depois do outro
+class _ExportadorCsv:
+    linhas_bloco = LINHAS_BLOCO
+
+    def __init__(self, destino):
+        self.arquivo = open(destino, 'w', newline='', encoding='utf-8')
+        self.cabecalho = True
+
+    def escrever(self, bloco):
+        bloco.to_csv(self.arquivo, header=self.cabecalho, index=False)
+        self.cabecalho = False
+
+    def fechar(self):
+        self.arquivo.close()
+
+# Função executada nas threads de compressão: texto CSV de um bloco comprimido como um membro gzip
+# (o zlib libera o GIL durante a compressão, que roda de fato em paralelo)
+def _comprimir_bloco(bloco, cabecalho):
+    texto = bloco.to_csv(header=cabecalho, index=False)
+    return gzip.compress(texto.encode('utf-8'), compresslevel=NIVEL_COMPRESSAO)
+
+# Gravação em CSV comprimido: até duas vezes o número de threads de blocos em compressão ao mesmo tempo, gravados
+# na ordem em que chegaram
+class _ExportadorCsvGz:
+    linhas_bloco = LINHAS_BLOCO
+
+    def __init__(self, destino, threads=None):
+        self.arquivo = open(destino, 'wb')
+        self.threads = threads or min(8, os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(max_workers=self.threads)
+        self.pendentes = []
+        self.cabecalho = True
+
+    def escrever(self, bloco):
+        self.pendentes.append(self.executor.submit(_comprimir_bloco, bloco, self.cabecalho))
+        self.cabecalho = False
+        while len(self.pendentes) > 2 * self.threads:
+            self.arquivo.write(self.pendentes.pop(0).result())
+
+    def fechar(self):
+        try:
+            for futuro in self.pendentes:
+                self.arquivo.write(futuro.result())
+        finally:
+            for futuro in self.pendentes:
+                futuro.cancel()
+            self.executor.shutdown()
+            self.arquivo.close()
+
+# Função para verificar se um caminho existente pode ser substituído por uma exportação Parquet: uma pasta vazia
+# ou uma exportação anterior (somente pastas das partições, na ordem de particoes, com arquivos .parquet no fim)
+def _exportacao_parquet(destino, particoes):
+    if not os.path.isdir(destino):
+        return False
+    for pasta, subpastas, arquivos in os.walk(destino):
+        nivel = len(os.path.relpath(pasta, destino).split(os.sep)) if pasta != destino else 0
+        if nivel < len(particoes):
+            if arquivos or not all(nome.startswith(particoes[nivel] + '=') for nome in subpastas):
+                return False
+        elif subpastas or not all(nome.endswith('.parquet') for nome in arquivos):
+            return False
+    return True
+
+# Gravação em Parquet particionado (partição no estilo do Hive: pasta/ano=1992/pais=Brasil/parte-0-0.parquet);
+# cada bloco grava um arquivo novo em cada partição que aparece nele
+class _ExportadorParquet:
+    linhas_bloco = LINHAS_BLOCO_PARQUET
+
+    def __init__(self, destino, particoes=PARTICOES):
+        self.destino = destino
+        self.particoes = particoes
+        self.blocos = 0
+        self.pa, self.ds = _importar_pyarrow(FORMATOS['parquet'])
+        self.opcoes = self.ds.ParquetFileFormat().make_write_options(compression='zstd')
+        if os.path.exists(destino):
+            if not _exportacao_parquet(destino, particoes):
+                raise ValueError(f"O destino {destino} já existe e não é uma exportação Parquet anterior; "
+                                 "escolha uma pasta vazia ou nova")
+            shutil.rmtree(destino)
+
+    def escrever(self, bloco):
+        tabela = self.pa.Table.from_pandas(bloco, preserve_index=False)
+        self.ds.write_dataset(tabela, self.destino, format='parquet', file_options=self.opcoes,
+                              partitioning=self.particoes, partitioning_flavor='hive',
+                              basename_template=f'parte-{self.blocos}-{{i}}.parquet',
+                              max_partitions=MAXIMO_PARTICOES, existing_data_behavior='overwrite_or_ignore')
+        self.blocos += 1
+
+    def fechar(self):
+        pass
+
+# Gravação em Arrow IPC: as categorias de cada bloco podem ser diferentes (processamento em blocos), e um arquivo
+# IPC tem um único dicionário por coluna, então as colunas categóricas são gravadas como texto
+class _ExportadorArrow:
+    linhas_bloco = LINHAS_BLOCO
+
+    def __init__(self, destino):
+        self.destino = destino
+        self.esquema = None
+        self.escritor = None
+        self.pa, _ = _importar_pyarrow(FORMATOS['arrow'])
+
+    def escrever(self, bloco):
+        pa = self.pa
+        tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+        for posicao, campo in enumerate(tabela.schema):
+            if pa.types.is_dictionary(campo.type):
+                tabela = tabela.set_column(posicao, campo.name, tabela.column(posicao).cast(pa.string()))
+        if self.escritor is None:
+            self.esquema = tabela.schema
+            opcoes = pa.ipc.IpcWriteOptions(compression='zstd', use_threads=True)
+            self.escritor = pa.ipc.new_file(self.destino, self.esquema, options=opcoes)
+        self.escritor.write_table(tabela.cast(self.esquema))
+
+    def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+
+# Função para abrir um exportador: objeto com escrever(bloco) e fechar()
+def abrir_exportador(destino, formato='csv'):
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportação desconhecido: {formato} (use {', '.join(FORMATOS)})")
+
+    pasta = os.path.dirname(os.path.abspath(destino))
+    os.makedirs(pasta, exist_ok=True)
+    if formato == 'csv':
+        return _ExportadorCsv(destino)
+    if formato == 'csv.gz':
+        return _ExportadorCsvGz(destino)
+    if formato == 'parquet':
+        return _ExportadorParquet(destino)
+    return _ExportadorArrow(destino)
+
+# Função para exportar um DataFrame (por exemplo os dados limpos de uma análise) em blocos
+def exportar_dados(dados, destino, formato='csv', tarefa=None, linhas_bloco=None):
+    etapa(tarefa, "Salvando os dados processados")
+    exportador = abrir_exportador(destino, formato)
+    linhas_bloco = linhas_bloco or exportador.linhas_bloco
+    try:
+        for inicio in range(0, max(len(dados), 1), linhas_bloco):
+            if tarefa is not None:
+                tarefa.verificar()
+            exportador.escrever(dados.iloc[inicio:inicio + linhas_bloco])
+    finally:
+        exportador.fechar()
+    return destino
+
+# Função para ler dados exportados, somente das partições (Parquet) ou linhas dos anos e países pedidos
+def ler_exportacao(origem, anos=None, paises=None, colunas=None):
+    if os.path.isdir(origem) or origem.endswith(('.parquet', '.arrow', '.feather')):
+        _, ds = _importar_pyarrow("Parquet ou Arrow IPC")
+        if os.path.isdir(origem) or origem.endswith('.parquet'):
+            conjunto = ds.dataset(origem, format='parquet', partitioning='hive')
+        else:
+            conjunto = ds.dataset(origem, format='ipc')
+        filtro = ds.scalar(True)
+        if anos is not None:
+            filtro &= (ds.field('ano') >= anos[0]) & (ds.field('ano') <= anos[1])
+        if paises is not None:
+            filtro &= ds.field('pais').isin(list(paises))
+        return conjunto.to_table(columns=colunas, filter=filtro).to_pandas()
+
+    import pandas as pd
+
+    dados = pd.read_csv(origem, usecols=colunas)
+    if anos is not None:
+        dados = dados[(dados['ano'] >= anos[0]) & (dados['ano'] <= anos[1])]
+    if paises is not None:
+        dados = dados[dados['pais'].isin(list(paises))]
+    return dados
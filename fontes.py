@@ -0,0 +1,36 @@
+import os
+import glob
+
+# Fontes de dados: além de um único CSV, as análises aceitam uma pasta (todos os CSVs dentro dela, por exemplo um
+# arquivo por edição dos Jogos) ou um padrão com curingas ("dados/atletas_*.csv"). Os arquivos de uma fonte são
+# lidos em paralelo e juntados em um único DataFrame por carregador.py. Este módulo não importa o pandas, para que
+# as janelas possam validar o caminho sem esperá-lo (inicio_rapido.py)
+
+# Extensões dos arquivos considerados dentro de uma pasta
+EXTENSOES_FONTE = ('.csv', '.csv.gz')
+
+# Função para saber se o caminho é um padrão com curingas (um arquivo que existe com colchetes no nome não é)
+def padrao_fonte(caminho):
+    return glob.has_magic(caminho) and not os.path.isfile(caminho)
+
+# Função para listar os arquivos de uma fonte, em ordem (um CSV, os CSVs de uma pasta ou os de um padrão)
+def listar_arquivos(caminho):
+    if os.path.isdir(caminho):
+        arquivos = [os.path.join(caminho, nome) for nome in os.listdir(caminho) if nome.endswith(EXTENSOES_FONTE)]
+    elif padrao_fonte(caminho):
+        arquivos = glob.glob(caminho)
+    else:
+        return [os.path.abspath(caminho)]
+    return sorted(os.path.abspath(arquivo) for arquivo in arquivos if os.path.isfile(arquivo))
+
+# Função para saber se a fonte tem mais de um arquivo (pasta ou padrão)
+def fonte_multipla(caminho):
+    return os.path.isdir(caminho) or padrao_fonte(caminho)
+
+# Função para verificar se a fonte existe (o arquivo, ou ao menos um arquivo da pasta ou do padrão)
+def fonte_existe(caminho):
+    if not caminho:
+        return False
+    if fonte_multipla(caminho):
+        return bool(listar_arquivos(caminho))
+    return os.path.isfile(caminho)
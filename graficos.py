@@ -0,0 +1,412 @@
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+# Gráficos das análises, desenhados a partir dos resultados de analises.py: usados pelas janelas
+# (exibidos com plt.show) e pelo modo em lote (salvos em PNG, sem janela)
+
+# Histograma com curva de densidade, como o sns.histplot(..., bins=30, kde=True, stat='density'): com uma
+# distribuição pré-calculada (densidade.py) as barras e a curva saem das classes, sem percorrer os atletas
+def histograma_densidade(ax, valores, color, distribuicao=None, label=None):
+    if distribuicao is None:
+        sns.histplot(valores, bins=30, kde=True, color=color, stat='density', label=label, ax=ax)
+        return
+
+    bordas, alturas = distribuicao.histograma()
+    ax.bar(bordas[:-1], alturas, np.diff(bordas), align='edge', color=color, alpha=0.5, label=label)
+    curva = distribuicao.curva()
+    if curva is not None:
+        ax.plot(*curva, color=color)
+
+# Gráfico de distribuição da altura, com a média e o desvio padrão
+def grafico_altura(ax, dados, media_altura, desvio_padrao_altura, titulo='Distribuição da Altura dos Atletas',
+                   distribuicao=None):
+    histograma_densidade(ax, None if dados is None else dados['altura'], 'skyblue', distribuicao)
+    ax.set_title(titulo, fontsize=16)
+    ax.set_xlabel('Altura (cm)', fontsize=14)
+    ax.set_ylabel('Densidade', fontsize=14)
+    ax.axvline(media_altura, color='red', linestyle='--', label='Média: {:.2f} cm'.format(media_altura))
+    ax.axvline(media_altura + desvio_padrao_altura, color='orange', linestyle='--', label='Desvio Padrão: {:.2f} cm'.format(desvio_padrao_altura))
+    ax.axvline(media_altura - desvio_padrao_altura, color='orange', linestyle='--')
+    ax.legend()
+
+# A partir deste número de atletas o gráfico de dispersão passa a ser desenhado como densidade (uma imagem com
+# custo proporcional aos pixels do gráfico) com uma amostra estratificada de pontos por cima
+LIMITE_PONTOS_DISPERSAO = 10_000
+
+# Tamanho da amostra de pontos desenhada sobre a densidade (0 = somente a densidade)
+AMOSTRA_DISPERSAO = 2_000
+
+# Resolução (em cm/kg) com que peso e altura são agrupados nas contagens da densidade enviadas aos processos dos
+# painéis: bem menor que a menor célula (RESOLUCAO_MEDIDAS), então as células quase não mudam
+RESOLUCAO_AGRUPADA = 0.1
+
+# Tamanho (em pixels) de cada célula da densidade e menor largura de célula em cm/kg: com medidas inteiras, como nos
+# dados das Olimpíadas, células mais finas deixariam faixas vazias entre os valores; com medidas fracionárias as
+# células só ficam um pouco maiores do que os pixels permitiriam
+PIXELS_CELULA = 4
+RESOLUCAO_MEDIDAS = 1.0
+
+# Função para listar as categorias de uma coluna na ordem usada pelo seaborn para as cores
+def _categorias(coluna):
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        return list(coluna.cat.categories)
+    return sorted(coluna.dropna().unique())
+
+# Função para sortear uma amostra estratificada por sexo e medalha (proporcional ao tamanho de cada grupo, com
+# alguns pontos de cada grupo, para que todas as cores e marcadores apareçam), sempre com a mesma semente
+def amostra_estratificada(dados, tamanho, estratos=('sexo', 'medalha'), minimo=20):
+    fracao = min(1.0, tamanho / max(len(dados), 1))
+    partes = []
+    for _, grupo in dados.groupby(list(estratos), observed=True, dropna=False):
+        quantidade = min(len(grupo), max(minimo, round(fracao * len(grupo))))
+        partes.append(grupo.sample(quantidade, random_state=0))
+    return pd.concat(partes) if partes else dados.iloc[:0]
+
+# Função para resumir os atletas de um gráfico de dispersão: até limite atletas, os próprios pontos; acima disso, as
+# contagens por peso, altura (agrupados em RESOLUCAO_AGRUPADA) e sexo, que desenham a densidade, e a amostra
+# estratificada de pontos. O resumo tem tamanho limitado e é o que vai para o processo do painel (paineis.py)
+def resumir_dispersao(dados, limite=LIMITE_PONTOS_DISPERSAO, amostra=AMOSTRA_DISPERSAO):
+    colunas = ['peso', 'altura', 'sexo', 'medalha']
+    if len(dados) <= limite:
+        return {'atletas': len(dados), 'densidade': None, 'pontos': dados[colunas]}
+
+    agrupados = pd.DataFrame({
+        'peso': np.round(dados['peso'].to_numpy(dtype='float64') / RESOLUCAO_AGRUPADA) * RESOLUCAO_AGRUPADA,
+        'altura': np.round(dados['altura'].to_numpy(dtype='float64') / RESOLUCAO_AGRUPADA) * RESOLUCAO_AGRUPADA,
+        'sexo': dados['sexo'].to_numpy(),
+    })
+    densidade = agrupados.groupby(['peso', 'altura', 'sexo'], observed=True).size().rename('contagem').reset_index()
+    return {
+        'atletas': len(dados),
+        'niveis': _categorias(dados['sexo']),
+        'densidade': densidade,
+        'pontos': amostra_estratificada(dados, amostra)[colunas] if amostra else None,
+    }
+
+# Função para desenhar a densidade de peso x altura como uma imagem: a cor de cada célula mistura as cores dos
+# sexos na proporção dos atletas da célula e a opacidade cresce com o logaritmo do número de atletas (dados com a
+# coluna 'contagem' são contagens agrupadas, de resumir_dispersao)
+def densidade_dispersao(ax, dados, niveis, cores):
+    pesos = dados['contagem'].to_numpy(dtype='float64') if 'contagem' in dados else np.ones(len(dados))
+    peso = dados['peso'].to_numpy(dtype='float64')
+    altura = dados['altura'].to_numpy(dtype='float64')
+    limites_x = (peso.min(), peso.max())
+    limites_y = (altura.min(), altura.max())
+
+    # Número de células pela área do gráfico em pixels, sem células menores que a resolução das medidas
+    largura, altura_pixels = ax.get_window_extent().size
+    celulas_x = max(1, min(int(largura) // PIXELS_CELULA,
+                           int(np.ceil((limites_x[1] - limites_x[0]) / RESOLUCAO_MEDIDAS)) + 1))
+    celulas_y = max(1, min(int(altura_pixels) // PIXELS_CELULA,
+                           int(np.ceil((limites_y[1] - limites_y[0]) / RESOLUCAO_MEDIDAS)) + 1))
+
+    # Célula de cada atleta (as bordas de cima e da direita entram na última célula)
+    coluna = np.minimum(((peso - limites_x[0]) / max(limites_x[1] - limites_x[0], 1e-9) * celulas_x).astype('int64'),
+                        celulas_x - 1)
+    linha = np.minimum(((altura - limites_y[0]) / max(limites_y[1] - limites_y[0], 1e-9) * celulas_y).astype('int64'),
+                       celulas_y - 1)
+    celula = linha * celulas_x + coluna
+
+    # Contagens por sexo em cada célula, misturadas em uma imagem RGBA
+    codigos = pd.Categorical(dados['sexo'], categories=niveis).codes
+    contagens = np.zeros((celulas_y * celulas_x, len(niveis)))
+    for i in range(len(niveis)):
+        contagens[:, i] = np.bincount(celula[codigos == i], pesos[codigos == i], minlength=celulas_y * celulas_x)
+    total = contagens.sum(axis=1)
+    ocupadas = total > 0
+
+    imagem = np.zeros((celulas_y * celulas_x, 4))
+    imagem[ocupadas, :3] = contagens[ocupadas] @ np.asarray(cores)[:, :3] / total[ocupadas, None]
+    imagem[ocupadas, 3] = 0.25 + 0.75 * np.log1p(total[ocupadas]) / np.log1p(total.max())
+
+    ax.imshow(imagem.reshape(celulas_y, celulas_x, 4), origin='lower', aspect='auto', interpolation='nearest',
+              extent=(limites_x[0], limites_x[1], limites_y[0], limites_y[1]))
+
+# Gráfico de dispersão entre peso e altura, por sexo e medalha; com muitos atletas (acima de limite) os pontos dão
+# lugar à densidade por sexo, com uma amostra estratificada de pontos por cima mantendo as cores e os marcadores.
+# Com o resumo já calculado (resumir_dispersao) os atletas não são necessários
+def grafico_dispersao(ax, dados, titulo='Relação entre Peso e Altura dos Atletas', palette='deep',
+                      limite=LIMITE_PONTOS_DISPERSAO, amostra=AMOSTRA_DISPERSAO, resumo=None):
+    if resumo is None:
+        resumo = resumir_dispersao(dados, limite, amostra)
+    if resumo['densidade'] is None:
+        sns.scatterplot(x='peso', y='altura', data=resumo['pontos'], hue='sexo', style='medalha', palette=palette,
+                        s=100, ax=ax)
+    else:
+        niveis = resumo['niveis']
+        cores = sns.color_palette(palette, len(niveis))
+        densidade_dispersao(ax, resumo['densidade'], niveis, cores)
+        pontos = resumo['pontos']
+        if pontos is not None:
+            sns.scatterplot(x='peso', y='altura', data=pontos, hue='sexo', hue_order=niveis, style='medalha',
+                            palette=cores, s=30, edgecolor='none', alpha=0.6, ax=ax)
+            descricao = (f'{resumo["atletas"]} atletas: cores pela densidade por sexo, pontos de uma amostra de '
+                         f'{len(pontos)}')
+        else:
+            descricao = f'{resumo["atletas"]} atletas: cores pela densidade por sexo'
+        ax.text(0.99, 0.01, descricao, transform=ax.transAxes, ha='right', va='bottom', fontsize=9)
+    ax.set_title(titulo, fontsize=16)
+    ax.set_xlabel('Peso (kg)', fontsize=14)
+    ax.set_ylabel('Altura (cm)', fontsize=14)
+
+# Gráfico de contagem do número de medalhas por país; com as medalhas já contadas (Series país -> medalhas, em
+# ordem decrescente, do cubo de medalhas de cubo_medalhas.py) as barras saem das contagens, sem percorrer os atletas
+def grafico_medalhas_pais(ax, dados, titulo='Número de Medalhas por País', hue=None, medalhas=None):
+    if medalhas is None:
+        # Ordem dos países pelo número de medalhas (somente países presentes nos dados)
+        contagem_paises = dados['pais'].value_counts()
+        ordem_paises = contagem_paises[contagem_paises > 0].index
+        sns.countplot(data=dados, x='pais', hue=hue, order=ordem_paises, palette='viridis', ax=ax)
+    else:
+        paises = [str(pais) for pais in medalhas.index]
+        sns.barplot(x=paises, y=medalhas.to_numpy(), hue=paises, order=paises, palette='viridis', legend=False,
+                    ax=ax)
+    ax.set_title(titulo, fontsize=16)
+    ax.set_xlabel('País', fontsize=14)
+    ax.set_ylabel('Número de Medalhas', fontsize=14)
+    ax.tick_params(axis='x', rotation=90)
+
+# Matriz de correlação (somente colunas numéricas); com uma matriz já calculada (correlacao.py) os atletas não são
+# percorridos
+def grafico_correlacao(ax, dados, titulo='Matriz de Correlação', correlacao=None):
+    if correlacao is None:
+        colunas_numericas = dados.select_dtypes(include='number')
+        correlation_matrix = colunas_numericas.corr()
+    else:
+        correlation_matrix = correlacao
+    sns.heatmap(correlation_matrix, annot=True, fmt=".2f", cmap='coolwarm', square=True, linewidths=0.5, ax=ax)
+    ax.set_title(titulo, fontsize=16)
+
+# Gráficos da análise geral (dados.py), um por figura: gera (nome, figura) um de cada vez,
+# para que a janela possa exibi-los em sequência e o modo em lote possa salvá-los (o resultado do serviço local
+# não traz os atletas, somente a distribuição, o resumo da dispersão, as medalhas e a correlação)
+def graficos_gerais(resultado):
+    dados = resultado.get('dados')
+    sns.set(style='whitegrid')
+
+    # Gráfico de Distribuição da Altura
+    figura = plt.figure(figsize=(10, 6))
+    grafico_altura(figura.gca(), dados, resultado['media_altura'], resultado['desvio_padrao_altura'],
+                   distribuicao=resultado.get('distribuicao_altura'))
+    yield 'distribuicao_altura', figura
+
+    # Gráfico de Dispersão entre Peso e Altura
+    figura = plt.figure(figsize=(10, 6))
+    ax = figura.gca()
+    grafico_dispersao(ax, dados, resumo=resultado.get('dispersao'))
+    ax.grid(True)
+    ax.legend(title='Sexo / Medalha')
+    yield 'peso_altura', figura
+
+    # Gráfico de Contagem do Número de Medalhas por País
+    figura = plt.figure(figsize=(12, 6))
+    ax = figura.gca()
+    grafico_medalhas_pais(ax, dados, medalhas=resultado.get('medalhas_pais'))
+    ax.grid(axis='y')
+    yield 'medalhas_pais', figura
+
+    # Matriz de Correlação
+    figura = plt.figure(figsize=(12, 8))
+    grafico_correlacao(figura.gca(), dados, correlacao=resultado.get('correlacao'))
+    yield 'correlacao', figura
+
+# Painéis de cada dashboard, na ordem das posições da grade 2x2
+PAINEIS_DASHBOARD = {
+    'periodo': ['altura', 'dispersao', 'medalhas', 'correlacao'],
+    'pais': ['altura', 'dispersao', 'medalhas', 'correlacao'],
+    'comparacao': ['altura', 'dispersao', 'medalhas_sexo'],
+    'varios': ['altura', 'medias', 'medalhas_sexo', 'testes'],
+}
+
+# Função para separar do resultado de uma análise somente o que um painel usa (paineis.py envia a cada processo
+# apenas as entradas do seu painel): no lugar dos atletas da seleção vão as distribuições, as contagens já
+# calculadas e o resumo da dispersão; os atletas só vão quando o resultado não traz a contagem pronta (estimativas)
+def entradas_painel(tipo, painel, resultado):
+    if tipo == 'varios':
+        usadas = {'altura': ['resumo', 'distribuicoes'], 'medias': ['resumo'],
+                  'medalhas_sexo': ['resumo', 'medalhas_sexo'], 'testes': ['resumo', 'testes']}[painel]
+        return {chave: resultado[chave] for chave in usadas}
+
+    if tipo == 'comparacao':
+        entradas = {'pais_1': resultado['pais_1'], 'pais_2': resultado['pais_2']}
+        for lado in ('pais_1', 'pais_2'):
+            dados = resultado[f'dados_{lado}']
+            if painel == 'altura':
+                distribuicao = resultado.get(f'distribuicao_{lado}')
+                entradas[f'distribuicao_{lado}'] = distribuicao
+                if distribuicao is None:
+                    entradas[f'dados_{lado}'] = dados[['altura']]
+            elif painel == 'dispersao':
+                entradas[f'dispersao_{lado}'] = resumir_dispersao(dados)
+        if painel == 'medalhas_sexo':
+            entradas['medalhas_sexo'] = resultado['medalhas_sexo']
+        return entradas
+
+    dados = resultado['dados']
+    entradas = {'pais': resultado.get('pais')}
+    if painel == 'altura':
+        entradas.update(media_altura=resultado['media_altura'], desvio_padrao_altura=resultado['desvio_padrao_altura'],
+                        distribuicao_altura=resultado.get('distribuicao_altura'))
+        if entradas['distribuicao_altura'] is None:
+            entradas['dados'] = dados[['altura']]
+    elif painel == 'dispersao':
+        entradas['dispersao'] = resumir_dispersao(dados)
+    elif painel == 'medalhas':
+        entradas['medalhas_pais'] = resultado.get('medalhas_pais')
+        if entradas['medalhas_pais'] is None:
+            entradas['dados'] = dados[['pais']]
+    elif painel == 'correlacao':
+        entradas['correlacao'] = resultado.get('correlacao')
+        if entradas['correlacao'] is None:
+            entradas['dados'] = dados.select_dtypes(include='number')
+    return entradas
+
+# Função para desenhar um painel de um dashboard em ax (com o resultado inteiro ou com as entradas do painel)
+def desenhar_painel(ax, tipo, painel, resultado):
+    if tipo == 'comparacao':
+        _desenhar_painel_comparacao(ax, painel, resultado)
+        return
+    if tipo == 'varios':
+        _desenhar_painel_varios(ax, painel, resultado)
+        return
+
+    dados = resultado.get('dados')
+    # Na análise de um país, o nome do país entra nos títulos e as barras de medalhas são coloridas por país
+    sufixo = f' ({resultado["pais"]})' if tipo == 'pais' else ''
+
+    if painel == 'altura':
+        titulo = f'Distribuição da Altura dos Atletas{sufixo}'
+        grafico_altura(ax, dados, resultado['media_altura'], resultado['desvio_padrao_altura'], titulo,
+                       resultado.get('distribuicao_altura'))
+    elif painel == 'dispersao':
+        titulo = f'Relação entre Peso e Altura{sufixo}' if sufixo else 'Relação entre Peso e Altura dos Atletas'
+        grafico_dispersao(ax, dados, titulo, resumo=resultado.get('dispersao'))
+    elif painel == 'medalhas':
+        grafico_medalhas_pais(ax, dados, f'Número de Medalhas por País{sufixo}', hue='pais' if sufixo else None,
+                              medalhas=resultado.get('medalhas_pais'))
+    elif painel == 'correlacao':
+        grafico_correlacao(ax, dados, f'Matriz de Correlação{sufixo}', resultado.get('correlacao'))
+    else:
+        raise ValueError(f"Painel desconhecido: {painel}")
+
+# Função para desenhar um painel do dashboard comparativo de dois países
+def _desenhar_painel_comparacao(ax, painel, resultado):
+    pais_1, pais_2 = resultado['pais_1'], resultado['pais_2']
+    dados_pais_1 = resultado.get('dados_pais_1')
+    dados_pais_2 = resultado.get('dados_pais_2')
+
+    if painel == 'altura':
+        # Comparação da distribuição de altura
+        histograma_densidade(ax, None if dados_pais_1 is None else dados_pais_1['altura'], 'skyblue',
+                             resultado.get('distribuicao_pais_1'), pais_1)
+        histograma_densidade(ax, None if dados_pais_2 is None else dados_pais_2['altura'], 'green',
+                             resultado.get('distribuicao_pais_2'), pais_2)
+        ax.set_title(f'Distribuição da Altura ({pais_1} vs {pais_2})', fontsize=16)
+        ax.set_xlabel('Altura (cm)', fontsize=14)
+        ax.set_ylabel('Densidade', fontsize=14)
+        ax.legend()
+    elif painel == 'dispersao':
+        # Comparação da relação entre peso e altura
+        titulo = f'Relação entre Peso e Altura ({pais_1} vs {pais_2})'
+        grafico_dispersao(ax, dados_pais_1, titulo, resumo=resultado.get('dispersao_pais_1'))
+        grafico_dispersao(ax, dados_pais_2, titulo, palette='dark', resumo=resultado.get('dispersao_pais_2'))
+    elif painel == 'medalhas_sexo':
+        # Contagem de medalhas por sexo (tabela país x sexo do cubo de medalhas)
+        contagens = resultado['medalhas_sexo'].stack().rename('medalhas').reset_index()
+        contagens = contagens.astype({'pais': str, 'sexo': str})
+        sns.barplot(data=contagens, x='sexo', y='medalhas', hue='pais',
+                    hue_order=[str(pais) for pais in resultado['medalhas_sexo'].index], palette='viridis', ax=ax)
+        ax.set_title(f'Número de Medalhas por Sexo ({pais_1} vs {pais_2})', fontsize=16)
+        ax.set_xlabel('Sexo', fontsize=14)
+        ax.set_ylabel('Número de Medalhas', fontsize=14)
+    else:
+        raise ValueError(f"Painel desconhecido: {painel}")
+
+# Função para desenhar um painel do dashboard comparativo de vários países
+def _desenhar_painel_varios(ax, painel, resultado):
+    resumo = resultado['resumo']
+    paises = list(resumo.index)
+    cores = sns.color_palette('husl', len(paises))
+
+    if painel == 'altura':
+        # Curvas de densidade da altura de cada país (sem as barras, que se sobrepõem com muitos países)
+        for pais, cor in zip(paises, cores):
+            curva = resultado['distribuicoes'][pais].curva()
+            if curva is not None:
+                ax.plot(*curva, color=cor, label=pais)
+        ax.set_title('Distribuição da Altura por País', fontsize=16)
+        ax.set_xlabel('Altura (cm)', fontsize=14)
+        ax.set_ylabel('Densidade', fontsize=14)
+        ax.legend(fontsize=8, ncol=2)
+    elif painel == 'medias':
+        # Média da altura de cada país com o intervalo de confiança do bootstrap (quando calculado)
+        posicoes = np.arange(len(paises))
+        medias = resumo['altura_media'].to_numpy()
+        if 'altura_ic_inferior' in resumo:
+            erros = [medias - resumo['altura_ic_inferior'].to_numpy(), resumo['altura_ic_superior'].to_numpy() - medias]
+        else:
+            erros = None
+        ax.errorbar(medias, posicoes, xerr=erros, fmt='o', color='navy', ecolor='gray', capsize=4)
+        ax.set_yticks(posicoes)
+        ax.set_yticklabels(paises)
+        ax.invert_yaxis()
+        ax.set_title('Média da Altura e Intervalo de Confiança', fontsize=16)
+        ax.set_xlabel('Altura (cm)', fontsize=14)
+    elif painel == 'medalhas_sexo':
+        # Contagem de medalhas por sexo de cada país
+        resultado['medalhas_sexo'].loc[paises].plot.bar(ax=ax, color=sns.color_palette('viridis', 2))
+        ax.set_title('Número de Medalhas por Sexo', fontsize=16)
+        ax.set_xlabel('País', fontsize=14)
+        ax.set_ylabel('Número de Medalhas', fontsize=14)
+        ax.legend(title='Sexo')
+    elif painel == 'testes':
+        # Valores p do teste t de Welch da altura entre cada par de países
+        testes = resultado['testes']
+        testes = testes[testes['medida'] == 'altura']
+        matriz = pd.DataFrame(np.nan, index=paises, columns=paises)
+        for pais_a, pais_b, p in zip(testes['pais_a'], testes['pais_b'], testes['welch_p']):
+            matriz.loc[pais_a, pais_b] = matriz.loc[pais_b, pais_a] = p
+        sns.heatmap(matriz, annot=len(paises) <= 12, fmt='.3f', cmap='RdYlGn', vmin=0, vmax=0.1, square=True,
+                    linewidths=0.5, cbar_kws={'label': 'Valor p'}, ax=ax)
+        ax.set_title('Teste t de Welch da Altura (valor p)', fontsize=16)
+    else:
+        raise ValueError(f"Painel desconhecido: {painel}")
+
+# Função para saber se há dados suficientes para desenhar o dashboard
+def dashboard_disponivel(tipo, resultado):
+    if tipo == 'comparacao':
+        return not (resultado['dados_pais_1'].empty or resultado['dados_pais_2'].empty)
+    if tipo == 'varios':
+        return len(resultado['resumo']) >= 2
+    return True
+
+# Função para desenhar um dashboard 2x2 completo em uma única figura (usada no modo em lote)
+def _dashboard(tipo, resultado):
+    sns.set(style='whitegrid')
+    fig, axes = plt.subplots(2, 2, figsize=(20, 15))
+    for ax, painel in zip(axes.flat, PAINEIS_DASHBOARD[tipo]):
+        desenhar_painel(ax, tipo, painel, resultado)
+    fig.tight_layout()
+    return fig
+
+# Dashboard da análise de um intervalo de anos (dadosano.py)
+def dashboard_periodo(resultado):
+    return _dashboard('periodo', resultado)
+
+# Dashboard da análise de um país (dadospais.py)
+def dashboard_pais(resultado):
+    return _dashboard('pais', resultado)
+
+# Dashboard comparativo de dois países (dadoscomparapais.py); None se algum dos países não tiver dados
+def dashboard_comparacao(resultado):
+    if not dashboard_disponivel('comparacao', resultado):
+        return None
+    return _dashboard('comparacao', resultado)
+
+# Dashboard comparativo de vários países (dadoscomparapais.py); None se menos de dois países tiverem dados
+def dashboard_varios(resultado):
+    if not dashboard_disponivel('varios', resultado):
+        return None
+    return _dashboard('varios', resultado)
@@ -0,0 +1,176 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from acumuladores import quantil_classes
+from carregador import obter_derivado
+from densidade import Distribuicao
+from indice import obter_indice
+from outliers import limites_iqr, COLUNAS_OUTLIERS
+
+# Recalculo incremental das análises por intervalo de anos: para cada escopo (todos os países ou um país) as linhas
+# completas são resumidas uma única vez em contagens por ano e grupo (medalha, altura, peso), com os valores exatos de
+# altura e peso. Uma janela de anos guarda a contagem de cada grupo nos anos selecionados e, quando o intervalo
+# muda, apenas os anos que entraram ou saíram são somados ou subtraídos. Dos totais da janela saem, sem rever as
+# linhas, os limites de outliers, a contagem, a média e o desvio padrão da seleção limpa, a distribuição da altura e
+# as medalhas por tipo, iguais aos da limpeza linha a linha (com medidas inteiras ou fracionárias).
+#
+# Só os grupos que aparecem nos dados são guardados: o tamanho dos agregados não passa do número de linhas, mesmo
+# com valores distantes (uma altura digitada errado não aumenta as contagens)
+
+# Número máximo de escopos (países) com janela guardada por arquivo
+LIMITE_JANELAS = 16
+
+# Quantis de uma contagem por valores distintos em ordem crescente, com a interface usada por limites_iqr
+class _Classes:
+    def __init__(self, valores, contagens):
+        self.valores = valores
+        self.contagens = contagens
+
+    def quantil(self, q):
+        return quantil_classes(self.valores, self.contagens, q)
+
+# Contagens por ano e grupo (medalha, altura, peso) das linhas sem valores ausentes de um escopo
+class AgregadosAnuais:
+    def __init__(self, completos):
+        anos = completos['ano'].to_numpy()
+        self.anos, posicao_ano = np.unique(anos, return_inverse=True)
+
+        medalhas = completos['medalha']
+        if not isinstance(medalhas.dtype, pd.CategoricalDtype):
+            medalhas = medalhas.astype('category')
+        self.medalhas = list(medalhas.cat.categories)
+        posicao_medalha = medalhas.cat.codes.to_numpy().astype('int64')
+
+        # Valores distintos de altura e peso (no tipo das colunas, para comparar com os limites como a limpeza)
+        self.valores = {}
+        posicoes = {}
+        for coluna in COLUNAS_OUTLIERS:
+            self.valores[coluna], posicoes[coluna] = np.unique(completos[coluna].to_numpy(), return_inverse=True)
+
+        # Grupos que aparecem nos dados e, de cada um, a medalha e as posições dos valores de altura e peso
+        forma = (len(self.medalhas), len(self.valores['altura']), len(self.valores['peso']))
+        chaves = np.ravel_multi_index((posicao_medalha, posicoes['altura'], posicoes['peso']), forma)
+        chaves, grupo = np.unique(chaves, return_inverse=True)
+        self.medalha, self.altura, self.peso = np.unravel_index(chaves, forma)
+        self.numero_grupos = len(chaves)
+
+        # Contagens por ano e grupo, ordenadas por ano (os do ano na posição a ficam em [inicios[a], inicios[a + 1]))
+        pares, self.contagens = np.unique(posicao_ano.astype('int64') * self.numero_grupos + grupo, return_counts=True)
+        self.grupos = pares % max(self.numero_grupos, 1)
+        self.inicios = np.searchsorted(pares // max(self.numero_grupos, 1), np.arange(len(self.anos) + 1))
+
+    # Função para obter as posições [inicio, fim) dos anos entre ano_inicio e ano_fim (inclusive)
+    def posicoes(self, ano_inicio=None, ano_fim=None):
+        inicio = 0 if ano_inicio is None else int(np.searchsorted(self.anos, ano_inicio, side='left'))
+        fim = len(self.anos) if ano_fim is None else int(np.searchsorted(self.anos, ano_fim, side='right'))
+        return inicio, max(inicio, fim)
+
+    # Função para somar as contagens de cada grupo nos anos das posições [inicio, fim)
+    def somar(self, inicio, fim):
+        linhas = slice(self.inicios[inicio], self.inicios[fim])
+        return np.bincount(self.grupos[linhas], weights=self.contagens[linhas],
+                           minlength=self.numero_grupos).astype('int64')
+
+# Soma das contagens de um intervalo de anos, atualizada somando ou subtraindo apenas os anos que mudaram
+class JanelaAnos:
+    def __init__(self, agregados):
+        self.agregados = agregados
+        self.inicio, self.fim = 0, 0
+        self.contagens = np.zeros(agregados.numero_grupos, dtype='int64')
+
+    # Função para mover a janela para outro intervalo de anos (inclusive)
+    def mover(self, ano_inicio=None, ano_fim=None):
+        agregados = self.agregados
+        inicio, fim = agregados.posicoes(ano_inicio, ano_fim)
+
+        # Somar direto os anos da nova janela quando isso dá menos trabalho que corrigir a janela atual
+        if abs(inicio - self.inicio) + abs(fim - self.fim) >= fim - inicio:
+            self.contagens = agregados.somar(inicio, fim)
+        else:
+            if inicio < self.inicio:
+                self.contagens += agregados.somar(inicio, self.inicio)
+            elif inicio > self.inicio:
+                self.contagens -= agregados.somar(self.inicio, inicio)
+            if fim > self.fim:
+                self.contagens += agregados.somar(self.fim, fim)
+            elif fim < self.fim:
+                self.contagens -= agregados.somar(fim, self.fim)
+
+        self.inicio, self.fim = inicio, fim
+        return self
+
+    # Primeiro e último ano com dados dentro da janela (None se não houver nenhum): duas janelas com os mesmos
+    # anos efetivos têm exatamente os mesmos resultados
+    @property
+    def anos_efetivos(self):
+        if self.fim == self.inicio:
+            return None
+        anos = self.agregados.anos
+        return int(anos[self.inicio]), int(anos[self.fim - 1])
+
+    # Função para somar contagens de grupos por valor distinto de uma coluna
+    def _por_valor(self, coluna, contagens):
+        agregados = self.agregados
+        return np.bincount(getattr(agregados, coluna), weights=contagens, minlength=len(agregados.valores[coluna]))
+
+    # Função para marcar os grupos com o valor de uma coluna dentro dos limites
+    def _dentro(self, coluna, limites):
+        valores = self.agregados.valores[coluna]
+        return ((valores >= limites[0]) & (valores <= limites[1]))[getattr(self.agregados, coluna)]
+
+    # Função para calcular os limites de outliers da altura e, entre as linhas dentro deles, os do peso
+    # (a mesma ordem da limpeza linha a linha)
+    def limites(self):
+        valores = self.agregados.valores
+        limites_altura = limites_iqr(_Classes(valores['altura'], self._por_valor('altura', self.contagens)))
+        peso = self._por_valor('peso', self.contagens * self._dentro('altura', limites_altura))
+        return limites_altura, limites_iqr(_Classes(valores['peso'], peso))
+
+    # Função para obter as contagens dos grupos dentro dos limites de altura e peso (a seleção limpa)
+    def contagens_limpas(self, limites=None):
+        limites_altura, limites_peso = self.limites() if limites is None else limites
+        return self.contagens * (self._dentro('altura', limites_altura) & self._dentro('peso', limites_peso))
+
+    # Função para calcular contagem, média e desvio padrão (ddof=1) de altura e peso da seleção limpa
+    def estatisticas(self, limites=None):
+        limpas = self.contagens_limpas(limites)
+        n = int(limpas.sum())
+        estatisticas = {'contagem': n}
+        for coluna in COLUNAS_OUTLIERS:
+            valores = self.agregados.valores[coluna].astype('float64')
+            contagens = self._por_valor(coluna, limpas)
+            media = (contagens @ valores) / n if n > 0 else float('nan')
+            variancia = (contagens @ (valores - media) ** 2) / (n - 1) if n > 1 else float('nan')
+            estatisticas[f'media_{coluna}'] = float(media)
+            estatisticas[f'desvio_padrao_{coluna}'] = float(np.sqrt(variancia))
+        return estatisticas
+
+    # Função para obter a distribuição da altura da seleção limpa (histograma e curva de densidade)
+    def distribuicao_altura(self, limites=None):
+        return Distribuicao(self.agregados.valores['altura'], self._por_valor('altura', self.contagens_limpas(limites)))
+
+    # Função para contar as medalhas de cada tipo na seleção limpa
+    def medalhas(self, limites=None):
+        agregados = self.agregados
+        por_tipo = np.bincount(agregados.medalha, weights=self.contagens_limpas(limites),
+                               minlength=len(agregados.medalhas)).astype('int64')
+        return dict(zip(agregados.medalhas, por_tipo.tolist()))
+
+# Função para construir os agregados por ano de um escopo (None = todos os países)
+def _construir_agregados(dados, pais):
+    if pais is None:
+        return AgregadosAnuais(dados.dropna())
+    return AgregadosAnuais(obter_indice(dados).selecionar(pais).dropna())
+
+# Função para obter a janela de anos de um escopo (None = todos os países) já movida para o intervalo pedido;
+# as janelas dos últimos LIMITE_JANELAS escopos usados ficam guardadas junto com os dados carregados
+def obter_janela(dados, pais=None, ano_inicio=None, ano_fim=None):
+    janelas = obter_derivado(dados, 'janelas_anos', lambda _: OrderedDict())
+    janela = janelas.get(pais)
+    if janela is None:
+        janela = JanelaAnos(_construir_agregados(dados, pais))
+        janelas[pais] = janela
+        while len(janelas) > LIMITE_JANELAS:
+            janelas.popitem(last=False)
+    janelas.move_to_end(pais)
+    return janela.mover(ano_inicio, ano_fim)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from carregador import obter_derivado
+
+# Índice ordenado por (pais, ano): cada país ocupa um bloco contíguo de linhas, ordenado por ano,
+# e a seleção de um país em um intervalo de anos é feita com busca binária (O(log n)) e devolve uma fatia
+class IndicePaisAno:
+    def __init__(self, dados):
+        paises = dados['pais']
+        if not isinstance(paises.dtype, pd.CategoricalDtype):
+            paises = paises.astype('category')
+        codigos = paises.cat.codes.to_numpy()
+        anos = dados['ano'].to_numpy()
+
+        # Ordenação estável por país e depois por ano (linhas sem país ficam antes do primeiro bloco)
+        ordem = np.lexsort((anos, codigos))
+        self.dados = dados.iloc[ordem].reset_index(drop=True)
+        self.anos = anos[ordem]
+
+        # Posição do país na lista de categorias e início/fim do bloco de cada país
+        self.codigos = {pais: codigo for codigo, pais in enumerate(paises.cat.categories)}
+        self.limites = np.searchsorted(codigos[ordem], np.arange(len(self.codigos) + 1))
+
+    # Função para obter o intervalo [inicio, fim) das linhas de um país entre dois anos (inclusive)
+    def intervalo(self, pais, ano_inicio=None, ano_fim=None):
+        codigo = self.codigos.get(pais)
+        if codigo is None:
+            return 0, 0
+
+        inicio, fim = int(self.limites[codigo]), int(self.limites[codigo + 1])
+        anos_pais = self.anos[inicio:fim]
+        primeiro = 0 if ano_inicio is None else int(np.searchsorted(anos_pais, ano_inicio, side='left'))
+        ultimo = len(anos_pais) if ano_fim is None else int(np.searchsorted(anos_pais, ano_fim, side='right'))
+        return inicio + primeiro, inicio + max(primeiro, ultimo)
+
+    # Função para selecionar as linhas de um país entre dois anos (inclusive)
+    def selecionar(self, pais, ano_inicio=None, ano_fim=None):
+        inicio, fim = self.intervalo(pais, ano_inicio, ano_fim)
+        return self.dados.iloc[inicio:fim]
+
+    # Função para selecionar as linhas de vários países entre dois anos (inclusive)
+    def selecionar_varios(self, paises, ano_inicio=None, ano_fim=None):
+        fatias = [self.selecionar(pais, ano_inicio, ano_fim) for pais in dict.fromkeys(paises)]
+        if not fatias:
+            return self.dados.iloc[0:0]
+        return pd.concat(fatias)
+
+# Função para obter o índice de um DataFrame, construindo-o apenas na primeira chamada
+def obter_indice(dados):
+    return obter_derivado(dados, 'indice_pais_ano', IndicePaisAno)
@@ -0,0 +1,47 @@
+import importlib
+import threading
+from tarefas import etapa
+
+# Abertura rápida das janelas: os scripts importam no início apenas o tkinter e os módulos leves da interface, e a
+# janela aparece sem esperar o pandas, o matplotlib, o seaborn e o scipy. Os módulos de análise são importados
+# dentro das funções que rodam em segundo plano e, logo depois que a janela aparece, uma thread os importa
+# antecipadamente (pré-aquecimento), de modo que na primeira análise eles normalmente já estão carregados.
+# O tempo de abertura de cada janela é medido com benchmark_inicializacao.py
+
+# Atraso (ms) entre a abertura da janela e o início do pré-aquecimento, para a janela ser desenhada antes
+ATRASO_PREAQUECIMENTO = 100
+
+# Função para importar os módulos indicados em uma thread separada, depois que a janela aparecer
+# (erros de importação são ignorados aqui e aparecem normalmente no primeiro uso do módulo)
+def preaquecer(janela, modulos):
+    def importar():
+        for modulo in modulos:
+            try:
+                importlib.import_module(modulo)
+            except Exception:
+                pass
+
+    janela.after(ATRASO_PREAQUECIMENTO, lambda: threading.Thread(target=importar, daemon=True).start())
+
+# Função para listar os países de um arquivo (dicionário de países: nome -> linhas, anos e medalhas)
+def listar_paises_arquivo(caminho_arquivo, tarefa=None):
+    from dicionario_paises import obter_dicionario_paises
+
+    etapa(tarefa, "Listando os países")
+    return obter_dicionario_paises(caminho_arquivo, tarefa)
+
+# Função para gerar a versão binária do CSV e o dicionário de países uma única vez (chamada em segundo plano ao
+# selecionar o arquivo) e devolver os países do arquivo
+def preparar_e_listar(caminho_arquivo, tarefa=None):
+    from carregador import preparar_arquivo
+
+    etapa(tarefa, "Convertendo o arquivo")
+    preparar_arquivo(caminho_arquivo)
+    return listar_paises_arquivo(caminho_arquivo, tarefa)
+
+# Função para executar uma operação das janelas (operacoes.py) no serviço local de análises, se a variável
+# OLIMPIADAS_SERVICO estiver definida, ou na própria janela (servico.py)
+def executar_operacao(tarefa, nome, *argumentos):
+    from servico import executar_operacao as executar
+
+    return executar(tarefa, nome, *argumentos)
@@ -0,0 +1,334 @@
+import base64
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from tkinter import font as tkfont
+from concurrent.futures import ThreadPoolExecutor
+from tarefas import Tarefa, TarefaCancelada
+from busca_paises import BuscaPaises
+from desempenho import Perfil, exportar_trace, formatar_linhas, formatar_memoria
+
+# Número de perfis de desempenho mantidos na sessão (exportados juntos no trace)
+HISTORICO_PERFIS = 20
+
+# Executor das análises fora da thread da interface: o trabalho roda em uma thread separada e o resultado
+# volta para a interface por consulta periódica com janela.after. Cada novo pedido cancela o anterior,
+# de modo que cliques rápidos em sequência não acumulam trabalhos obsoletos
+class ExecutorTarefas:
+    def __init__(self, janela, intervalo_ms=100):
+        self.janela = janela
+        self.intervalo_ms = intervalo_ms
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._atual = None  # (tarefa, futuro) em andamento
+
+        # Indicador de progresso, etapa atual e botão de cancelamento
+        self.quadro = tk.Frame(janela)
+        self.barra = ttk.Progressbar(self.quadro, mode='indeterminate', length=200)
+        self.barra.pack(side=tk.LEFT, padx=5)
+        self.texto_etapa = tk.StringVar()
+        tk.Label(self.quadro, textvariable=self.texto_etapa, width=30, anchor='w').pack(side=tk.LEFT, padx=5)
+        self.botao_cancelar = tk.Button(self.quadro, text="Cancelar", command=self.cancelar, state=tk.DISABLED)
+        self.botao_cancelar.pack(side=tk.LEFT, padx=5)
+
+        # Perfis de desempenho das últimas análises e painel que os exibe (aberto pelo botão)
+        self.perfis = []
+        self.painel_desempenho = None
+        tk.Button(self.quadro, text="Desempenho", command=self.abrir_desempenho).pack(side=tk.LEFT, padx=5)
+
+    # Função para executar trabalho(tarefa) em segundo plano e chamar ao_concluir(resultado) na interface; os
+    # resultados parciais publicados pelo trabalho vão para ao_parcial(resultado), também na interface
+    def executar(self, trabalho, ao_concluir, etapa_inicial="Processando...", ao_parcial=None):
+        self.cancelar()
+
+        # Tempo e linhas de cada etapa sempre; a memória só com o painel de desempenho aberto e a opção marcada
+        perfil = Perfil(memoria=self.painel_desempenho is not None and self.painel_desempenho.medir_memoria.get())
+        perfil.iniciar_etapa(etapa_inicial)
+        self.perfis = (self.perfis + [(f"{self.janela.title()} {time.strftime('%H:%M:%S')}", perfil)])[-HISTORICO_PERFIS:]
+
+        tarefa = Tarefa(etapa_inicial, perfil)
+        futuro = self._executor.submit(trabalho, tarefa)
+        self._atual = (tarefa, futuro)
+
+        self.texto_etapa.set(etapa_inicial)
+        self.botao_cancelar.config(state=tk.NORMAL)
+        self.barra.start(10)
+        self.janela.after(self.intervalo_ms, self._acompanhar, tarefa, futuro, ao_concluir, ao_parcial)
+
+    # Função chamada periodicamente na thread da interface até a tarefa terminar
+    def _acompanhar(self, tarefa, futuro, ao_concluir, ao_parcial=None):
+        # Tarefa substituída por um pedido mais novo ou cancelada: o resultado é descartado
+        if self._atual is None or self._atual[0] is not tarefa:
+            return
+
+        if not futuro.done():
+            # Somente o resultado parcial mais recente é exibido (os anteriores já estão superados)
+            parciais = tarefa.parciais()
+            if parciais and ao_parcial is not None:
+                ao_parcial(parciais[-1])
+            self.texto_etapa.set(tarefa.etapa)
+            self._atualizar_desempenho()
+            self.janela.after(self.intervalo_ms, self._acompanhar, tarefa, futuro, ao_concluir, ao_parcial)
+            return
+
+        self._encerrar()
+        try:
+            resultado = futuro.result()
+        except TarefaCancelada:
+            return
+        except Exception as e:
+            messagebox.showerror("Erro", str(e))
+            return
+        ao_concluir(resultado)
+
+    # Função para cancelar a tarefa em andamento (ela é interrompida na próxima verificação)
+    def cancelar(self):
+        if self._atual is None:
+            return
+        tarefa, futuro = self._atual
+        tarefa.cancelar()
+        futuro.cancel()
+        self._encerrar()
+
+    def _encerrar(self):
+        if self._atual is not None:
+            self._atual[0].perfil.encerrar()
+            self._atualizar_desempenho()
+        self._atual = None
+        self.barra.stop()
+        self.texto_etapa.set('')
+        self.botao_cancelar.config(state=tk.DISABLED)
+
+    # Função para abrir o painel de desempenho (ou trazê-lo para a frente, se já estiver aberto)
+    def abrir_desempenho(self):
+        if self.painel_desempenho is not None:
+            self.painel_desempenho.janela.lift()
+            return
+        self.painel_desempenho = PainelDesempenho(self.janela, self)
+        self._atualizar_desempenho()
+
+    def _atualizar_desempenho(self):
+        if self.painel_desempenho is not None and self.perfis:
+            self.painel_desempenho.exibir(*self.perfis[-1])
+
+# Painel de desempenho: tempo, linhas de entrada e saída e pico de memória de cada etapa da última análise
+# (atualizado enquanto ela roda) e exportação dos perfis da sessão no formato de trace do Chrome
+class PainelDesempenho:
+    COLUNAS = [('segundos', "Tempo (s)", 80), ('linhas_entrada', "Linhas de entrada", 110),
+               ('linhas_saida', "Linhas de saída", 110), ('memoria_pico', "Memória (MB)", 100)]
+
+    def __init__(self, janela, executor):
+        self.executor = executor
+        self.janela = tk.Toplevel(janela)
+        self.janela.title("Desempenho")
+        self.janela.protocol('WM_DELETE_WINDOW', self.fechar)
+
+        self.titulo = tk.StringVar()
+        tk.Label(self.janela, textvariable=self.titulo, anchor='w').grid(row=0, column=0, columnspan=2, sticky='ew',
+                                                                          padx=5, pady=5)
+
+        self.tabela = ttk.Treeview(self.janela, columns=[nome for nome, _, _ in self.COLUNAS], height=12)
+        self.tabela.heading('#0', text="Etapa")
+        self.tabela.column('#0', width=320)
+        for nome, texto, largura in self.COLUNAS:
+            self.tabela.heading(nome, text=texto)
+            self.tabela.column(nome, width=largura, anchor='e')
+        self.tabela.grid(row=1, column=0, columnspan=2, sticky='nsew', padx=5)
+
+        self.medir_memoria = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.janela, text="Medir a memória nas próximas análises (mais lento)",
+                       variable=self.medir_memoria).grid(row=2, column=0, sticky='w', padx=5, pady=5)
+        tk.Button(self.janela, text="Exportar trace...", command=self.exportar).grid(row=2, column=1, sticky='e',
+                                                                                     padx=5, pady=5)
+        self.janela.rowconfigure(1, weight=1)
+        self.janela.columnconfigure(0, weight=1)
+
+    # Função para exibir as etapas de um perfil
+    def exibir(self, nome, perfil):
+        etapas = perfil.etapas()
+        situacao = "concluída" if perfil.encerrado else "em andamento"
+        self.titulo.set(f"{nome} ({situacao}): {perfil.total():.3f} s")
+        self.tabela.delete(*self.tabela.get_children())
+        for registro in etapas:
+            valores = [f"{registro['segundos']:.3f}", formatar_linhas(registro['linhas_entrada']),
+                       formatar_linhas(registro['linhas_saida']), formatar_memoria(registro['memoria_pico'])]
+            self.tabela.insert('', tk.END, text=registro['etapa'], values=valores)
+
+    # Função para salvar os perfis da sessão em um arquivo de trace (chrome://tracing ou https://ui.perfetto.dev)
+    def exportar(self):
+        destino = filedialog.asksaveasfilename(parent=self.janela, defaultextension='.json',
+                                               filetypes=[("Trace do Chrome", "*.json")], initialfile='perfil.json')
+        if not destino:
+            return
+        try:
+            exportar_trace(self.executor.perfis, destino)
+        except Exception as e:
+            messagebox.showerror("Erro", str(e), parent=self.janela)
+            return
+        messagebox.showinfo("Sucesso", f"Perfil salvo em {destino}", parent=self.janela)
+
+    def fechar(self):
+        self.executor.painel_desempenho = None
+        self.janela.destroy()
+
+# Função para exibir uma imagem PNG (por exemplo um dashboard já desenhado) em uma nova janela com barras de rolagem
+def exibir_imagem(janela, titulo, png):
+    janela_imagem = tk.Toplevel(janela)
+    janela_imagem.title(titulo)
+
+    imagem = tk.PhotoImage(master=janela_imagem, data=base64.b64encode(png))
+    largura = min(imagem.width(), janela_imagem.winfo_screenwidth() - 100)
+    altura = min(imagem.height(), janela_imagem.winfo_screenheight() - 150)
+
+    canvas = tk.Canvas(janela_imagem, width=largura, height=altura, scrollregion=(0, 0, imagem.width(), imagem.height()))
+    barra_vertical = tk.Scrollbar(janela_imagem, orient=tk.VERTICAL, command=canvas.yview)
+    barra_horizontal = tk.Scrollbar(janela_imagem, orient=tk.HORIZONTAL, command=canvas.xview)
+    canvas.config(xscrollcommand=barra_horizontal.set, yscrollcommand=barra_vertical.set)
+
+    canvas.grid(row=0, column=0, sticky='nsew')
+    barra_vertical.grid(row=0, column=1, sticky='ns')
+    barra_horizontal.grid(row=1, column=0, sticky='ew')
+    janela_imagem.rowconfigure(0, weight=1)
+    janela_imagem.columnconfigure(0, weight=1)
+
+    canvas.create_image(0, 0, image=imagem, anchor='nw')
+    canvas.imagem = imagem  # Manter a referência para a imagem não ser descartada
+    return janela_imagem
+
+# Função para fechar uma janela auxiliar, se ainda estiver aberta (por exemplo o dashboard estimado em uma amostra,
+# substituído pelo exato)
+def fechar_janela(janela_auxiliar):
+    if janela_auxiliar is not None and janela_auxiliar.winfo_exists():
+        janela_auxiliar.destroy()
+
+# Função para exibir um texto longo (tabelas de resultados) em uma janela separada, com barras de rolagem
+def exibir_texto(janela, titulo, texto):
+    janela_texto = tk.Toplevel(janela)
+    janela_texto.title(titulo)
+
+    caixa = tk.Text(janela_texto, width=120, height=30, wrap='none', font='TkFixedFont')
+    barra_vertical = tk.Scrollbar(janela_texto, orient=tk.VERTICAL, command=caixa.yview)
+    barra_horizontal = tk.Scrollbar(janela_texto, orient=tk.HORIZONTAL, command=caixa.xview)
+    caixa.config(xscrollcommand=barra_horizontal.set, yscrollcommand=barra_vertical.set)
+
+    caixa.grid(row=0, column=0, sticky='nsew')
+    barra_vertical.grid(row=0, column=1, sticky='ns')
+    barra_horizontal.grid(row=1, column=0, sticky='ew')
+    janela_texto.rowconfigure(0, weight=1)
+    janela_texto.columnconfigure(0, weight=1)
+
+    caixa.insert(tk.END, texto)
+    caixa.config(state=tk.DISABLED)
+    return janela_texto
+
+# Função para montar a linha exibida para um país a partir do seu resumo no dicionário de países
+def descrever_pais(pais, resumo):
+    partes = [f"{resumo['atletas']} atletas"]
+    if resumo.get('ano_inicio') is not None:
+        partes.append(f"{resumo['ano_inicio']}-{resumo['ano_fim']}")
+    medalhas = sum(resumo.get('medalhas', {}).values())
+    partes.append(f"{medalhas} medalhas")
+    return f"{pais}  ({', '.join(partes)})"
+
+# Lista de países com busca: um campo de busca filtra a lista a cada tecla e só as linhas visíveis são desenhadas
+# (um número fixo de itens de texto do Canvas é reaproveitado ao rolar), de modo que o custo de exibir ou filtrar
+# não depende do número de países. Clicar em um país chama ao_selecionar(pais)
+class ListaPaises:
+    def __init__(self, janela, linhas=10, largura=60, ao_selecionar=None):
+        self.ao_selecionar = ao_selecionar
+        self.linhas = linhas
+        self.dicionario = {}
+        self.busca = BuscaPaises()
+        self.visiveis = []  # países que passam pelo filtro
+        self.primeira = 0  # posição do primeiro país visível
+        self.selecionado = None
+
+        self.quadro = tk.Frame(janela)
+        tk.Label(self.quadro, text="Buscar:").grid(row=0, column=0, sticky='w')
+        self.consulta = tk.StringVar()
+        self.consulta.trace_add('write', lambda *_: self._filtrar())
+        tk.Entry(self.quadro, textvariable=self.consulta).grid(row=0, column=1, columnspan=2, sticky='ew')
+
+        fonte = tkfont.nametofont('TkDefaultFont')
+        self.altura_linha = fonte.metrics('linespace') + 4
+        self.canvas = tk.Canvas(self.quadro, width=largura * fonte.measure('0'), height=linhas * self.altura_linha,
+                                background='white', highlightthickness=1)
+        self.canvas.grid(row=1, column=0, columnspan=2, sticky='nsew')
+        self.barra = tk.Scrollbar(self.quadro, command=self._rolar)
+        self.barra.grid(row=1, column=2, sticky='ns')
+        self.quadro.columnconfigure(1, weight=1)
+
+        # Itens reaproveitados: um retângulo de seleção e um texto por linha visível
+        self._fundos = [self.canvas.create_rectangle(0, i * self.altura_linha, 10000, (i + 1) * self.altura_linha,
+                                                     outline='', fill='') for i in range(linhas)]
+        self._textos = [self.canvas.create_text(4, i * self.altura_linha + 2, anchor='nw', text='', font=fonte)
+                        for i in range(linhas)]
+
+        self.canvas.bind('<Button-1>', self._clicar)
+        self.canvas.bind('<MouseWheel>', lambda evento: self._rolar('scroll', -1 if evento.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Button-4>', lambda evento: self._rolar('scroll', -1, 'units'))
+        self.canvas.bind('<Button-5>', lambda evento: self._rolar('scroll', 1, 'units'))
+        self._desenhar()
+
+    # Função para trocar os países exibidos (dicionário de países: nome -> resumo)
+    def definir(self, dicionario):
+        self.dicionario = dicionario
+        self.busca.definir(dicionario)
+        self._filtrar()
+
+    def _filtrar(self):
+        self.visiveis = self.busca.filtrar(self.consulta.get())
+        self.primeira = 0
+        self._desenhar()
+
+    # Função chamada pela barra de rolagem e pela roda do mouse ('moveto', fração) ou ('scroll', n, 'units'/'pages')
+    def _rolar(self, acao, quantidade, unidade=None):
+        ultima = max(0, len(self.visiveis) - self.linhas)
+        if acao == 'moveto':
+            self.primeira = int(float(quantidade) * len(self.visiveis))
+        else:
+            passo = self.linhas if unidade == 'pages' else 1
+            self.primeira += int(quantidade) * passo
+        self.primeira = min(max(0, self.primeira), ultima)
+        self._desenhar()
+
+    # Função para atualizar somente os itens das linhas visíveis
+    def _desenhar(self):
+        for i in range(self.linhas):
+            posicao = self.primeira + i
+            if posicao < len(self.visiveis):
+                pais = self.visiveis[posicao]
+                texto = descrever_pais(pais, self.dicionario[pais])
+                fundo = '#cce4ff' if pais == self.selecionado else ''
+            else:
+                texto, fundo = '', ''
+            self.canvas.itemconfigure(self._textos[i], text=texto)
+            self.canvas.itemconfigure(self._fundos[i], fill=fundo)
+
+        total = max(len(self.visiveis), 1)
+        self.barra.set(self.primeira / total, min(1.0, (self.primeira + self.linhas) / total))
+
+    def _clicar(self, evento):
+        posicao = self.primeira + int(evento.y // self.altura_linha)
+        if posicao >= len(self.visiveis):
+            return
+        self.selecionado = self.visiveis[posicao]
+        self._desenhar()
+        if self.ao_selecionar is not None:
+            self.ao_selecionar(self.selecionado)
+
+# Função para completar automaticamente o nome de um país em um campo de entrada: a cada tecla o restante do primeiro
+# nome que começa com o texto digitado é inserido já selecionado, e continuar digitando o substitui
+def autocompletar(entrada, busca):
+    def completar(evento):
+        if len(evento.char) != 1 or not evento.char.isprintable():
+            return
+        digitado = entrada.get()[:entrada.index(tk.INSERT)]
+        nome = busca.completar(digitado)
+        if nome is None:
+            return
+        entrada.delete(0, tk.END)
+        entrada.insert(0, nome)
+        entrada.icursor(len(digitado))
+        entrada.selection_range(len(digitado), tk.END)
+
+    entrada.bind('<KeyRelease>', completar, add='+')
@@ -1,63 +1,74 @@
-import pandas as pd
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import os  # Importar a biblioteca os para verificar a existência de arquivos
+from fontes import fonte_existe
+from inicio_rapido import preaquecer, executar_operacao
+from interface import ExecutorTarefas, ListaPaises
+
+# Módulos importados em segundo plano depois que a janela aparece (a listagem de países não desenha gráficos
+# e não precisa do matplotlib, do seaborn nem do scipy)
+MODULOS_PREAQUECIDOS = ['dicionario_paises']
 
 # Função para listar países na base de dados
 def listar_paises():
     caminho_arquivo = caminho_entrada.get()
     
-    if not os.path.exists(caminho_arquivo):
+    if not fonte_existe(caminho_arquivo):
         messagebox.showerror("Erro", "O arquivo não foi encontrado. Verifique o caminho.")
         return
 
-    try:
-        # Carregar os dados
-        dados = pd.read_csv(caminho_arquivo)
-
-        # Verificar se a coluna 'pais' existe
-        if 'pais' in dados.columns:
-            paises_unicos = dados['pais'].unique()
-            lista_paises.delete(1.0, tk.END)  # Limpar a caixa de texto
-            for pais in paises_unicos:
-                lista_paises.insert(tk.END, pais + '\n')  # Adicionar cada país na caixa de texto
-        else:
-            messagebox.showerror("Erro", "A coluna 'pais' não foi encontrada no arquivo.")
+    tarefas.executar(lambda tarefa: executar_operacao(tarefa, 'paises', caminho_arquivo), exibir_paises)
 
-    except Exception as e:
-        messagebox.showerror("Erro", str(e))
+# Função para exibir a lista de países (dicionário de países: nome -> linhas, anos e medalhas)
+def exibir_paises(paises):
+    lista_paises.definir(paises)
 
 # Função para selecionar o arquivo CSV
 def selecionar_arquivo():
     arquivo = filedialog.askopenfilename(title="Selecione um arquivo CSV", filetypes=[("CSV files", "*.csv")])
     if arquivo:
-        caminho_entrada.delete(0, tk.END)  # Limpar a entrada
-        caminho_entrada.insert(0, arquivo)  # Inserir o caminho do arquivo selecionado
+        abrir_fonte(arquivo)
+
+# Função para selecionar uma pasta com vários arquivos CSV (por exemplo um arquivo por edição dos Jogos)
+def selecionar_pasta():
+    pasta = filedialog.askdirectory(title="Selecione uma pasta com arquivos CSV")
+    if pasta:
+        abrir_fonte(pasta)
 
-# Configuração da interface gráfica com Tkinter
-janela = tk.Tk()
-janela.title("Listar Países a partir de um CSV")
+# Função para usar o arquivo ou a pasta selecionada
+def abrir_fonte(arquivo):
+    caminho_entrada.delete(0, tk.END)  # Limpar a entrada
+    caminho_entrada.insert(0, arquivo)  # Inserir o caminho do arquivo selecionado
+    # Gerar a versão binária do CSV e o dicionário de países uma única vez (em segundo plano)
+    # para acelerar as próximas leituras, e já exibir os países do arquivo
+    tarefas.executar(lambda tarefa: executar_operacao(tarefa, 'preparar', arquivo), exibir_paises, "Convertendo o arquivo")
 
-# Labels e Entradas
-tk.Label(janela, text="Caminho do arquivo CSV:").grid(row=0, column=0, padx=10, pady=5)
-caminho_entrada = tk.Entry(janela, width=50)
-caminho_entrada.grid(row=0, column=1, padx=10, pady=5)
+if __name__ == '__main__':
+    # Configuração da interface gráfica com Tkinter
+    janela = tk.Tk()
+    janela.title("Listar Países a partir de um CSV")
 
-# Botão para selecionar o arquivo
-tk.Button(janela, text="Selecionar Arquivo", command=selecionar_arquivo).grid(row=0, column=2, padx=10, pady=5)
+    # Labels e Entradas
+    tk.Label(janela, text="Caminho do arquivo CSV ou pasta:").grid(row=0, column=0, padx=10, pady=5)
+    caminho_entrada = tk.Entry(janela, width=50)
+    caminho_entrada.grid(row=0, column=1, padx=10, pady=5)
 
-# Botão para listar países
-tk.Button(janela, text="Listar Países", command=listar_paises).grid(row=1, column=0, columnspan=3, pady=20)
+    # Botões para selecionar um arquivo CSV ou uma pasta de CSVs (o campo também aceita um padrão: dados/*.csv)
+    botoes_fonte = tk.Frame(janela)
+    botoes_fonte.grid(row=0, column=2, padx=10, pady=5)
+    tk.Button(botoes_fonte, text="Selecionar Arquivo", command=selecionar_arquivo).pack(side=tk.LEFT)
+    tk.Button(botoes_fonte, text="Selecionar Pasta", command=selecionar_pasta).pack(side=tk.LEFT, padx=(5, 0))
 
-# Caixa de texto para exibir os países
-lista_paises = tk.Text(janela, height=15, width=60)
-lista_paises.grid(row=2, column=0, columnspan=3, padx=10, pady=10)
+    # Botão para listar países
+    tk.Button(janela, text="Listar Países", command=listar_paises).grid(row=1, column=0, columnspan=3, pady=20)
 
-# Adicionando uma barra de rolagem à caixa de texto
-scrollbar = tk.Scrollbar(janela, command=lista_paises.yview)
-scrollbar.grid(row=2, column=3, sticky='ns')  # Posição da barra de rolagem
+    # Lista de países com busca (com barra de rolagem)
+    lista_paises = ListaPaises(janela, linhas=15, largura=60)
+    lista_paises.quadro.grid(row=2, column=0, columnspan=3, padx=10, pady=10)
 
-lista_paises.config(yscrollcommand=scrollbar.set)  # Conectar a barra de rolagem à caixa de texto
+    # Progresso e cancelamento das tarefas executadas em segundo plano
+    tarefas = ExecutorTarefas(janela)
+    tarefas.quadro.grid(row=3, column=0, columnspan=3, padx=10, pady=5)
 
-# Executar a interface gráfica
-janela.mainloop()
+    # Importar o dicionário de países em segundo plano e executar a interface gráfica
+    preaquecer(janela, MODULOS_PREAQUECIDOS)
+    janela.mainloop()
@@ -0,0 +1,211 @@
+import hashlib
+import threading
+from contextlib import contextmanager
+
+# Operações das janelas: o trabalho de segundo plano de cada botão (análise com cache em disco, lista de países e
+# dashboard), sem os passos que dependem da máquina de quem pediu (salvar os dados limpos, exibir os gráficos).
+# Rodam na própria janela ou no serviço local (servico.py), que mantém os dados, índices e caches carregados para
+# todas as janelas. O primeiro argumento de toda operação é o caminho dos dados e os demais são números, textos,
+# listas ou opções (verdadeiro/falso); as operações de DEVOLVEM_DADOS devolvem os atletas da seleção limpa, que a
+# janela grava onde escolher.
+# No modo progressivo, a análise publica uma estimativa antes do resultado exato (tarefas.py). Os módulos de análise
+# são importados dentro das funções, como nas janelas (inicio_rapido.py)
+
+# Travas das análises de cada fonte de dados: as janelas de anos (incremental.py) são movidas no lugar e usadas até
+# o fim da análise, então duas análises dos mesmos dados não podem calculá-las ao mesmo tempo. Resultados e painéis
+# já em cache não passam pela trava
+_travas = {}
+_trava_travas = threading.Lock()
+
+# Função para envolver o cálculo de uma análise na trava da fonte de dados (a espera pode ser cancelada)
+def _exclusivo(caminho_arquivo, calcular):
+    with _trava_travas:
+        trava = _travas.setdefault(caminho_arquivo, threading.Lock())
+
+    def calcular_exclusivo(tarefa):
+        while not trava.acquire(timeout=0.1):
+            if tarefa is not None:
+                tarefa.verificar()
+        try:
+            return calcular(tarefa)
+        finally:
+            trava.release()
+    return calcular_exclusivo
+
+# Estimativas publicadas antes do resultado exato de uma análise, no modo progressivo (progressivo.py): primeiro as
+# estatísticas de cada amostra, assim que saem (com os dados fora da memória, uma amostra menor e depois a inteira),
+# e depois com o dashboard da amostra inteira, desenhado em outra thread enquanto a análise exata roda dentro do
+# with. Com as estatísticas exatas prontas, o dashboard da amostra não chegaria antes do exato e é cancelado; com os
+# dados já em memória ele nem começa (a análise exata leva menos que desenhar os gráficos). Nada é publicado se o
+# resultado exato já estiver no cache em disco ou se a amostra forem os dados
+@contextmanager
+def _estimativa_antes(progressivo, caminho_arquivo, analise, parametros, estimar, tarefa):
+    from cache_disco import resultado_em_cache, hash_conhecido
+    from carregador import dados_em_memoria
+    from progressivo import obter_amostra, amostra_em_cache
+    from tarefas import Tarefa, publicar
+
+    # Arquivo ainda sem hash (primeira análise): o resultado exato não pode estar no cache e a estimativa sai antes
+    # de ler o arquivo inteiro para o hash
+    sem_hash = progressivo and hash_conhecido(caminho_arquivo) is None
+    guardar_amostra = False
+    desenho = None
+    if progressivo and (sem_hash or not resultado_em_cache(caminho_arquivo, analise, parametros)):
+        em_memoria = dados_em_memoria(caminho_arquivo)
+        guardar_amostra = not amostra_em_cache(caminho_arquivo)
+        estimativa = None
+        for estimativa in estimar(tarefa):
+            publicar(tarefa, dict(estimativa, dashboard=None))
+        if estimativa is not None and not em_memoria:
+            desenho = Tarefa()
+            threading.Thread(target=_publicar_dashboard_estimado, daemon=True,
+                             args=(caminho_arquivo, parametros, estimativa, tarefa, desenho)).start()
+    try:
+        yield
+        # A amostra sorteada sem os dados vai para o cache em disco agora que a análise exata carregou os dados e
+        # calculou o hash (sorteada de novo dos dados carregados, estratificada)
+        if guardar_amostra:
+            obter_amostra(caminho_arquivo, tarefa)
+    finally:
+        if desenho is not None:
+            desenho.cancelar()
+
+# Função executada em outra thread para desenhar e publicar o dashboard da amostra; o desenho tem a sua própria
+# tarefa (a etapa exibida continua a da análise exata) e é descartado se uma das duas for cancelada
+def _publicar_dashboard_estimado(caminho_arquivo, parametros, estimativa, tarefa, desenho):
+    from paineis import renderizar_dashboard
+    from progressivo import TAMANHO_AMOSTRA
+    from tarefas import publicar, TarefaCancelada
+
+    # Os painéis da amostra ficam em cache separados dos painéis exatos (e a análise geral usa os do período); a
+    # fração separa os painéis da amostra de blocos do CSV dos da amostra estratificada
+    filtros = tuple(parametros) + ('amostra', TAMANHO_AMOSTRA, estimativa['fracao'])
+    try:
+        dashboard = renderizar_dashboard('periodo', caminho_arquivo, filtros, estimativa, desenho)
+        desenho.verificar()
+        publicar(tarefa, dict(estimativa, dashboard=dashboard))
+    except TarefaCancelada:
+        pass
+
+# Função para montar os filtros do cache dos gráficos de uma análise por intervalo de anos: os gráficos ficam em
+# cache pelos anos que têm dados e por um resumo das medalhas por país do intervalo pedido (o único painel que não
+# depende só dos anos com dados), de modo que mudar o intervalo sem mudar nenhum painel não desenha nada de novo
+def filtros_dashboard(resultado, *filtros):
+    medalhas = resultado['medalhas_pais']
+    conteudo = repr(list(zip(map(str, medalhas.index), medalhas.tolist())))
+    return filtros + (resultado['anos'], hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:16])
+
+# Lista de países do arquivo (dicionário de países: nome -> linhas, anos e medalhas)
+def paises(caminho_arquivo, tarefa=None):
+    from inicio_rapido import listar_paises_arquivo
+    return listar_paises_arquivo(caminho_arquivo, tarefa)
+
+# Conversão do arquivo para o formato binário e lista de países (ao selecionar o arquivo)
+def preparar(caminho_arquivo, tarefa=None):
+    from inicio_rapido import preparar_e_listar
+    return preparar_e_listar(caminho_arquivo, tarefa)
+
+# Análise de todos os atletas (dados.py); os gráficos são desenhados pela janela, a partir do resumo da dispersão.
+# No modo progressivo, a estimativa na amostra é publicada antes
+def geral(caminho_arquivo, progressivo=False, tarefa=None):
+    from analises import analisar_geral
+    from cache_disco import obter_resultado
+    from graficos import resumir_dispersao
+    from progressivo import estimar_geral
+
+    with _estimativa_antes(progressivo, caminho_arquivo, 'geral', (),
+                           lambda tarefa: estimar_geral(caminho_arquivo, tarefa), tarefa):
+        resultado = obter_resultado(caminho_arquivo, 'geral', (),
+                                    _exclusivo(caminho_arquivo, lambda tarefa: analisar_geral(caminho_arquivo, tarefa)),
+                                    tarefa)
+    resultado['dispersao'] = resumir_dispersao(resultado['dados'])
+    return resultado
+
+# Análise de um intervalo de anos com a lista de países e o dashboard (dadosano.py). No modo progressivo, a
+# estimativa na amostra é publicada antes
+def periodo(caminho_arquivo, ano_inicio, ano_fim, progressivo=False, tarefa=None):
+    from analises import analisar_periodo
+    from cache_disco import obter_resultado
+    from inicio_rapido import listar_paises_arquivo
+    from paineis import renderizar_dashboard
+    from progressivo import estimar_periodo
+
+    # O resultado fica no cache em disco: o mesmo intervalo de anos, mesmo em outra sessão, não é recalculado
+    calcular = _exclusivo(caminho_arquivo,
+                          lambda tarefa: analisar_periodo(caminho_arquivo, ano_inicio, ano_fim, tarefa))
+    with _estimativa_antes(progressivo, caminho_arquivo, 'periodo', (ano_inicio, ano_fim),
+                           lambda tarefa: estimar_periodo(caminho_arquivo, ano_inicio, ano_fim, tarefa), tarefa):
+        resultado = obter_resultado(caminho_arquivo, 'periodo', (ano_inicio, ano_fim), calcular, tarefa)
+    resultado['paises'] = listar_paises_arquivo(caminho_arquivo, tarefa)
+    resultado['dashboard'] = renderizar_dashboard('periodo', caminho_arquivo, filtros_dashboard(resultado), resultado,
+                                                  tarefa)
+    return resultado
+
+# Análise de um país em um intervalo de anos com o dashboard (dadospais.py)
+def pais(caminho_arquivo, pais_selecionado, ano_inicio, ano_fim, tarefa=None):
+    from analises import analisar_pais
+    from cache_disco import obter_resultado
+    from paineis import renderizar_dashboard
+
+    # O resultado fica no cache em disco: o mesmo país e anos, mesmo em outra sessão, não são recalculados
+    calcular = _exclusivo(caminho_arquivo,
+                          lambda tarefa: analisar_pais(caminho_arquivo, pais_selecionado, ano_inicio, ano_fim, tarefa))
+    resultado = obter_resultado(caminho_arquivo, 'pais', (pais_selecionado, ano_inicio, ano_fim), calcular, tarefa)
+    resultado['dashboard'] = renderizar_dashboard('pais', caminho_arquivo,
+                                                  filtros_dashboard(resultado, pais_selecionado), resultado, tarefa)
+    return resultado
+
+# Comparação de dois países com o dashboard, se ambos tiverem dados (dadoscomparapais.py)
+def comparacao(caminho_arquivo, pais_1, pais_2, ano_inicio, ano_fim, tarefa=None):
+    from analises import comparar_paises
+    from cache_disco import obter_resultado
+    from graficos import dashboard_disponivel
+    from paineis import renderizar_dashboard
+
+    # O resultado fica no cache em disco: os mesmos países e anos, mesmo em outra sessão, não são recalculados
+    calcular = _exclusivo(caminho_arquivo,
+                          lambda tarefa: comparar_paises(caminho_arquivo, pais_1, pais_2, ano_inicio, ano_fim, tarefa))
+    resultado = obter_resultado(caminho_arquivo, 'comparacao', (pais_1, pais_2, ano_inicio, ano_fim), calcular, tarefa)
+    resultado['dashboard'] = None
+    if dashboard_disponivel('comparacao', resultado):
+        resultado['dashboard'] = renderizar_dashboard('comparacao', caminho_arquivo,
+                                                      (pais_1, pais_2, ano_inicio, ano_fim), resultado, tarefa)
+    return resultado
+
+# Comparação de vários países com o dashboard, se ao menos dois tiverem dados (dadoscomparapais.py)
+def varios(caminho_arquivo, paises, ano_inicio, ano_fim, tarefa=None):
+    from analises import comparar_varios_paises
+    from cache_disco import obter_resultado
+    from graficos import dashboard_disponivel
+    from paineis import renderizar_dashboard
+
+    paises = list(paises)
+    calcular = _exclusivo(caminho_arquivo,
+                          lambda tarefa: comparar_varios_paises(caminho_arquivo, paises, ano_inicio, ano_fim, tarefa))
+    resultado = obter_resultado(caminho_arquivo, 'varios', (tuple(paises), ano_inicio, ano_fim), calcular, tarefa)
+    resultado['dashboard'] = None
+    if dashboard_disponivel('varios', resultado):
+        resultado['dashboard'] = renderizar_dashboard('varios', caminho_arquivo,
+                                                      tuple(paises) + (ano_inicio, ano_fim), resultado, tarefa)
+    return resultado
+
+# Operações pelo nome (usado pelo serviço para atender os pedidos)
+OPERACOES = {
+    'paises': paises,
+    'preparar': preparar,
+    'geral': geral,
+    'periodo': periodo,
+    'pais': pais,
+    'comparacao': comparacao,
+    'varios': varios,
+}
+
+# Operações cujas janelas gravam os dados limpos: o serviço devolve os atletas da seleção limpa ('dados') somente
+# nelas (nas demais, as janelas recebem as estatísticas, os resumos e os dashboards)
+DEVOLVEM_DADOS = {'geral', 'pais'}
+
+# Função para executar uma operação pelo nome
+def executar(nome, argumentos, tarefa=None):
+    if nome not in OPERACOES:
+        raise ValueError(f"Operação desconhecida: {nome}")
+    return OPERACOES[nome](*argumentos, tarefa=tarefa)
@@ -0,0 +1,53 @@
+import numpy as np
+from acumuladores import HistogramaQuantis
+
+# Modos de cálculo dos quartis: 'aproximado' usa histogramas de resolução fixa (tempo linear, sem ordenação),
+# 'exato' usa o quantile() do pandas e serve para validar o modo aproximado
+MODO_APROXIMADO = 'aproximado'
+MODO_EXATO = 'exato'
+
+# Resolução padrão (em cm/kg) dos histogramas: o erro de cada quartil é de no máximo meia resolução
+RESOLUCAO_PADRAO = 0.01
+
+# Colunas filtradas pelo critério do IQR nas análises
+COLUNAS_OUTLIERS = ['altura', 'peso']
+
+# Função para calcular os limites do filtro de outliers (Q1 - 1.5 * IQR, Q3 + 1.5 * IQR)
+# a partir de qualquer objeto com um método quantil(q)
+def limites_iqr(esboco):
+    q1 = esboco.quantil(0.25)
+    q3 = esboco.quantil(0.75)
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+# Quartis exatos de uma série do pandas, com a mesma interface dos histogramas
+class _QuantisExatos:
+    def __init__(self, valores):
+        self.valores = valores
+
+    def quantil(self, q):
+        return self.valores.quantile(q)
+
+# Função para calcular os limites do filtro de outliers de uma coluna
+def calcular_limites(df, column, modo=MODO_APROXIMADO, resolucao=RESOLUCAO_PADRAO):
+    if modo == MODO_EXATO:
+        return limites_iqr(_QuantisExatos(df[column]))
+    return limites_iqr(HistogramaQuantis(resolucao).adicionar(df[column]))
+
+# Função para remover outliers de uma coluna pelo critério do IQR
+def remove_outliers(df, column, modo=MODO_APROXIMADO, resolucao=RESOLUCAO_PADRAO):
+    limites = calcular_limites(df, column, modo, resolucao)
+    return df[(df[column] >= limites[0]) & (df[column] <= limites[1])]
+
+# Função para montar de uma só vez a máscara das linhas que ficam na limpeza: sem valores ausentes nas colunas
+# indicadas (por padrão todas, como em dados.dropna()) e dentro dos limites de cada coluna (coluna -> (mínimo,
+# máximo)), opcionalmente restrita a uma seleção prévia (mascara). As condições são combinadas em um único vetor
+# booleano e os dados são copiados uma única vez, por quem aplicar a máscara, em vez de uma cópia por filtro
+def mascara_limpeza(dados, limites, colunas=None, mascara=None):
+    validas = np.ones(len(dados), dtype=bool) if mascara is None else np.array(mascara, dtype=bool)
+    for coluna in dados.columns if colunas is None else colunas:
+        validas &= dados[coluna].notna().to_numpy()
+    for coluna, (minimo, maximo) in limites.items():
+        valores = dados[coluna].to_numpy()
+        validas &= (valores >= minimo) & (valores <= maximo)
+    return validas
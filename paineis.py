@@ -0,0 +1,143 @@
+import io
+import os
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from carregador import chave_arquivo
+from cache_disco import chave_resultado, ler_resultado, gravar_resultado
+from tarefas import etapa
+
+# Renderização dos dashboards fora da interface: cada painel da grade 2x2 é desenhado em um processo separado
+# (backend Agg, sem janela) e devolvido como imagem PNG; as imagens são montadas em uma única imagem do dashboard.
+# Painéis e dashboards montados ficam em cache por (arquivo, filtros, painel), em memória e no cache em disco
+# (cache_disco.py), de modo que reabrir o dashboard do mesmo país e anos, mesmo em outra sessão, não desenha nada
+
+# Tamanho (em polegadas) e resolução de cada painel: a grade montada tem o tamanho da figura original (20x15)
+TAMANHO_PAINEL = (10, 7.5)
+DPI_PAINEL = 100
+
+# Nome usado no cache para o dashboard montado
+DASHBOARD = 'dashboard'
+
+# Número máximo de imagens guardadas no cache (painéis e dashboards montados)
+LIMITE_CACHE_PAINEIS = 64
+
+# Cache das imagens já desenhadas: (chave do arquivo, tipo, filtros, painel) -> PNG
+# (o dashboard montado fica no mesmo cache, com o painel DASHBOARD)
+_cache_paineis = OrderedDict()
+_trava_cache = threading.Lock()
+
+# Processos usados para desenhar os painéis (criados no primeiro uso)
+_executor = None
+_trava_executor = threading.Lock()
+
+# Função para obter o executor dos painéis; os processos são iniciados com 'spawn' em todos os sistemas,
+# porque a interface já tem threads em andamento e o fork de um processo com threads não é seguro
+def _obter_executor():
+    global _executor
+    with _trava_executor:
+        if _executor is None:
+            processos = min(4, os.cpu_count() or 1)
+            _executor = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'))
+    return _executor
+
+# Função executada nos processos: desenha um painel em uma figura própria e devolve o PNG (resultado traz somente
+# as entradas do painel, graficos.entradas_painel)
+def renderizar_painel(tipo, painel, resultado):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from graficos import desenhar_painel
+
+    sns.set(style='whitegrid')
+    figura = Figure(figsize=TAMANHO_PAINEL, dpi=DPI_PAINEL)
+    FigureCanvasAgg(figura)
+    desenhar_painel(figura.add_subplot(), tipo, painel, resultado)
+    figura.tight_layout()
+
+    buffer = io.BytesIO()
+    figura.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+# Função para montar as imagens dos painéis em uma grade 2x2 e devolver o PNG resultante
+# (posições sem imagem ficam em branco, como no dashboard comparativo, que tem três painéis)
+def montar_grade(imagens, colunas=2, linhas=2):
+    from matplotlib import image
+
+    quadros = [image.imread(io.BytesIO(png), format='png') for png in imagens]
+    quadros += [np.ones_like(quadros[0])] * (colunas * linhas - len(quadros))
+    grade = [np.concatenate(quadros[i:i + colunas], axis=1) for i in range(0, len(quadros), colunas)]
+
+    buffer = io.BytesIO()
+    image.imsave(buffer, np.concatenate(grade, axis=0), format='png')
+    return buffer.getvalue()
+
+# Função para guardar uma imagem no cache em memória (com trava: no serviço local, servico.py, várias análises
+# desenham dashboards ao mesmo tempo)
+def _guardar_memoria(chave, png):
+    with _trava_cache:
+        _cache_paineis[chave] = png
+        _cache_paineis.move_to_end(chave)
+        while len(_cache_paineis) > LIMITE_CACHE_PAINEIS:
+            _cache_paineis.popitem(last=False)
+
+# Função para guardar a imagem de um painel na memória e no disco
+def _guardar(caminho_arquivo, chave, png):
+    _guardar_memoria(chave, png)
+    gravar_resultado(chave_resultado(caminho_arquivo, 'painel', chave[1:]), png)
+
+# Função para consultar a imagem de um painel na memória e, se não estiver lá, no disco
+def _consultar(caminho_arquivo, chave):
+    png = _cache_paineis.get(chave)
+    if png is None:
+        png = ler_resultado(chave_resultado(caminho_arquivo, 'painel', chave[1:]))
+        if png is None:
+            return None
+    _guardar_memoria(chave, png)
+    return png
+
+# Função para obter o PNG do dashboard de uma análise (tipo 'periodo', 'pais' ou 'comparacao'), desenhando em
+# paralelo apenas os painéis que ainda não estão em cache; filtros identifica a seleção (país, anos, ...)
+def renderizar_dashboard(tipo, caminho_arquivo, filtros, resultado, tarefa=None):
+    from graficos import PAINEIS_DASHBOARD, entradas_painel
+
+    base = (chave_arquivo(caminho_arquivo), tipo, tuple(filtros))
+    dashboard = _consultar(caminho_arquivo, base + (DASHBOARD,))
+    if dashboard is not None:
+        return dashboard
+
+    paineis = PAINEIS_DASHBOARD[tipo]
+    imagens = {painel: _consultar(caminho_arquivo, base + (painel,)) for painel in paineis}
+
+    pendentes = {}
+    faltando = [painel for painel in paineis if imagens[painel] is None]
+    if faltando:
+        etapa(tarefa, "Desenhando os gráficos")
+        executor = _obter_executor()
+        # Cada processo recebe só as entradas do seu painel, não os atletas da seleção
+        pendentes = {executor.submit(renderizar_painel, tipo, painel, entradas_painel(tipo, painel, resultado)): painel
+                     for painel in faltando}
+
+    try:
+        while pendentes:
+            concluidos, _ = wait(pendentes, timeout=0.1, return_when=FIRST_COMPLETED)
+            etapa(tarefa, f"Desenhando os gráficos ({len(faltando) - len(pendentes) + len(concluidos)}/{len(faltando)})")
+            for futuro in concluidos:
+                painel = pendentes.pop(futuro)
+                imagens[painel] = futuro.result()
+                _guardar(caminho_arquivo, base + (painel,), imagens[painel])
+    finally:
+        # Cancelamento: descartar os painéis que ainda não começaram
+        for futuro in pendentes:
+            futuro.cancel()
+
+    etapa(tarefa, "Montando o dashboard")
+    dashboard = montar_grade([imagens[painel] for painel in paineis])
+    _guardar(caminho_arquivo, base + (DASHBOARD,), dashboard)
+    return dashboard
+
+# Função para descartar as imagens em cache
+def limpar_cache():
+    _cache_paineis.clear()
@@ -0,0 +1,61 @@
+import pandas as pd
+from acumuladores import CoMomentos, Momentos, HistogramaQuantis
+from carregador import COLUNAS_ANALISE, TIPOS_COLUNAS
+from exportacao import abrir_exportador
+from fontes import listar_arquivos
+from outliers import limites_iqr, mascara_limpeza
+from tarefas import etapa
+
+# Número de linhas lidas do CSV de cada vez
+TAMANHO_BLOCO = 500_000
+
+# Função para ler o CSV (ou os CSVs de uma pasta ou padrão, um depois do outro) em blocos, já sem as linhas com
+# valores ausentes (com uma tarefa, o cancelamento é verificado a cada bloco)
+def ler_blocos(caminho_arquivo, tamanho_bloco=TAMANHO_BLOCO, tarefa=None):
+    for arquivo in listar_arquivos(caminho_arquivo):
+        leitor = pd.read_csv(arquivo, dtype=TIPOS_COLUNAS, usecols=lambda coluna: coluna in COLUNAS_ANALISE,
+                             chunksize=tamanho_bloco)
+        with leitor:
+            for bloco in leitor:
+                if tarefa is not None:
+                    tarefa.verificar()
+                yield bloco.dropna()
+
+# Função para selecionar as linhas de um bloco dentro dos limites de uma coluna
+def _dentro(bloco, coluna, limites):
+    return bloco[(bloco[coluna] >= limites[0]) & (bloco[coluna] <= limites[1])]
+
+# Função para limpar o CSV sem carregá-lo inteiro na memória, com o mesmo resultado de processar_dados em dados.py
+# (valores ausentes removidos, outliers de altura e depois de peso removidos pelo IQR)
+# O arquivo é lido três vezes: quartis da altura, quartis do peso das linhas que passaram pelo filtro da altura
+# e, por fim, filtragem, estatísticas e gravação bloco a bloco (em qualquer formato de exportacao.py).
+# Devolve os acumuladores de altura e peso e, em 'comomentos', o das colunas numéricas (matriz de correlação)
+def processar_em_blocos(caminho_arquivo, destino='dados_limpos.csv', tamanho_bloco=TAMANHO_BLOCO, resolucao=0.01,
+                        tarefa=None, formato='csv'):
+    etapa(tarefa, "Calculando os quartis da altura")
+    quartis_altura = HistogramaQuantis(resolucao)
+    for bloco in ler_blocos(caminho_arquivo, tamanho_bloco, tarefa):
+        quartis_altura.adicionar(bloco['altura'])
+    limites_altura = limites_iqr(quartis_altura)
+
+    etapa(tarefa, "Calculando os quartis do peso")
+    quartis_peso = HistogramaQuantis(resolucao)
+    for bloco in ler_blocos(caminho_arquivo, tamanho_bloco, tarefa):
+        quartis_peso.adicionar(_dentro(bloco, 'altura', limites_altura)['peso'])
+    limites_peso = limites_iqr(quartis_peso)
+
+    etapa(tarefa, "Filtrando e salvando os dados")
+    momentos = {'altura': Momentos(), 'peso': Momentos(), 'comomentos': None}
+    exportador = abrir_exportador(destino, formato)
+    try:
+        for bloco in ler_blocos(caminho_arquivo, tamanho_bloco, tarefa):
+            bloco = bloco[mascara_limpeza(bloco, {'altura': limites_altura, 'peso': limites_peso}, colunas=[])]
+            momentos['altura'].adicionar(bloco['altura'])
+            momentos['peso'].adicionar(bloco['peso'])
+            if momentos['comomentos'] is None:
+                momentos['comomentos'] = CoMomentos(bloco.select_dtypes(include='number').columns)
+            momentos['comomentos'].adicionar(bloco)
+            exportador.escrever(bloco)
+    finally:
+        exportador.fechar()
+    return momentos
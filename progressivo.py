@@ -0,0 +1,253 @@
+import math
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from carregador import (carregar_dados, obter_derivado, dados_em_memoria, abrir_binario, blocos_csv, ler_blocos_csv,
+                        juntar_partes)
+from cache_disco import obter_resultado, hash_conhecido, resultado_em_cache
+from outliers import mascara_limpeza, calcular_limites, MODO_EXATO
+from tarefas import etapa
+
+# Resultados progressivos: antes da análise exata dos dados inteiros, as estatísticas e os gráficos são estimados
+# em uma amostra estratificada por país, ano e sexo, de tamanho fixo. O custo da estimativa não depende do tamanho
+# dos dados e a janela exibe uma primeira visão, com intervalos de confiança, enquanto a análise exata continua em
+# segundo plano (operacoes.py). Com os dados ainda fora da memória, a amostra é tirada sem carregá-los: do arquivo
+# binário mapeado em memória ou de blocos sorteados do CSV, primeiro uma amostra menor e depois a inteira. Depois da
+# análise exata, a amostra é sorteada dos dados carregados e guardada no cache em disco para as próximas sessões
+
+# Tamanho da amostra (linhas): as estatísticas e os quatro gráficos de uma amostra deste tamanho saem em menos de
+# um segundo; dados com até este número de linhas não têm estimativa (a análise exata é tão rápida quanto)
+TAMANHO_AMOSTRA = 100_000
+
+# Colunas que definem os estratos da amostra
+ESTRATOS = ['pais', 'ano', 'sexo']
+
+# Nível de confiança dos intervalos das estimativas
+NIVEL_CONFIANCA = 0.95
+
+# Semente do sorteio (a amostra de uma mesma versão dos dados é sempre a mesma)
+SEMENTE_AMOSTRA = 0
+
+# Tamanho da primeira amostra de dados que ainda não estão em memória: a primeira estimativa sai nela e é refinada na
+# amostra inteira, ambas antes do resultado exato
+TAMANHO_PRIMEIRA_AMOSTRA = 10_000
+
+# Tamanho (bytes) dos blocos sorteados de um CSV sem o arquivo binário: blocos pequenos espalham a amostra pelo
+# arquivo inteiro, mesmo com as linhas ordenadas por ano ou país
+BLOCO_AMOSTRA = 16 * 1024
+
+# Função para ordenar as linhas por país, ano, sexo e uma chave aleatória (os estratos de sortear_amostra)
+def _ordenar_estratos(dados, gerador):
+    chaves = [gerador.random(len(dados))]
+    for coluna in reversed(ESTRATOS):
+        valores = dados[coluna]
+        chaves.append(valores.cat.codes.to_numpy() if isinstance(valores.dtype, pd.CategoricalDtype)
+                      else valores.to_numpy())
+    return np.lexsort(chaves)
+
+# Função para sortear as posições das linhas da amostra: uma linha a cada total / tamanho, a partir de um início
+# aleatório, sobre as linhas ordenadas pelos estratos
+def _sortear_linhas(ordem, tamanho, gerador):
+    passo = len(ordem) / tamanho
+    posicoes = ((gerador.random() + np.arange(tamanho)) * passo).astype('int64')
+    return np.sort(ordem[posicoes])
+
+# Função para sortear a amostra estratificada: as linhas são ordenadas por país, ano, sexo e uma chave aleatória e
+# a amostra pega uma linha a cada total / TAMANHO_AMOSTRA (amostragem sistemática sobre os estratos ordenados). Cada
+# estrato recebe a sua parte proporcional, arredondada para cima ou para baixo, e todas as linhas têm a mesma
+# probabilidade de entrar (fracao), de modo que as estimativas não precisam de pesos
+def sortear_amostra(dados, tamanho=TAMANHO_AMOSTRA):
+    total = len(dados)
+    if total <= tamanho:
+        return {'dados': dados, 'fracao': 1.0, 'total': total}
+
+    gerador = np.random.default_rng(SEMENTE_AMOSTRA)
+    linhas = _sortear_linhas(_ordenar_estratos(dados, gerador), tamanho, gerador)
+    return {'dados': dados.iloc[linhas].reset_index(drop=True), 'fracao': tamanho / total, 'total': total}
+
+# Função para sortear as amostras do arquivo binário mapeado em memória: somente as colunas dos estratos são
+# convertidas inteiras, para o mesmo sorteio de sortear_amostra (a amostra inteira é igual à dos dados carregados),
+# e das demais colunas só as linhas sorteadas
+def _amostras_binarias(tabela):
+    total = tabela.num_rows
+    if total <= TAMANHO_AMOSTRA:
+        yield {'dados': tabela.to_pandas(), 'fracao': 1.0, 'total': total}
+        return
+
+    gerador = np.random.default_rng(SEMENTE_AMOSTRA)
+    ordem = _ordenar_estratos(tabela.select(ESTRATOS).to_pandas(), gerador)
+    inteira = _sortear_linhas(ordem, TAMANHO_AMOSTRA, gerador)
+    for tamanho, linhas in ((TAMANHO_PRIMEIRA_AMOSTRA, _sortear_linhas(ordem, TAMANHO_PRIMEIRA_AMOSTRA, gerador)),
+                            (TAMANHO_AMOSTRA, inteira)):
+        yield {'dados': tabela.take(linhas).to_pandas(), 'fracao': tamanho / total, 'total': total}
+
+# Função para sortear as amostras de blocos do CSV (de carregador.blocos_csv), lidos em uma ordem aleatória: cada
+# linha entra na amostra com o bloco em que começa, de modo que todas as linhas têm a mesma probabilidade de entrar
+# (blocos lidos / blocos). A amostra não é estratificada, mas os blocos pequenos a espalham pelos arquivos. O número
+# de blocos a ler sai da média de linhas por bloco dos blocos já lidos, e o total de linhas é estimado
+def _amostras_blocos(blocos):
+    ordem = np.random.default_rng(SEMENTE_AMOSTRA).permutation(len(blocos))
+    partes = []
+    lidos = linhas = 0
+    for tamanho in (TAMANHO_PRIMEIRA_AMOSTRA, TAMANHO_AMOSTRA):
+        while linhas < tamanho and lidos < len(blocos):
+            faltam = 1 if lidos == 0 else math.ceil((tamanho - linhas) * lidos / max(linhas, 1))
+            novos = ordem[lidos:lidos + faltam]
+            partes.append(ler_blocos_csv([blocos[indice] for indice in novos]))
+            lidos += len(novos)
+            linhas += len(partes[-1])
+        partes = [juntar_partes(partes)]
+        fracao = lidos / len(blocos)
+        yield {'dados': partes[0], 'fracao': fracao, 'total': round(linhas / fracao)}
+        if fracao >= 1:
+            return
+
+# Função para sortear as amostras de um arquivo, da menor para a maior. Com os dados em memória, somente a amostra
+# inteira (uma vez por DataFrame, como os demais agregados); senão, sem carregar os dados, primeiro uma amostra menor
+# e depois a inteira, do arquivo binário ou de blocos do CSV. Sem nenhum dos dois (CSVs compactados), os dados são
+# carregados
+def _sortear(caminho_arquivo, tarefa):
+    if not dados_em_memoria(caminho_arquivo):
+        etapa(tarefa, "Sorteando a amostra")
+        tabela = abrir_binario(caminho_arquivo)
+        if tabela is not None:
+            yield from _amostras_binarias(tabela)
+            return
+        blocos = blocos_csv(caminho_arquivo, BLOCO_AMOSTRA)
+        if blocos:
+            yield from _amostras_blocos(blocos)
+            return
+        etapa(tarefa, "Carregando os dados")
+    dados = carregar_dados(caminho_arquivo)
+    etapa(tarefa, "Sorteando a amostra")
+    yield obter_derivado(dados, 'amostra_progressiva', sortear_amostra)
+
+# Função para sortear somente a amostra inteira de um arquivo
+def _sortear_inteira(caminho_arquivo, tarefa):
+    for amostra in _sortear(caminho_arquivo, tarefa):
+        pass
+    return amostra
+
+# Função para saber se a amostra de um arquivo já está no cache em disco. Um arquivo que ainda não tem o hash
+# calculado não pode ter a amostra no cache (e o hash não é calculado aqui, para não ler o arquivo inteiro)
+def amostra_em_cache(caminho_arquivo):
+    return (hash_conhecido(caminho_arquivo) is not None
+            and resultado_em_cache(caminho_arquivo, 'amostra', (TAMANHO_AMOSTRA, SEMENTE_AMOSTRA)))
+
+# Função para obter a amostra de um arquivo: do cache em disco ou, na primeira vez, sorteada e guardada nele. Um
+# arquivo que ainda não tem o hash calculado tem a amostra sorteada sem esperar o hash do arquivo inteiro; ela só vai
+# para o cache em disco em uma chamada depois da análise exata (que calcula o hash)
+def obter_amostra(caminho_arquivo, tarefa=None):
+    if hash_conhecido(caminho_arquivo) is None:
+        return _sortear_inteira(caminho_arquivo, tarefa)
+    return obter_resultado(caminho_arquivo, 'amostra', (TAMANHO_AMOSTRA, SEMENTE_AMOSTRA),
+                           lambda tarefa: _sortear_inteira(caminho_arquivo, tarefa), tarefa)
+
+# Função para obter as amostras de um arquivo, da menor para a maior: a do cache em disco, se já estiver lá, ou as
+# sorteadas agora (sem ir para o cache: operacoes.py guarda a amostra com obter_amostra depois da análise exata)
+def obter_amostras(caminho_arquivo, tarefa=None):
+    if amostra_em_cache(caminho_arquivo):
+        yield obter_amostra(caminho_arquivo, tarefa)
+    else:
+        yield from _sortear(caminho_arquivo, tarefa)
+
+# Função para calcular o intervalo de confiança de uma contagem estimada (contagem na amostra / fracao), com a
+# correção para populações finitas
+def _intervalo_contagem(contagem, tamanho, fracao, z):
+    estimativa = contagem / fracao
+    proporcao = contagem / tamanho if tamanho else 0.0
+    erro = z * math.sqrt(tamanho * proporcao * (1 - proporcao) * (1 - fracao)) / fracao
+    return estimativa, (max(0.0, estimativa - erro), estimativa + erro)
+
+# Função para estimar, na amostra, o resultado de uma análise (mesmas chaves de analises.py): seleção pelos anos,
+# limpeza com os limites de outliers da própria amostra (calculados como na análise exata: sobre as linhas sem
+# valores ausentes, primeiro os da altura e depois os do peso entre as linhas dentro deles), contagens multiplicadas
+# por 1 / fracao e intervalos de confiança normais (média: erro padrão s / raiz(n); desvio padrão: s / raiz(2(n - 1)))
+def estimar(amostra, ano_inicio=None, ano_fim=None):
+    dados = amostra['dados']
+    fracao = amostra['fracao']
+    z = NormalDist().inv_cdf(0.5 + NIVEL_CONFIANCA / 2)
+    correcao = math.sqrt(1 - fracao)
+
+    selecionadas = np.ones(len(dados), dtype=bool)
+    if ano_inicio is not None:
+        anos = dados['ano'].to_numpy()
+        selecionadas &= (anos >= ano_inicio) & (anos <= ano_fim)
+    selecao = dados[selecionadas]
+    completos = selecao.dropna()
+    limites = {'altura': calcular_limites(completos, 'altura', MODO_EXATO)}
+    dentro = mascara_limpeza(completos, limites, colunas=[])
+    limites['peso'] = calcular_limites(completos[dentro], 'peso', MODO_EXATO)
+    limpos = dados[mascara_limpeza(dados, limites, mascara=selecionadas)]
+
+    n = len(limpos)
+    contagem, intervalo = _intervalo_contagem(n, len(dados), fracao, z)
+    resultado = {'contagem': round(contagem)}
+    intervalos = {'contagem': intervalo}
+    for coluna in ('altura', 'peso'):
+        valores = limpos[coluna].to_numpy(dtype='float64')
+        media = valores.mean() if n > 0 else float('nan')
+        desvio = valores.std(ddof=1) if n > 1 else float('nan')
+        erro_media = z * desvio / math.sqrt(n) * correcao if n > 1 else float('nan')
+        erro_desvio = z * desvio / math.sqrt(2 * (n - 1)) * correcao if n > 1 else float('nan')
+        resultado[f'media_{coluna}'] = float(media)
+        resultado[f'desvio_padrao_{coluna}'] = float(desvio)
+        intervalos[f'media_{coluna}'] = (float(media - erro_media), float(media + erro_media))
+        intervalos[f'desvio_padrao_{coluna}'] = (float(desvio - erro_desvio), float(desvio + erro_desvio))
+
+    # Medalhas de cada tipo e medalhas por país na seleção limpa (como analises.medalhas_limpas)
+    medalhas = {}
+    for tipo, quantidade in limpos['medalha'].value_counts(sort=False).items():
+        estimativa, intervalos[f'medalhas_{tipo}'] = _intervalo_contagem(quantidade, len(dados), fracao, z)
+        medalhas[tipo] = round(estimativa)
+    por_pais = limpos['pais'].value_counts()
+    por_pais = (por_pais[por_pais > 0] / fracao).round().astype('int64')
+    por_pais.index = por_pais.index.astype(str)
+
+    anos = limpos['ano']
+    return {
+        'dados': limpos,
+        'anos': (int(anos.min()), int(anos.max())) if n > 0 else None,
+        'medalhas': medalhas,
+        'correlacao': limpos.select_dtypes(include='number').corr(),
+        'medalhas_pais': por_pais,
+        'aproximado': True,
+        'intervalos': intervalos,
+        'linhas_amostra': n,
+        'fracao': fracao,
+        **resultado,
+    }
+
+# Estimativas da análise de todos os atletas, uma para cada amostra, da menor para a maior (nenhuma se a amostra
+# forem os próprios dados)
+def estimar_geral(caminho_arquivo, tarefa=None):
+    for amostra in obter_amostras(caminho_arquivo, tarefa):
+        if amostra['fracao'] >= 1:
+            return
+        etapa(tarefa, "Estimando na amostra")
+        yield estimar(amostra)
+
+# Estimativas da análise de um intervalo de anos, uma para cada amostra, da menor para a maior (nenhuma se a amostra
+# forem os próprios dados)
+def estimar_periodo(caminho_arquivo, ano_inicio, ano_fim, tarefa=None):
+    for amostra in obter_amostras(caminho_arquivo, tarefa):
+        if amostra['fracao'] >= 1:
+            return
+        etapa(tarefa, "Estimando na amostra")
+        yield estimar(amostra, ano_inicio, ano_fim)
+
+# Função para montar o texto de uma estatística estimada com o seu intervalo de confiança
+def formatar_estimativa(resultado, nome, unidade=''):
+    inicio, fim = resultado['intervalos'][nome]
+    return f'{resultado[nome]:.2f}{unidade} (IC {NIVEL_CONFIANCA:.0%}: {inicio:.2f} a {fim:.2f})'
+
+# Função para montar o texto das estatísticas estimadas exibido pelas janelas enquanto o resultado exato é calculado
+def formatar_resumo_estimado(resultado):
+    medalhas = ', '.join(f'{tipo}: ~{quantidade}' for tipo, quantidade in resultado['medalhas'].items())
+    return (f'Média Altura: {formatar_estimativa(resultado, "media_altura", " cm")}\n'
+            f'Desvio Padrão Altura: {formatar_estimativa(resultado, "desvio_padrao_altura", " cm")}\n'
+            f'Média Peso: {formatar_estimativa(resultado, "media_peso", " kg")}\n'
+            f'Desvio Padrão Peso: {formatar_estimativa(resultado, "desvio_padrao_peso", " kg")}\n'
+            f'Medalhas: {medalhas}\n'
+            f'Estimativa em uma amostra de {resultado["linhas_amostra"]} atletas '
+            f'({resultado["fracao"]:.1%} dos dados); calculando o resultado exato...')
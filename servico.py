@@ -0,0 +1,554 @@
+import os
+import sys
+import hmac
+import json
+import time
+import hashlib
+import secrets
+import base64
+import socket
+import ipaddress
+import struct
+import asyncio
+import argparse
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from tarefas import Tarefa, TarefaCancelada, etapa, publicar
+
+# Serviço local de análises: um único processo mantém os dados carregados, os índices, as janelas de anos e os
+# caches de resultados e painéis, e atende várias janelas ao mesmo tempo, em vez de cada janela carregar a própria
+# cópia dos dados. É um servidor HTTP mínimo feito com o asyncio, que escuta somente na própria máquina (o serviço
+# não aceita conexões de outras máquinas e as janelas não aceitam serviços em outras máquinas).
+#
+# Outras pessoas da mesma máquina também alcançam a porta, então todo pedido é autenticado. Ao iniciar, o serviço
+# sorteia um token e o grava em um arquivo que só o seu usuário lê (arquivo_token). O token nunca passa pela
+# conexão: a janela assina o pedido com ele (HMAC de um desafio sorteado, do método, do caminho e do corpo) e o
+# serviço responde com a assinatura do mesmo desafio. Assim só as janelas desse usuário usam o serviço, e a janela
+# recusa a resposta de qualquer outro processo que ocupe a porta antes do serviço:
+#   GET  /estado               JSON com os dados em memória e os pedidos atendidos e em andamento
+#   POST /operacoes/<nome>     executa uma operação de operacoes.py; o corpo é {"argumentos": [...]} e a resposta
+#                              é uma sequência de mensagens (1 byte do tipo, 4 bytes do tamanho e o conteúdo): as
+#                              etapas da análise, à medida que avançam, os resultados parciais (JSON, no modo
+#                              progressivo) e por fim o resultado (JSON) ou o erro
+# Os resultados vão em JSON, com os tipos do pandas e do numpy descritos em objetos (_codificar): ler uma resposta
+# nunca executa código, como aconteceria com o pickle de um processo que se passasse pelo serviço.
+# Os pedidos rodam em threads (as análises dos mesmos dados uma de cada vez, operacoes.py) e o cliente que fecha a
+# conexão cancela o seu pedido. As janelas usam o serviço quando a variável OLIMPIADAS_SERVICO tem o endereço
+# ("127.0.0.1:8765" ou só a porta); sem ela, tudo roda na própria janela como antes.
+#
+# Uso: python servico.py [dados.csv ...] [--porta 8765]
+# (os arquivos indicados são carregados na inicialização; os demais, no primeiro pedido)
+#      python servico.py --estado [--porta 8765]
+# (exibe o estado do serviço em execução)
+
+# Endereço do serviço (somente a própria máquina)
+HOST_SERVICO = '127.0.0.1'
+PORTA_PADRAO = 8765
+
+# Variável de ambiente com o endereço do serviço usado pelas janelas (vazia = análises na própria janela)
+VARIAVEL_SERVICO = 'OLIMPIADAS_SERVICO'
+
+# Número de pedidos calculados ao mesmo tempo
+THREADS_SERVICO = 4
+
+# Intervalo (s) entre os envios de etapa no serviço e entre as verificações de cancelamento no cliente
+INTERVALO_VERIFICACAO = 0.1
+
+# Tempo máximo (s) para conectar ao serviço
+TEMPO_CONEXAO = 5
+
+# Tamanho máximo do cabeçalho e do corpo de um pedido
+LIMITE_PEDIDO = 1024 * 1024
+
+# Pasta com o token de cada serviço em execução (um arquivo por porta), legível somente pelo usuário (0700; no
+# Windows, a pasta do usuário já é protegida pelas permissões do perfil)
+DIRETORIO_TOKENS = os.path.join(os.path.expanduser('~'), '.olimpiadas')
+
+# Esquema do cabeçalho Authorization dos pedidos e cabeçalho com a assinatura do serviço nas respostas
+ESQUEMA_AUTORIZACAO = 'Olimpiadas'
+CABECALHO_PROVA = 'X-Olimpiadas-Prova'
+
+# Tipos das mensagens da resposta de uma operação
+ETAPA = b'E'
+PARCIAL = b'P'
+RESULTADO = b'R'
+ERRO = b'X'
+
+# Função para obter o arquivo com o token do serviço de uma porta
+def arquivo_token(porta):
+    return os.path.join(DIRETORIO_TOKENS, f'servico-{porta}.token')
+
+# Função para gravar o token do serviço (arquivo 0600, trocado de forma atômica)
+def gravar_token(porta, token):
+    os.makedirs(DIRETORIO_TOKENS, mode=0o700, exist_ok=True)
+    os.chmod(DIRETORIO_TOKENS, 0o700)
+    destino = arquivo_token(porta)
+    temporario = f'{destino}.{os.getpid()}.tmp'
+    descritor = os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descritor, 'w', encoding='ascii') as arquivo:
+        arquivo.write(token)
+    os.replace(temporario, destino)
+    return destino
+
+# Função para ler o token do serviço de uma porta; o arquivo precisa ser do próprio usuário e não pode ser lido
+# nem alterado por outros (senão outra pessoa poderia ter escolhido o token)
+def ler_token(porta):
+    caminho = arquivo_token(porta)
+    try:
+        estado = os.stat(caminho)
+        with open(caminho, encoding='ascii') as arquivo:
+            token = arquivo.read().strip()
+    except FileNotFoundError:
+        raise ConnectionError(f"O serviço de análises não está em execução para este usuário na porta {porta} "
+                              f"(inicie-o com python servico.py ou apague a variável {VARIAVEL_SERVICO}).") from None
+    if hasattr(os, 'getuid') and (estado.st_uid != os.getuid() or estado.st_mode & 0o077):
+        raise PermissionError(f"O arquivo {caminho} precisa ser do próprio usuário e ter permissão 600.")
+    return token
+
+# Função para assinar as partes de um pedido ou de uma resposta com o token (HMAC-SHA256)
+def assinar(token, *partes):
+    codigo = hmac.new(token.encode('ascii'), digestmod=hashlib.sha256)
+    for parte in partes:
+        codigo.update(parte if isinstance(parte, bytes) else parte.encode('utf-8'))
+        codigo.update(b'\0')
+    return codigo.hexdigest()
+
+# Função para ler os campos de um cabeçalho HTTP (nome em minúsculas -> valor)
+def _campos(linhas):
+    campos = {}
+    for linha in linhas:
+        nome, _, valor = linha.partition(':')
+        campos[nome.strip().lower()] = valor.strip()
+    return campos
+
+# Função para montar uma mensagem da resposta de uma operação
+def mensagem(tipo, conteudo):
+    return tipo + struct.pack('>I', len(conteudo)) + conteudo
+
+# Função para converter um resultado em valores do JSON. Os tipos do pandas e do numpy, as tuplas, os bytes (imagens
+# dos dashboards), os dicionários com chaves que não são texto e as distribuições viram objetos com o campo
+# '__tipo__'; qualquer outro tipo é um erro (a resposta nunca carrega objetos arbitrários, como faria o pickle)
+def _codificar(valor):
+    import numpy as np
+    import pandas as pd
+    from densidade import Distribuicao
+
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, list):
+        return [_codificar(item) for item in valor]
+    if isinstance(valor, tuple):
+        return {'__tipo__': 'tupla', 'itens': [_codificar(item) for item in valor]}
+    if isinstance(valor, bytes):
+        return {'__tipo__': 'bytes', 'base64': base64.b64encode(valor).decode('ascii')}
+    if isinstance(valor, dict):
+        if all(isinstance(chave, str) for chave in valor) and '__tipo__' not in valor:
+            return {chave: _codificar(item) for chave, item in valor.items()}
+        return {'__tipo__': 'dicionario',
+                'itens': [[_codificar(chave), _codificar(item)] for chave, item in valor.items()]}
+    if isinstance(valor, Distribuicao):
+        return {'__tipo__': 'distribuicao', 'valores': _codificar(valor.valores),
+                'contagens': _codificar(valor.contagens)}
+    if isinstance(valor, pd.Categorical):
+        return {'__tipo__': 'categorico', 'categorias': _codificar(valor.categories),
+                'ordenado': bool(valor.ordered), 'codigos': valor.codes.tolist()}
+    if isinstance(valor, np.ndarray):
+        itens = valor.ravel().tolist()
+        if valor.dtype == object:
+            itens = [_codificar(item) for item in itens]
+        return {'__tipo__': 'ndarray', 'dtype': valor.dtype.str if valor.dtype != object else 'object',
+                'forma': list(valor.shape), 'itens': itens}
+    if isinstance(valor, pd.MultiIndex):
+        return {'__tipo__': 'multiindice', 'nomes': _codificar(list(valor.names)),
+                'niveis': [_codificar(valor.get_level_values(nivel)) for nivel in range(valor.nlevels)]}
+    if isinstance(valor, pd.Index):
+        return {'__tipo__': 'indice', 'nome': _codificar(valor.name), 'valores': _valores_coluna(valor)}
+    if isinstance(valor, pd.Series):
+        return {'__tipo__': 'serie', 'nome': _codificar(valor.name), 'indice': _codificar(valor.index),
+                'valores': _valores_coluna(valor)}
+    if isinstance(valor, pd.DataFrame):
+        return {'__tipo__': 'tabela', 'colunas': _codificar(valor.columns), 'indice': _codificar(valor.index),
+                'valores': [_valores_coluna(valor.iloc[:, posicao]) for posicao in range(valor.shape[1])]}
+    raise TypeError(f"Tipo sem formato de envio: {type(valor).__name__}")
+
+# Função para codificar os valores de uma coluna ou índice (categóricos com as categorias e os códigos; os demais
+# como vetor do numpy, no mesmo tipo)
+def _valores_coluna(valores):
+    import pandas as pd
+
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        return _codificar(pd.Categorical(valores))
+    return _codificar(valores.to_numpy())
+
+# Função para reconstruir um resultado a partir dos valores do JSON (o inverso de _codificar)
+def _decodificar(valor):
+    import numpy as np
+    import pandas as pd
+    from densidade import Distribuicao
+
+    if isinstance(valor, list):
+        return [_decodificar(item) for item in valor]
+    if not isinstance(valor, dict):
+        return valor
+    tipo = valor.get('__tipo__')
+    if tipo is None:
+        return {chave: _decodificar(item) for chave, item in valor.items()}
+    if tipo == 'tupla':
+        return tuple(_decodificar(item) for item in valor['itens'])
+    if tipo == 'bytes':
+        return base64.b64decode(valor['base64'])
+    if tipo == 'dicionario':
+        return {_decodificar(chave): _decodificar(item) for chave, item in valor['itens']}
+    if tipo == 'distribuicao':
+        return Distribuicao(_decodificar(valor['valores']), _decodificar(valor['contagens']))
+    if tipo == 'categorico':
+        return pd.Categorical.from_codes(valor['codigos'], _decodificar(valor['categorias']), valor['ordenado'])
+    if tipo == 'ndarray':
+        if valor['dtype'] == 'object':
+            itens = np.empty(len(valor['itens']), dtype=object)
+            itens[:] = [_decodificar(item) for item in valor['itens']]
+        else:
+            itens = np.array(valor['itens'], dtype=valor['dtype'])
+        return itens.reshape(valor['forma'])
+    if tipo == 'multiindice':
+        return pd.MultiIndex.from_arrays([_decodificar(nivel) for nivel in valor['niveis']],
+                                         names=_decodificar(valor['nomes']))
+    if tipo == 'indice':
+        return pd.Index(_decodificar(valor['valores']), name=_decodificar(valor['nome']))
+    if tipo == 'serie':
+        return pd.Series(_decodificar(valor['valores']), index=_decodificar(valor['indice']),
+                         name=_decodificar(valor['nome']))
+    if tipo == 'tabela':
+        indice = _decodificar(valor['indice'])
+        dados = pd.DataFrame({posicao: _decodificar(itens) for posicao, itens in enumerate(valor['valores'])},
+                             index=pd.RangeIndex(len(indice)))
+        dados.index = indice
+        dados.columns = _decodificar(valor['colunas'])
+        return dados
+    raise ValueError(f"Tipo desconhecido na resposta do serviço: {tipo}")
+
+# Função para preparar um resultado para o envio, em JSON: os atletas da seleção ('dados') só vão para as janelas
+# que gravam os dados limpos (operacoes.DEVOLVEM_DADOS); as estimativas parciais vão sempre sem eles
+def _para_envio(resultado, com_dados=False):
+    if isinstance(resultado, dict) and 'dados' in resultado and not com_dados:
+        resultado = {chave: valor for chave, valor in resultado.items() if chave != 'dados'}
+    return json.dumps(_codificar(resultado), ensure_ascii=False).encode('utf-8')
+
+# Função para ler um resultado recebido do serviço
+def _recebido(conteudo):
+    return _decodificar(json.loads(conteudo.decode('utf-8')))
+
+# Função executada nas threads do serviço: a operação e a conversão do resultado para JSON (fora do laço do asyncio)
+def _executar(nome, argumentos, tarefa):
+    from operacoes import executar, DEVOLVEM_DADOS
+    return _para_envio(executar(nome, argumentos, tarefa), nome in DEVOLVEM_DADOS)
+
+class ServicoAnalises:
+    def __init__(self, threads=THREADS_SERVICO):
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.token = secrets.token_hex(32)
+        self.desafios = set()  # desafios já atendidos (um pedido copiado não é aceito de novo)
+        self.inicio = time.time()
+        self.atendidos = 0
+        self.em_andamento = {}  # id da tarefa -> (operação, tarefa)
+
+    # Função para montar o estado do serviço
+    def estado(self):
+        from carregador import dados_carregados
+
+        return {
+            'pid': os.getpid(),
+            'segundos_ativo': round(time.time() - self.inicio, 1),
+            'pedidos_atendidos': self.atendidos,
+            'em_andamento': [{'operacao': nome, 'etapa': tarefa.etapa} for nome, tarefa in self.em_andamento.values()],
+            'dados': [{'caminho': caminho, 'linhas': linhas} for caminho, linhas in dados_carregados()],
+        }
+
+    # Função chamada pelo asyncio para cada conexão
+    async def atender(self, leitor, escritor):
+        try:
+            metodo, caminho, campos, corpo = await self._ler_pedido(leitor)
+            desafio = self._autenticar(metodo, caminho, campos, corpo)
+            if desafio is None:
+                await self._responder_json(escritor, 401, {'erro': "Pedido sem a assinatura do token do serviço"})
+            elif metodo == 'GET' and caminho == '/estado':
+                await self._responder_json(escritor, 200, self.estado(), desafio)
+            elif metodo == 'POST' and caminho.startswith('/operacoes/'):
+                await self._operacao(caminho[len('/operacoes/'):], corpo, leitor, escritor, desafio)
+            else:
+                await self._responder_json(escritor, 404, {'erro': f"Caminho desconhecido: {metodo} {caminho}"},
+                                           desafio)
+        except (ValueError, asyncio.LimitOverrunError) as e:
+            await self._responder_json(escritor, 400, {'erro': f"Pedido inválido: {e}"})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            escritor.close()
+
+    # Função para ler a linha do pedido, os campos do cabeçalho e o corpo
+    async def _ler_pedido(self, leitor):
+        cabecalho = (await leitor.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        metodo, caminho, _ = cabecalho[0].split(' ', 2)
+        campos = _campos(cabecalho[1:])
+        tamanho = int(campos.get('content-length', 0))
+        if tamanho > LIMITE_PEDIDO:
+            raise ValueError("corpo grande demais")
+        return metodo, caminho, campos, await leitor.readexactly(tamanho)
+
+    # Função para conferir a assinatura do pedido; devolve o desafio (respondido com a prova) ou None
+    def _autenticar(self, metodo, caminho, campos, corpo):
+        esquema, _, resto = campos.get('authorization', '').partition(' ')
+        desafio, _, assinatura = resto.partition(' ')
+        if esquema != ESQUEMA_AUTORIZACAO or not desafio or desafio in self.desafios:
+            return None
+        esperada = assinar(self.token, 'pedido', desafio, metodo, caminho, corpo)
+        if not hmac.compare_digest(assinatura.encode('latin-1'), esperada.encode('ascii')):
+            return None
+        self.desafios.add(desafio)
+        return desafio
+
+    # Função para montar a linha de situação e os campos da resposta, com a prova do desafio do pedido
+    def _cabecalho(self, situacao, tipo, desafio, *campos):
+        motivo = {200: 'OK', 400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found'}[situacao]
+        linhas = [f'HTTP/1.1 {situacao} {motivo}', f'Content-Type: {tipo}', *campos, 'Connection: close']
+        if desafio is not None:
+            linhas.append(f'{CABECALHO_PROVA}: {assinar(self.token, "resposta", desafio)}')
+        return ('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1')
+
+    async def _responder_json(self, escritor, situacao, conteudo, desafio=None):
+        corpo = json.dumps(conteudo, ensure_ascii=False).encode('utf-8')
+        escritor.write(self._cabecalho(situacao, 'application/json; charset=utf-8', desafio,
+                                       f'Content-Length: {len(corpo)}') + corpo)
+        await escritor.drain()
+
+    # Função para executar uma operação em uma thread, enviando as etapas enquanto ela avança; se o cliente fechar a
+    # conexão (janela fechada ou análise cancelada), a tarefa é cancelada
+    async def _operacao(self, nome, corpo, leitor, escritor, desafio):
+        from operacoes import OPERACOES
+
+        if nome not in OPERACOES:
+            await self._responder_json(escritor, 404, {'erro': f"Operação desconhecida: {nome}"}, desafio)
+            return
+        try:
+            pedido = json.loads(corpo or b'{}')
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            await self._responder_json(escritor, 400, {'erro': f"Pedido inválido: corpo não é JSON ({e})"}, desafio)
+            return
+        argumentos = pedido.get('argumentos', []) if isinstance(pedido, dict) else None
+        if not isinstance(argumentos, list):
+            await self._responder_json(escritor, 400,
+                                       {'erro': 'Pedido inválido: o corpo deve ser {"argumentos": [...]}'}, desafio)
+            return
+
+        escritor.write(self._cabecalho(200, 'application/octet-stream', desafio))
+        tarefa = Tarefa("Processando...")
+        futuro = asyncio.get_running_loop().run_in_executor(self.executor, _executar, nome, argumentos, tarefa)
+        desconexao = asyncio.ensure_future(leitor.read(1))
+        self.em_andamento[id(tarefa)] = (nome, tarefa)
+        try:
+            etapa_enviada = None
+            while not futuro.done():
+                await asyncio.wait({futuro, desconexao}, timeout=INTERVALO_VERIFICACAO,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if desconexao.done() and not futuro.done():
+                    tarefa.cancelar()
+                    break
+                if tarefa.etapa != etapa_enviada:
+                    etapa_enviada = tarefa.etapa
+                    escritor.write(mensagem(ETAPA, etapa_enviada.encode('utf-8')))
+                for parcial in tarefa.parciais():
+                    escritor.write(mensagem(PARCIAL, _para_envio(parcial)))
+                await escritor.drain()
+
+            try:
+                resultado = await futuro
+            except TarefaCancelada:
+                return
+            except Exception as e:
+                escritor.write(mensagem(ERRO, str(e).encode('utf-8')))
+            else:
+                # Parciais publicados depois da última volta do laço saem antes do resultado
+                for parcial in tarefa.parciais():
+                    escritor.write(mensagem(PARCIAL, _para_envio(parcial)))
+                escritor.write(mensagem(RESULTADO, resultado))
+            await escritor.drain()
+            self.atendidos += 1
+        finally:
+            del self.em_andamento[id(tarefa)]
+            desconexao.cancel()
+
+# Função para atender os pedidos até o serviço ser encerrado; o token só é gravado depois que a porta foi
+# obtida (se outro processo já a ocupa, o serviço não inicia e as janelas recusam esse processo)
+async def _servir(servico, porta):
+    servidor = await asyncio.start_server(servico.atender, HOST_SERVICO, porta, limit=LIMITE_PEDIDO)
+    arquivo = gravar_token(porta, servico.token)
+    print(f"Serviço de análises em http://{HOST_SERVICO}:{porta} (token em {arquivo}; Ctrl+C para encerrar)")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        os.remove(arquivo)
+
+# Função para ler o endereço do serviço da variável de ambiente (None = análises na própria janela); somente
+# endereços da própria máquina são aceitos
+def endereco_servico():
+    valor = os.environ.get(VARIAVEL_SERVICO, '').strip()
+    if not valor:
+        return None
+    host, _, porta = valor.rpartition(':')
+    host = host.strip('[]') or HOST_SERVICO
+    try:
+        local = host == 'localhost' or ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        local = False
+    if not local:
+        raise ValueError(f"O serviço de análises precisa estar na própria máquina ({VARIAVEL_SERVICO}={valor}); "
+                         f"use {HOST_SERVICO}:{PORTA_PADRAO} ou só a porta.")
+    return (host, int(porta))
+
+# Leitura da resposta do serviço em um socket com tempo limite: enquanto espera, verifica se a tarefa foi
+# cancelada (o cancelamento fecha a conexão, e o serviço interrompe o pedido)
+class _LeitorResposta:
+    def __init__(self, conexao, tarefa):
+        self.conexao = conexao
+        self.tarefa = tarefa
+        self.buffer = bytearray()
+
+    def _receber(self):
+        while True:
+            try:
+                bloco = self.conexao.recv(1024 * 1024)
+            except socket.timeout:
+                if self.tarefa is not None:
+                    self.tarefa.verificar()
+                continue
+            if not bloco:
+                raise ConnectionError("O serviço de análises encerrou a conexão antes de responder.")
+            self.buffer += bloco
+            return
+
+    def ler_ate(self, separador):
+        while separador not in self.buffer:
+            self._receber()
+        posicao = self.buffer.index(separador) + len(separador)
+        conteudo = bytes(self.buffer[:posicao])
+        del self.buffer[:posicao]
+        return conteudo
+
+    def ler(self, tamanho):
+        while len(self.buffer) < tamanho:
+            self._receber()
+        conteudo = bytes(self.buffer[:tamanho])
+        del self.buffer[:tamanho]
+        return conteudo
+
+    def ler_resto(self):
+        try:
+            while True:
+                self._receber()
+        except ConnectionError:
+            return bytes(self.buffer)
+
+# Função para enviar um pedido assinado ao serviço e conferir a assinatura do desafio na resposta, antes de ler
+# qualquer outra coisa; dentro do with, devolve a situação da resposta e o leitor do restante
+@contextmanager
+def _pedido(endereco, metodo, caminho, corpo=b'', tarefa=None):
+    token = ler_token(endereco[1])
+    desafio = secrets.token_hex(16)
+    assinatura = assinar(token, 'pedido', desafio, metodo, caminho, corpo)
+    cabecalho = (f'{metodo} {caminho} HTTP/1.1\r\nHost: {endereco[0]}:{endereco[1]}\r\n'
+                 f'Authorization: {ESQUEMA_AUTORIZACAO} {desafio} {assinatura}\r\n'
+                 f'Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\nConnection: close\r\n\r\n')
+    try:
+        conexao = socket.create_connection(endereco, timeout=TEMPO_CONEXAO)
+    except OSError as e:
+        raise ConnectionError(f"O serviço de análises não respondeu em {endereco[0]}:{endereco[1]} "
+                              f"(inicie-o com python servico.py ou apague a variável {VARIAVEL_SERVICO}).") from e
+
+    with conexao:
+        conexao.sendall(cabecalho.encode('latin-1') + corpo)
+        conexao.settimeout(INTERVALO_VERIFICACAO)
+        leitor = _LeitorResposta(conexao, tarefa)
+        linhas = leitor.ler_ate(b'\r\n\r\n').decode('latin-1').split('\r\n')
+        prova = _campos(linhas[1:]).get(CABECALHO_PROVA.lower(), '')
+        if not hmac.compare_digest(prova.encode('latin-1'), assinar(token, 'resposta', desafio).encode('ascii')):
+            raise ConnectionError(f"O processo em {endereco[0]}:{endereco[1]} não confirmou o token do serviço de "
+                                  "análises deste usuário (outro processo pode estar usando a porta).")
+        yield int(linhas[0].split(' ', 2)[1]), leitor
+
+# Função para executar uma operação no serviço: as etapas e os resultados parciais recebidos aparecem na tarefa
+# (barra de progresso, perfil de desempenho e estimativas da janela) e o resultado volta como se a operação tivesse
+# rodado na própria janela
+def executar_remoto(endereco, nome, argumentos, tarefa=None):
+    corpo = json.dumps({'argumentos': list(argumentos)}).encode('utf-8')
+    with _pedido(endereco, 'POST', f'/operacoes/{nome}', corpo, tarefa) as (situacao, leitor):
+        if situacao != 200:
+            raise ValueError(json.loads(leitor.ler_resto())['erro'])
+
+        while True:
+            tipo = leitor.ler(1)
+            conteudo = leitor.ler(struct.unpack('>I', leitor.ler(4))[0])
+            if tipo == ETAPA:
+                etapa(tarefa, conteudo.decode('utf-8'))
+            elif tipo == PARCIAL:
+                publicar(tarefa, _recebido(conteudo))
+            elif tipo == RESULTADO:
+                return _recebido(conteudo)
+            else:
+                raise RuntimeError(conteudo.decode('utf-8'))
+
+# Função para consultar o estado do serviço (GET /estado, também assinado)
+def consultar_estado(endereco):
+    with _pedido(endereco, 'GET', '/estado') as (situacao, leitor):
+        conteudo = json.loads(leitor.ler_resto())
+    if situacao != 200:
+        raise ValueError(conteudo['erro'])
+    return conteudo
+
+# Função usada pelas janelas para executar uma operação de operacoes.py: no serviço, se a variável
+# OLIMPIADAS_SERVICO estiver definida, ou na própria janela
+def executar_operacao(tarefa, nome, *argumentos):
+    endereco = endereco_servico()
+    if endereco is None:
+        from operacoes import executar
+        return executar(nome, argumentos, tarefa)
+
+    # O serviço pode ter sido iniciado em outra pasta: o caminho dos dados vai completo
+    argumentos = (os.path.abspath(argumentos[0]),) + tuple(argumentos[1:])
+    return executar_remoto(endereco, nome, argumentos, tarefa)
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Serviço local de análises dos dados olímpicos, compartilhado "
+                                                 "pelas janelas (variável OLIMPIADAS_SERVICO)")
+    parser.add_argument('arquivos', nargs='*', help="arquivos CSV, pastas ou padrões carregados na inicialização")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO, help=f"porta (padrão: {PORTA_PADRAO})")
+    parser.add_argument('--threads', type=int, default=THREADS_SERVICO,
+                        help=f"pedidos calculados ao mesmo tempo (padrão: {THREADS_SERVICO})")
+    parser.add_argument('--estado', action='store_true', help="exibe o estado do serviço em execução e sai")
+    return parser
+
+def main(argv=None):
+    argumentos = criar_parser().parse_args(argv)
+    if argumentos.estado:
+        estado = consultar_estado((HOST_SERVICO, argumentos.porta))
+        print(json.dumps(estado, ensure_ascii=False, indent=2))
+        return 0
+
+    from carregador import carregar_dados
+    from operacoes import preparar
+
+    for caminho in argumentos.arquivos:
+        caminho = os.path.abspath(caminho)
+        preparar(caminho)
+        print(f"{caminho}: {len(carregar_dados(caminho))} linhas carregadas")
+
+    try:
+        asyncio.run(_servir(ServicoAnalises(argumentos.threads), argumentos.porta))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
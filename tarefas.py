@@ -0,0 +1,60 @@
+import queue
+import threading
+
+# Exceção lançada dentro de uma tarefa quando ela é cancelada
+class TarefaCancelada(Exception):
+    pass
+
+# Tarefa executada em segundo plano: o trabalho consulta verificar() entre as etapas para saber se foi
+# cancelado e para informar a etapa atual, exibida na janela (e registrada no perfil de desempenho, se houver).
+# Antes do resultado final o trabalho pode publicar resultados parciais (por exemplo estimados em uma amostra),
+# exibidos pela janela assim que chegam
+class Tarefa:
+    def __init__(self, etapa='', perfil=None):
+        self.etapa = etapa
+        self.perfil = perfil
+        self._cancelada = threading.Event()
+        self._parciais = queue.SimpleQueue()
+
+    def cancelar(self):
+        self._cancelada.set()
+
+    @property
+    def cancelada(self):
+        return self._cancelada.is_set()
+
+    # Função para interromper o trabalho se a tarefa foi cancelada e registrar a etapa atual
+    def verificar(self, etapa=None):
+        if self._cancelada.is_set():
+            raise TarefaCancelada()
+        if etapa is not None:
+            self.etapa = etapa
+            if self.perfil is not None:
+                self.perfil.iniciar_etapa(etapa)
+
+    # Função para entregar um resultado parcial
+    def publicar(self, resultado):
+        self.verificar()
+        self._parciais.put(resultado)
+
+    # Função para retirar os resultados parciais publicados desde a última consulta, em ordem
+    def parciais(self):
+        publicados = []
+        while not self._parciais.empty():
+            publicados.append(self._parciais.get())
+        return publicados
+
+# Função para informar a etapa de uma tarefa opcional (as análises também rodam sem tarefa, direto)
+def etapa(tarefa, descricao):
+    if tarefa is not None:
+        tarefa.verificar(descricao)
+
+# Função para publicar um resultado parcial de uma tarefa opcional (sem tarefa ele é descartado)
+def publicar(tarefa, resultado):
+    if tarefa is not None:
+        tarefa.publicar(resultado)
+
+# Função para informar as linhas que entraram e saíram da etapa atual de uma tarefa opcional (perfil de desempenho)
+def registrar_linhas(tarefa, entrada=None, saida=None):
+    if tarefa is not None and tarefa.perfil is not None:
+        tarefa.perfil.registrar_linhas(entrada, saida)
@@ -0,0 +1,406 @@
+import asyncio
+import socket
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+import cache_disco
+import carregador
+import operacoes
+import progressivo
+import servico
+from acumuladores import HistogramaQuantis, Momentos, CoMomentos
+from comparacao import ContagensPaises, _welch, _mann_whitney, _kolmogorov_smirnov
+from correlacao import CovarianciasParticionadas
+from cubo_medalhas import CuboMedalhas, EIXOS
+from dados_sinteticos import gerar_bloco
+from densidade import distribuicao_valores
+from exportacao import exportar_dados, ler_exportacao, destino_formato
+from fontes import listar_arquivos, fonte_multipla, fonte_existe
+from incremental import AgregadosAnuais, JanelaAnos
+from outliers import remove_outliers, mascara_limpeza, MODO_EXATO, COLUNAS_OUTLIERS
+from servico import _para_envio, _recebido
+from tarefas import Tarefa
+
+# Conferência dos cálculos agregados (acumuladores, testes vetorizados e janela de anos) contra o caminho de
+# referência do pandas, do numpy e do scipy, com medidas inteiras (como nos dados das Olimpíadas) e fracionárias
+#
+# Execução:
+#   python -m pytest -q test_motores.py
+
+LINHAS = 20_000
+
+# Dados sintéticos com as colunas usadas nas análises, com altura e peso inteiros ou com duas casas decimais
+@pytest.fixture(params=['inteiros', 'fracionarios'], scope='module')
+def dados(request):
+    dados = gerar_bloco(np.random.default_rng(7), 0, LINHAS)
+    if request.param == 'fracionarios':
+        gerador = np.random.default_rng(8)
+        for coluna in ('altura', 'peso'):
+            dados[coluna] = np.round(dados[coluna] + gerador.uniform(-0.5, 0.5, len(dados)), 2)
+    # Mesmos tipos das colunas carregadas por carregador.py
+    return dados[['sexo', 'altura', 'peso', 'pais', 'ano', 'medalha']].astype({
+        'sexo': 'category', 'altura': 'float32', 'peso': 'float32', 'pais': 'category', 'ano': 'int16',
+        'medalha': 'category'})
+
+# Quantis do histograma (em blocos combinados) contra o quantile() do pandas: exatos com valores na resolução
+@pytest.mark.parametrize('q', [0.0, 0.1, 0.25, 0.5, 0.75, 0.99, 1.0])
+def test_histograma_quantis(dados, q):
+    valores = dados['altura'].astype('float64').round(2)
+    histograma = HistogramaQuantis()
+    for bloco in np.array_split(valores.to_numpy(), 7):
+        histograma.combinar(HistogramaQuantis().adicionar(bloco))
+    assert histograma.contagem == valores.notna().sum()
+    assert histograma.quantil(q) == pytest.approx(valores.quantile(q), abs=1e-9)
+
+# Momentos e co-momentos combinados bloco a bloco contra média, variância e correlação do numpy
+def test_momentos(dados):
+    completos = dados[['altura', 'peso', 'ano']].dropna().to_numpy(dtype='float64')
+    momentos = Momentos()
+    comomentos = CoMomentos(['altura', 'peso', 'ano'])
+    for bloco in np.array_split(completos, 5):
+        momentos.combinar(Momentos().adicionar(bloco[:, 0]))
+        comomentos.combinar(CoMomentos(['altura', 'peso', 'ano']).adicionar(bloco))
+
+    assert momentos.contagem == len(completos)
+    assert momentos.media == pytest.approx(completos[:, 0].mean(), rel=1e-12)
+    assert momentos.variancia == pytest.approx(completos[:, 0].var(ddof=1), rel=1e-10)
+    np.testing.assert_allclose(comomentos.covariancia, np.cov(completos, rowvar=False), rtol=1e-10)
+    np.testing.assert_allclose(comomentos.correlacao, np.corrcoef(completos, rowvar=False), rtol=1e-10)
+
+# Testes de Welch, Mann-Whitney e Kolmogorov-Smirnov entre todos os pares contra os do scipy
+@pytest.mark.parametrize('coluna', ['altura', 'peso'])
+def test_testes_pares(dados, coluna):
+    medidas = dados.dropna(subset=['altura', 'peso'])
+    paises = medidas['pais'].value_counts().index[:4].tolist()
+    contagens = ContagensPaises(medidas, paises, coluna)
+    t, graus, p_welch = _welch(contagens)
+    u, p_mann_whitney = _mann_whitney(contagens)
+    d, p_ks = _kolmogorov_smirnov(contagens)
+
+    amostras = [medidas.loc[medidas['pais'] == pais, coluna].to_numpy(dtype='float64') for pais in paises]
+    for i, j in zip(*np.triu_indices(len(paises), k=1)):
+        welch = stats.ttest_ind(amostras[i], amostras[j], equal_var=False)
+        assert t[i, j] == pytest.approx(welch.statistic, rel=1e-9)
+        assert p_welch[i, j] == pytest.approx(welch.pvalue, rel=1e-6, abs=1e-300)
+
+        mann_whitney = stats.mannwhitneyu(amostras[i], amostras[j], alternative='two-sided', method='asymptotic')
+        assert u[i, j] == pytest.approx(mann_whitney.statistic, rel=1e-12)
+        assert p_mann_whitney[i, j] == pytest.approx(mann_whitney.pvalue, rel=1e-6, abs=1e-300)
+
+        ks = stats.ks_2samp(amostras[i], amostras[j], method='asymp')
+        assert d[i, j] == pytest.approx(ks.statistic, rel=1e-12)
+        assert p_ks[i, j] == pytest.approx(ks.pvalue, rel=1e-6, abs=1e-300)
+
+# Janela de anos (movida de um intervalo a outro) contra dropna() e remove_outliers() da altura e depois do peso
+@pytest.mark.parametrize('pais', [None, 'Brasil'])
+def test_janela_anos(dados, pais):
+    escopo = dados if pais is None else dados[dados['pais'] == pais]
+    janela = JanelaAnos(AgregadosAnuais(escopo.dropna()))
+    for ano_inicio, ano_fim in [(1896, 2016), (1950, 1990), (1960, 2000), (1900, 1920), (1990, 1950)]:
+        janela.mover(ano_inicio, ano_fim)
+        selecao = escopo[(escopo['ano'] >= ano_inicio) & (escopo['ano'] <= ano_fim)].dropna()
+        limpos = remove_outliers(remove_outliers(selecao, 'altura', MODO_EXATO), 'peso', MODO_EXATO)
+        estatisticas = janela.estatisticas()
+
+        assert estatisticas['contagem'] == len(limpos)
+        assert janela.medalhas() == limpos['medalha'].value_counts(sort=False).to_dict()
+        for coluna in ('altura', 'peso'):
+            valores = limpos[coluna].astype('float64')
+            assert estatisticas[f'media_{coluna}'] == pytest.approx(valores.mean(), rel=1e-12, nan_ok=True)
+            assert estatisticas[f'desvio_padrao_{coluna}'] == pytest.approx(valores.std(), rel=1e-10, nan_ok=True)
+
+        distribuicao = janela.distribuicao_altura()
+        valores, contagens = np.unique(limpos['altura'].to_numpy(dtype='float64'), return_counts=True)
+        np.testing.assert_array_equal(distribuicao.valores, valores)
+        np.testing.assert_array_equal(distribuicao.contagens, contagens)
+
+# Correlação das células por país, ano, altura e peso contra o corr() do pandas sobre a seleção limpa com os limites
+# da janela de anos (como nas análises)
+@pytest.mark.parametrize('pais', [None, 'Brasil'])
+def test_covariancias(dados, pais):
+    covariancias = CovarianciasParticionadas(dados)
+    escopo = dados if pais is None else dados[dados['pais'] == pais]
+    janela = JanelaAnos(AgregadosAnuais(escopo.dropna()))
+    for ano_inicio, ano_fim in [(1896, 2016), (1950, 1990), (1900, 1920)]:
+        janela.mover(ano_inicio, ano_fim)
+        limites = janela.limites()
+        selecao = escopo[(escopo['ano'] >= ano_inicio) & (escopo['ano'] <= ano_fim)]
+        limpos = selecao[mascara_limpeza(selecao, dict(zip(COLUNAS_OUTLIERS, limites)))]
+        esperada = limpos.select_dtypes(include='number').astype('float64').corr()
+
+        obtida = covariancias.correlacao(None if pais is None else [pais], ano_inicio, ano_fim, limites)
+        assert covariancias.selecionar(None if pais is None else [pais], ano_inicio, ano_fim, limites).contagem \
+            == len(limpos)
+        pd.testing.assert_frame_equal(obtida, esperada, check_exact=False, rtol=1e-9, atol=1e-12)
+
+# Cortes, somas e maiores do cubo de medalhas contra filtros, crosstab() e value_counts() do pandas sobre as linhas
+# com medalha
+@pytest.mark.parametrize('paises, ano_inicio, ano_fim, sexos, medalhas', [
+    (None, None, None, None, None),
+    (['Brasil', 'Japão', 'Atlântida'], 1950, 1990, None, None),
+    (None, 1900, 1920, ['F'], ['Ouro', 'Prata']),
+    (['Quênia'], 2020, 2030, None, None),
+])
+def test_cubo_medalhas(dados, paises, ano_inicio, ano_fim, sexos, medalhas):
+    corte = CuboMedalhas.construir(dados).fatiar(paises, ano_inicio, ano_fim, sexos, medalhas)
+
+    com_medalha = dados.dropna(subset=EIXOS)
+    selecao = com_medalha[com_medalha['ano'].between(ano_inicio or 0, ano_fim or 9999)]
+    for coluna, escolhidos in (('pais', paises), ('sexo', sexos), ('medalha', medalhas)):
+        if escolhidos is not None:
+            selecao = selecao[selecao[coluna].isin(escolhidos)]
+    assert corte.total == len(selecao)
+
+    esperada = pd.crosstab(selecao['pais'].astype(str), selecao['sexo'].astype(str))
+    obtida = corte.agregar('pais', 'sexo')
+    obtida = obtida.loc[obtida.sum(axis=1) > 0, obtida.sum(axis=0) > 0]
+    obtida.index, obtida.columns = obtida.index.astype(str), obtida.columns.astype(str)
+    pd.testing.assert_frame_equal(obtida.sort_index().sort_index(axis=1), esperada, check_dtype=False,
+                                  check_names=False)
+
+    maiores = corte.maiores('pais')
+    contagens = selecao['pais'].astype(str).value_counts()
+    assert maiores.rename(index=str).to_dict() == contagens.to_dict()
+    assert (np.diff(maiores.to_numpy()) <= 0).all()
+    assert corte.maiores('pais', 3).tolist() == contagens.iloc[:3].tolist()
+
+# Função para comparar dois DataFrames sem depender da ordem das linhas e das colunas nem dos tipos de cada formato
+# (categorias voltam como texto, partições do Parquet como inteiros de 32 bits)
+def _normalizar(dados, colunas):
+    dados = dados[colunas].copy()
+    for coluna in colunas:
+        if pd.api.types.is_numeric_dtype(dados[coluna]):
+            dados[coluna] = dados[coluna].astype('float64')
+        else:
+            dados[coluna] = dados[coluna].astype(object).where(dados[coluna].notna(), '')
+    return dados.sort_values(colunas).reset_index(drop=True)
+
+# Exportação em blocos e leitura (inteira e filtrada por anos e países) contra o to_csv()/read_csv() do pandas
+# nos formatos de texto e contra os próprios dados nos formatos do pyarrow
+@pytest.mark.parametrize('formato', ['csv', 'csv.gz', 'parquet', 'arrow'])
+def test_exportacao(dados, formato, tmp_path):
+    if formato in ('parquet', 'arrow'):
+        pytest.importorskip('pyarrow')
+        referencia = dados
+    else:
+        dados.to_csv(tmp_path / 'referencia.csv', index=False)
+        referencia = pd.read_csv(tmp_path / 'referencia.csv')
+    destino = exportar_dados(dados, destino_formato(str(tmp_path / 'exportados'), formato), formato,
+                             linhas_bloco=8_000)
+    colunas = list(dados.columns)
+
+    lidos = ler_exportacao(destino)
+    assert len(lidos) == len(dados)
+    pd.testing.assert_frame_equal(_normalizar(lidos, colunas), _normalizar(referencia, colunas))
+
+    anos, paises = (1950, 1990), ['Brasil', 'Japão', 'Quênia']
+    filtrados = ler_exportacao(destino, anos=anos, paises=paises)
+    esperados = referencia[referencia['ano'].between(*anos) & referencia['pais'].isin(paises)]
+    pd.testing.assert_frame_equal(_normalizar(filtrados, colunas), _normalizar(esperados, colunas))
+
+# Leitura de uma pasta e de um padrão com vários CSVs (um deles comprimido e outro sem a coluna de medalhas), com e
+# sem o pyarrow, contra o pd.concat() dos read_csv() de cada arquivo na ordem dos nomes
+@pytest.mark.parametrize('com_pyarrow', [True, False])
+def test_fonte_multipla(dados, com_pyarrow, tmp_path, monkeypatch):
+    if com_pyarrow:
+        pytest.importorskip('pyarrow')
+    else:
+        monkeypatch.setattr(carregador, 'feather', None)
+    monkeypatch.setattr(carregador, 'DIRETORIO_CACHE', str(tmp_path / 'cache'))
+
+    pasta = tmp_path / 'edicoes'
+    pasta.mkdir()
+    partes = {
+        'atletas_1.csv': dados[dados['ano'] < 1950],
+        'atletas_2.csv.gz': dados[(dados['ano'] >= 1950) & (dados['ano'] < 1990)],
+        'atletas_3.csv': dados[dados['ano'] >= 1990].drop(columns='medalha'),
+    }
+    for nome, parte in partes.items():
+        parte.to_csv(pasta / nome, index=False)
+    (pasta / 'leia-me.txt').write_text('não é um CSV')
+
+    arquivos = [str(pasta / nome) for nome in sorted(partes)]
+    assert listar_arquivos(str(pasta)) == arquivos
+    assert listar_arquivos(str(pasta / 'atletas_*.csv')) == [arquivos[0], arquivos[2]]
+    assert fonte_multipla(str(pasta)) and not fonte_multipla(arquivos[0])
+    assert fonte_existe(str(pasta / '*.csv.gz')) and not fonte_existe(str(pasta / '*.parquet'))
+
+    for fonte, escolhidos in ((str(pasta), arquivos), (str(pasta / 'atletas_*.csv'), [arquivos[0], arquivos[2]])):
+        esperados = pd.concat([pd.read_csv(arquivo) for arquivo in escolhidos], ignore_index=True)
+        lidos = carregador.carregar_dados(fonte)
+        assert len(lidos) == len(esperados)
+        for coluna in esperados.columns:
+            if isinstance(lidos[coluna].dtype, pd.CategoricalDtype):
+                assert lidos[coluna].cat.categories.is_monotonic_increasing
+                np.testing.assert_array_equal(lidos[coluna].astype(object).fillna(''),
+                                              esperados[coluna].astype(object).fillna(''))
+            else:
+                np.testing.assert_array_equal(lidos[coluna].to_numpy(dtype='float64'),
+                                              esperados[coluna].astype(lidos[coluna].dtype).to_numpy(dtype='float64'))
+
+    # Com o pyarrow, cada CSV é convertido uma única vez para o formato binário
+    assert len(list((tmp_path / 'cache').glob('*.feather'))) == (len(arquivos) if com_pyarrow else 0)
+
+# Amostras de um arquivo que ainda não está em memória, sem carregar os dados: os blocos do CSV juntos são o arquivo
+# inteiro, as amostras vêm da menor para a maior com todas as linhas com a mesma probabilidade (fracao) e, do
+# arquivo binário, a amostra inteira é a mesma sorteada dos dados carregados
+@pytest.mark.parametrize('com_pyarrow', [True, False])
+def test_amostras_sem_carregar(dados, com_pyarrow, tmp_path, monkeypatch):
+    if com_pyarrow:
+        pytest.importorskip('pyarrow')
+    else:
+        monkeypatch.setattr(carregador, 'feather', None)
+    monkeypatch.setattr(carregador, 'DIRETORIO_CACHE', str(tmp_path / 'cache'))
+    monkeypatch.setattr(progressivo, 'TAMANHO_AMOSTRA', 5_000)
+    monkeypatch.setattr(progressivo, 'TAMANHO_PRIMEIRA_AMOSTRA', 1_000)
+    monkeypatch.setattr(progressivo, 'BLOCO_AMOSTRA', 1_024)
+
+    arquivo = str(tmp_path / 'atletas.csv')
+    dados.to_csv(arquivo, index=False)
+    blocos = carregador.blocos_csv(arquivo, progressivo.BLOCO_AMOSTRA)
+    pd.testing.assert_frame_equal(carregador.ler_blocos_csv(blocos),
+                                  carregador._ler_csv(arquivo, carregador.COLUNAS_ANALISE))
+    if com_pyarrow:
+        carregador.preparar_arquivo(arquivo)
+
+    amostras = list(progressivo.obter_amostras(arquivo))
+    assert not carregador.dados_em_memoria(arquivo)
+    assert [len(amostra['dados']) for amostra in amostras] == pytest.approx([1_000, 5_000], rel=0.1)
+    for amostra in amostras:
+        assert amostra['fracao'] == pytest.approx(len(amostra['dados']) / len(dados), rel=0.1)
+        assert amostra['total'] == pytest.approx(len(dados), rel=0.1)
+    estimativas = list(progressivo.estimar_periodo(arquivo, 1950, 2000))
+    assert [estimativa['fracao'] for estimativa in estimativas] == [amostra['fracao'] for amostra in amostras]
+
+    try:
+        esperada = progressivo.sortear_amostra(carregador.carregar_dados(arquivo), progressivo.TAMANHO_AMOSTRA)
+        if com_pyarrow:
+            pd.testing.assert_frame_equal(amostras[-1]['dados'], esperada['dados'])
+        assert len(list(progressivo.obter_amostras(arquivo))) == 1
+    finally:
+        carregador.limpar_cache(arquivo)
+
+# Respostas do serviço em JSON: um resultado enviado e lido de volta é igual ao original (tipos do pandas e do
+# numpy, categorias, índices de vários níveis, tuplas, imagens e distribuições) e tipos sem formato são recusados
+def test_servico_json(dados):
+    selecao = dados.head(2_000)
+    resultado = {
+        'dados': selecao,
+        'correlacao': selecao.select_dtypes(include='number').corr(),
+        'medalhas_pais': selecao['pais'].value_counts(),
+        'medalhas_sexo': pd.crosstab(selecao['pais'], selecao['sexo']),
+        'medidas': selecao.groupby(['pais', 'sexo'], observed=True)[['altura', 'peso']].mean(),
+        'distribuicao_altura': distribuicao_valores(selecao['altura'].dropna()),
+        'anos': (1896, 2016),
+        'media_altura': np.float64(175.25),
+        'contagem': np.int64(len(selecao)),
+        'dashboard': bytes(range(256)),
+        'intervalos': {'contagem': (1.5, float('nan')), 'media_altura': None},
+        'por_ano': {1896: 3, 2016: [4, 'Ouro']},
+        'matriz': np.arange(6, dtype='int16').reshape(2, 3),
+    }
+    recebido = _recebido(_para_envio(resultado, com_dados=True))
+
+    assert list(recebido) == list(resultado)
+    for chave in ('dados', 'correlacao', 'medalhas_sexo', 'medidas'):
+        pd.testing.assert_frame_equal(recebido[chave], resultado[chave])
+    pd.testing.assert_series_equal(recebido['medalhas_pais'], resultado['medalhas_pais'])
+    np.testing.assert_array_equal(recebido['distribuicao_altura'].valores, resultado['distribuicao_altura'].valores)
+    np.testing.assert_array_equal(recebido['distribuicao_altura'].contagens,
+                                  resultado['distribuicao_altura'].contagens)
+    assert recebido['matriz'].dtype == np.int16
+    np.testing.assert_array_equal(recebido['matriz'], resultado['matriz'])
+    assert recebido['intervalos']['contagem'][0] == 1.5 and np.isnan(recebido['intervalos']['contagem'][1])
+    for chave in ('anos', 'media_altura', 'contagem', 'dashboard', 'por_ano'):
+        assert recebido[chave] == resultado[chave]
+
+    # Sem com_dados (estimativas e operações fora de DEVOLVEM_DADOS) os atletas ficam de fora
+    assert 'dados' not in _recebido(_para_envio(resultado))
+    with pytest.raises(TypeError):
+        _para_envio({'objeto': object()})
+
+# Serviço local iniciado em uma porta livre, com o token e os caches em uma pasta temporária, e o CSV dos dados
+@pytest.fixture
+def servico_local(dados, tmp_path, monkeypatch):
+    monkeypatch.setattr(servico, 'DIRETORIO_TOKENS', str(tmp_path / 'tokens'))
+    monkeypatch.setattr(carregador, 'DIRETORIO_CACHE', str(tmp_path / 'cache'))
+    monkeypatch.setattr(cache_disco, 'DIRETORIO_RESULTADOS', str(tmp_path / 'cache' / 'resultados'))
+    caminho = str(tmp_path / 'atletas.csv')
+    dados.to_csv(caminho, index=False)
+
+    atendimento = servico.ServicoAnalises(threads=2)
+    laco = asyncio.new_event_loop()
+    servidor = laco.run_until_complete(asyncio.start_server(atendimento.atender, servico.HOST_SERVICO, 0))
+    endereco = servidor.sockets[0].getsockname()[:2]
+    servico.gravar_token(endereco[1], atendimento.token)
+    thread = threading.Thread(target=laco.run_forever, daemon=True)
+    thread.start()
+    yield endereco, caminho
+    laco.call_soon_threadsafe(laco.stop)
+    thread.join()
+    servidor.close()
+
+# Operação no serviço contra a mesma operação na própria janela: etapas recebidas e resultado (com os atletas da
+# seleção limpa, que a janela grava) iguais
+def test_servico_operacao(servico_local):
+    endereco, caminho = servico_local
+    tarefa = Tarefa()
+    remoto = servico.executar_remoto(endereco, 'geral', [caminho], tarefa)
+    carregador.limpar_cache()
+    local = operacoes.executar('geral', [caminho])
+
+    assert tarefa.etapa != ''
+    pd.testing.assert_frame_equal(remoto['dados'], local['dados'])
+    pd.testing.assert_frame_equal(remoto['correlacao'], local['correlacao'])
+    pd.testing.assert_series_equal(remoto['medalhas_pais'], local['medalhas_pais'])
+    for chave in ('contagem', 'media_altura', 'desvio_padrao_altura', 'media_peso', 'desvio_padrao_peso', 'anos'):
+        assert remoto[chave] == local[chave]
+    assert servico.executar_remoto(endereco, 'paises', [caminho]) == operacoes.executar('paises', [caminho])
+
+# Autenticação: pedidos sem a assinatura do token (ou repetidos) são recusados, inclusive o /estado, e a janela
+# recusa a resposta de um processo que não conhece o token
+def test_servico_autenticacao(servico_local):
+    endereco, caminho = servico_local
+    assert servico.consultar_estado(endereco)['pedidos_atendidos'] == 0
+
+    # Pedidos sem assinatura, assinados, repetidos e com o corpo inválido (resposta 400 do próprio serviço)
+    token = servico.ler_token(endereco[1])
+
+    def enviar(metodo, rota, corpo=b'', desafio=None):
+        pedido = f'{metodo} {rota} HTTP/1.1\r\nContent-Length: {len(corpo)}\r\n'
+        if desafio is not None:
+            assinatura = servico.assinar(token, 'pedido', desafio, metodo, rota, corpo)
+            pedido += f'Authorization: Olimpiadas {desafio} {assinatura}\r\n'
+        with socket.create_connection(endereco) as conexao:
+            conexao.sendall(pedido.encode('latin-1') + b'\r\n' + corpo)
+            return int(servico._LeitorResposta(conexao, None).ler_resto().split(b' ', 2)[1])
+
+    assert enviar('GET', '/estado') == 401
+    assert enviar('POST', '/operacoes/paises', b'{"argumentos": []}') == 401
+    assert enviar('GET', '/estado', desafio='a1') == 200
+    assert enviar('GET', '/estado', desafio='a1') == 401
+    assert enviar('POST', '/operacoes/paises', b'{"argumentos": 5}', desafio='a2') == 400
+
+    # Token que não é o do serviço (arquivo trocado): a janela recusa a resposta
+    servico.gravar_token(endereco[1], 'f' * 64)
+    with pytest.raises(ConnectionError):
+        servico.consultar_estado(endereco)
+    servico.gravar_token(endereco[1], token)
+
+    # Processo que ocupa outra porta e responde sem conhecer o token: a resposta nem chega a ser lida
+    impostor = socket.create_server((servico.HOST_SERVICO, 0))
+    porta = impostor.getsockname()[1]
+    servico.gravar_token(porta, token)
+
+    def responder():
+        conexao, _ = impostor.accept()
+        with conexao:
+            conexao.recv(65536)
+            conexao.sendall(b'HTTP/1.1 200 OK\r\n\r\n' + servico.mensagem(servico.RESULTADO, b'{}'))
+    thread = threading.Thread(target=responder)
+    thread.start()
+    with impostor, pytest.raises(ConnectionError):
+        servico.executar_remoto((servico.HOST_SERVICO, porta), 'paises', [caminho])
+    thread.join()